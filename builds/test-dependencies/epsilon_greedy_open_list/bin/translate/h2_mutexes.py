@@ -0,0 +1,236 @@
+"""This module contains a function for pruning tasks in finite-domain
+representation (SASTask) with h^2 mutexes. Usage:
+
+    h2_mutexes.prune_with_h2_mutexes(sas_task, max_time)
+
+The h^2 analysis computes a superset of the pairs of facts that are
+reachable together: all pairs of the initial state, and for every
+operator whose preconditions are pairwise reachable, all pairs of its
+effects and all pairs of an effect with a fact that is reachable
+together with all preconditions and whose variable the operator does
+not change. Facts that are not reachable together are mutex. Unlike
+the invariants used for the fact groups, this analysis also finds
+mutexes that do not follow from counting arguments, e.g., between
+facts that a sequence of actions always makes true in a fixed order.
+
+The function modifies `sas_task` in-place: it removes the operators
+whose preconditions are not reachable together and adds the mutexes
+that are not implied by variables or existing mutex groups to the mutex
+groups. Facts that only these operators achieve are removed afterwards
+by simplify.filter_unreachable_propositions. If the goal facts are not
+reachable together, the function raises simplify.Impossible. If the
+analysis takes more than `max_time` seconds of CPU time, the task is
+left as it is.
+
+Derived variables are ignored: conditions on them count as reachable
+and no mutexes involving them are computed. Effect conditions are
+ignored as well, i.e., conditional effects count as possibly happening
+and possibly not happening. Both make the analysis weaker, but keep it
+sound.
+
+Sets of facts are bitsets stored as Python integers, where fact
+number i is represented by the i-th bit and the facts of each variable
+are numbered consecutively."""
+
+import time
+
+import sas_tasks
+import simplify
+
+# Number of operators to process between checks of the time limit.
+TIME_CHECK_INTERVAL = 1000
+
+
+def _get_bits(bitset):
+    while bitset:
+        lowest_bit = bitset & -bitset
+        yield lowest_bit.bit_length() - 1
+        bitset ^= lowest_bit
+
+
+class H2Analysis:
+    def __init__(self, task):
+        self.task = task
+        ranges = task.variables.ranges
+        axiom_layers = task.variables.axiom_layers
+        self.fact_offsets = []
+        self.var_masks = []
+        # The variable, value and variable mask of each fact.
+        self.facts = []
+        num_facts = 0
+        for var, var_range in enumerate(ranges):
+            self.fact_offsets.append(num_facts)
+            if axiom_layers[var] == -1:
+                var_mask = ((1 << var_range) - 1) << num_facts
+            else:
+                var_mask = 0
+            self.var_masks.append(var_mask)
+            self.facts += [(var, val, var_mask) for val in range(var_range)]
+            num_facts += var_range
+        self.num_facts = num_facts
+        self.operators = [self._get_operator_masks(op)
+                          for op in task.operators]
+        # reachable[fact] is the set of facts that are reachable
+        # together with fact. It contains fact iff fact is reachable.
+        self.reachable = [0] * num_facts
+        self.reachable_facts = 0
+
+    def get_fact(self, var, val):
+        """Return the number of the fact, or None for derived variables."""
+        if not self.var_masks[var]:
+            return None
+        return self.fact_offsets[var] + val
+
+    def get_facts(self, pairs):
+        facts = (self.get_fact(var, val) for var, val in pairs)
+        return [fact for fact in facts if fact is not None]
+
+    def _get_operator_masks(self, op):
+        preconditions = list(op.prevail)
+        preconditions += [(var, pre) for var, pre, _, _ in op.pre_post
+                          if pre != -1]
+        pre_mask = 0
+        for fact in self.get_facts(preconditions):
+            pre_mask |= 1 << fact
+        effects = []
+        effect_mask = 0
+        # The operator makes the facts on these variables false unless
+        # they are effects.
+        changed_mask = 0
+        for var, _, post, cond in op.pre_post:
+            fact = self.get_fact(var, post)
+            effects.append((fact, self.var_masks[var]))
+            effect_mask |= 1 << fact
+            if not cond:
+                changed_mask |= self.var_masks[var]
+        return pre_mask, effects, effect_mask, changed_mask
+
+    def _add_pairs(self, fact, facts):
+        """Mark fact as reachable together with each of the facts."""
+        reachable = self.reachable
+        new_facts = facts & ~reachable[fact]
+        if not new_facts:
+            return False
+        reachable[fact] |= new_facts
+        self.reachable_facts |= 1 << fact
+        fact_bit = 1 << fact
+        for other_fact in _get_bits(new_facts):
+            reachable[other_fact] |= fact_bit
+        return True
+
+    def _get_persisting_facts(self, pre_mask):
+        """Return the facts that are reachable together with all
+        preconditions, or None if the preconditions are not reachable
+        together."""
+        facts = self.reachable_facts
+        for fact in _get_bits(pre_mask):
+            facts &= self.reachable[fact]
+        if facts & pre_mask != pre_mask:
+            return None
+        return facts
+
+    def run(self, max_time):
+        """Compute the reachable pairs. Return False if this takes
+        longer than max_time seconds."""
+        start_time = time.process_time()
+        initial_facts = 0
+        for fact in self.get_facts(enumerate(self.task.init.values)):
+            initial_facts |= 1 << fact
+        for fact in _get_bits(initial_facts):
+            self._add_pairs(fact, initial_facts)
+        # An operator only adds new pairs if the facts that are
+        # reachable together with its preconditions have changed since
+        # we last applied it.
+        last_persisting_facts = [None] * len(self.operators)
+        changed = True
+        while changed:
+            changed = False
+            for op_no, (pre_mask, effects, effect_mask,
+                        changed_mask) in enumerate(self.operators):
+                if (op_no % TIME_CHECK_INTERVAL == 0 and
+                        time.process_time() - start_time > max_time):
+                    return False
+                persisting_facts = self._get_persisting_facts(pre_mask)
+                if (persisting_facts is None or
+                        persisting_facts == last_persisting_facts[op_no]):
+                    continue
+                last_persisting_facts[op_no] = persisting_facts
+                facts = effect_mask | (persisting_facts & ~changed_mask)
+                for fact, var_mask in effects:
+                    if self._add_pairs(fact, (facts & ~var_mask) | 1 << fact):
+                        changed = True
+        return True
+
+    def is_reachable(self, facts):
+        """Test if the facts are pairwise reachable together."""
+        return self._get_persisting_facts(facts) is not None
+
+    def get_mutexes(self):
+        """Return a dict mapping each reachable fact to the set of
+        reachable facts on other variables that are mutex with it."""
+        reachable_facts = self.reachable_facts
+        return {fact: (reachable_facts & ~self.reachable[fact] &
+                       ~self.facts[fact][2])
+                for fact in _get_bits(reachable_facts)}
+
+    def get_mutex_groups(self, known_mutex_groups):
+        """Cover the mutexes that are not implied by the known mutex
+        groups greedily with mutex groups (sets of pairwise mutex
+        facts). Facts on the same variable count as mutex here."""
+        mutexes = self.get_mutexes()
+        covered = [0] * self.num_facts
+        for group in known_mutex_groups:
+            group_mask = 0
+            for fact in self.get_facts(group.facts):
+                group_mask |= 1 << fact
+            for fact in _get_bits(group_mask):
+                covered[fact] |= group_mask
+        groups = []
+        for fact, fact_mutexes in sorted(mutexes.items()):
+            # The pairs with the facts before this one have been covered
+            # when considering those facts. We start a new group with
+            # this fact and an uncovered mutex fact after it until all
+            # pairs are covered, so each group covers a new pair.
+            later_facts = ~((2 << fact) - 1)
+            while True:
+                candidates = fact_mutexes & ~covered[fact] & later_facts
+                if not candidates:
+                    break
+                group_mask = 1 << fact
+                while candidates:
+                    other_fact = (candidates & -candidates).bit_length() - 1
+                    group_mask |= 1 << other_fact
+                    candidates &= ((mutexes[other_fact] |
+                                    self.facts[other_fact][2]) &
+                                   ~(1 << other_fact))
+                group = []
+                for group_fact in _get_bits(group_mask):
+                    covered[group_fact] |= group_mask
+                    var, val, _ = self.facts[group_fact]
+                    group.append((var, val))
+                groups.append(sas_tasks.SASMutexGroup(group))
+        return groups
+
+
+def prune_with_h2_mutexes(task, max_time):
+    analysis = H2Analysis(task)
+    if not analysis.run(max_time):
+        print("Time limit reached, aborting h^2 analysis")
+        return
+    goal_facts = 0
+    for fact in analysis.get_facts(task.goal.pairs):
+        goal_facts |= 1 << fact
+    if not analysis.is_reachable(goal_facts):
+        raise simplify.Impossible
+
+    new_operators = sas_tasks.SASOperatorTable()
+    for op, (pre_mask, _, _, _) in zip(task.operators, analysis.operators):
+        if analysis.is_reachable(pre_mask):
+            new_operators.append(op.name, op.prevail, op.pre_post, op.cost)
+    print("%d operators removed by h^2 mutexes" %
+          (len(task.operators) - len(new_operators)))
+    task.operators = new_operators
+
+    mutex_groups = analysis.get_mutex_groups(task.mutexes)
+    print("%d h^2 mutex groups added" % len(mutex_groups))
+    task.mutexes += mutex_groups
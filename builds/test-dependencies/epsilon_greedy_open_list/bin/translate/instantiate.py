@@ -0,0 +1,307 @@
+#! /usr/bin/env python3
+
+
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import build_model
+import grounded_input
+import options
+import pddl_to_prolog
+import parallel
+import pddl
+import relevance
+import timers
+
+def get_fluent_predicates(task):
+    fluent_predicates = set()
+    for action in task.actions:
+        for effect in action.effects:
+            fluent_predicates.add(effect.literal.predicate)
+    for axiom in task.axioms:
+        fluent_predicates.add(axiom.name)
+    return fluent_predicates
+
+def get_fluent_facts(task, model):
+    fluent_predicates = get_fluent_predicates(task)
+    return {fact for fact in model
+            if fact.predicate in fluent_predicates}
+
+def get_static_first_precondition(action, fluent_predicates):
+    """Return a precondition equivalent to the precondition of the
+    action for all of its instantiations in the model, with static
+    conditions evaluated first.
+
+    Positive static literals are dropped altogether: the exploration
+    rule of the action requires them, so every action atom in the model
+    satisfies them. Negative static literals are checked first, so that
+    impossible instantiations are rejected by a lookup in the initial
+    state before any fluent atom is built. The relative order of the
+    fluent literals is preserved."""
+    precondition = action.precondition
+    if isinstance(precondition, pddl.Conjunction):
+        parts = precondition.parts
+    elif isinstance(precondition, pddl.Literal):
+        parts = (precondition,)
+    else:
+        return precondition
+    if not all(isinstance(part, pddl.Literal) for part in parts):
+        return precondition
+    static_parts = [part for part in parts
+                    if part.predicate not in fluent_predicates]
+    fluent_parts = [part for part in parts
+                    if part.predicate in fluent_predicates]
+    return pddl.Conjunction(
+        [part for part in static_parts if part.negated] + fluent_parts)
+
+def get_objects_by_type(typed_objects, types):
+    result = defaultdict(list)
+    supertypes = {}
+    for type in types:
+        supertypes[type.name] = type.supertype_names
+    for obj in typed_objects:
+        result[obj.type_name].append(obj.name)
+        for type in supertypes[obj.type_name]:
+            result[type].append(obj.name)
+    return result
+
+def instantiate_goal(goal, init_facts, fluent_facts):
+    # With the way this module is designed, we need to "instantiate"
+    # the goal to make sure we properly deal with static conditions,
+    # in particular flagging unreachable negative static goals as
+    # impossible. See issue1055.
+    #
+    # This returns None for goals that are impossible due to static
+    # facts.
+
+    # HACK! The implementation of this probably belongs into
+    # pddl.condition or a similar file, not here. The `instantiate`
+    # method of conditions with its slightly weird interface and the
+    # existence of the `Impossible` exceptions should perhaps be
+    # implementation details of `pddl`.
+    result = []
+    try:
+        goal.instantiate({}, init_facts, fluent_facts, result)
+    except pddl.conditions.Impossible:
+        return None
+    return result
+
+class ActionStream:
+    """Reachable action atoms whose ground actions are only created when
+    the stream is iterated, skipping atoms that cannot be instantiated.
+    This allows translating each ground action and releasing it
+    before the next one is created.
+
+    While iterating, we collect the atoms of derived predicates in the
+    preconditions and effect conditions of the ground actions, which
+    axiom_rules needs, and count the instantiated actions for the
+    grounding statistics. Worker processes that iterate over a chunk of
+    the action atoms need to report these results back (see
+    start_chunk, get_chunk_results and add_chunk_results)."""
+
+    def __init__(self, action_atoms, instantiate_action, derived_predicates,
+                 statistics):
+        self.action_atoms = action_atoms
+        self.instantiate_action = instantiate_action
+        self.derived_predicates = derived_predicates
+        self.statistics = statistics
+        self.derived_condition_atoms = set()
+        # If set, iterating yields None for the action atoms that cannot
+        # be instantiated, so that the result is aligned with the atoms.
+        self.yield_failed = False
+
+    def __len__(self):
+        return len(self.action_atoms)
+
+    def __iter__(self):
+        return self.instantiate(self.action_atoms)
+
+    def instantiate(self, action_atoms):
+        for atom in action_atoms:
+            inst_action = self.instantiate_action(atom)
+            if not inst_action:
+                if self.yield_failed:
+                    yield None
+                continue
+            if self.statistics is not None:
+                self.statistics.count_instantiated(atom.predicate)
+            if self.derived_predicates:
+                self._collect_derived_condition_atoms(inst_action)
+            yield inst_action
+
+    def _collect_derived_condition_atoms(self, action):
+        conditions = [action.precondition]
+        for condition, _ in action.add_effects + action.del_effects:
+            conditions.append(condition)
+        for condition in conditions:
+            for literal in condition:
+                if literal.predicate in self.derived_predicates:
+                    self.derived_condition_atoms.add(literal.positive())
+
+    def start_chunk(self):
+        """Reset the collected results before iterating over a chunk of
+        the action atoms in a worker process."""
+        self.derived_condition_atoms = set()
+        if self.statistics is not None:
+            self.statistics.instantiated_by_schema = Counter()
+
+    def get_chunk_results(self):
+        if self.statistics is None:
+            return self.derived_condition_atoms, None
+        return (self.derived_condition_atoms,
+                self.statistics.instantiated_by_schema)
+
+    def add_chunk_results(self, results):
+        derived_condition_atoms, instantiated_by_schema = results
+        self.derived_condition_atoms |= derived_condition_atoms
+        if instantiated_by_schema is not None:
+            self.statistics.instantiated_by_schema.update(
+                instantiated_by_schema)
+
+# The input task must have been normalized
+# The model has been computed by build_model.compute_model
+# With stream_actions, the actions are returned as an ActionStream that
+# instantiates them while they are translated.
+def instantiate(task: pddl.Task, model: Any, jobs: int = 1,
+                statistics=None, stream_actions: bool = False) -> Tuple[
+             bool, # relaxed_reachable
+             Set[pddl.Literal], # fluent_facts (ground)
+             Union[List[pddl.PropositionalAction],
+                   "ActionStream"], # instantiated_actions
+             Optional[List[pddl.Literal]], # instantiated_goal
+             List[pddl.PropositionalAxiom], # instantiated_axioms
+             Dict[pddl.Action, List[str]] # reachable_action_parameters
+            ]:
+    relaxed_reachable = False
+    fluent_facts = get_fluent_facts(task, model)
+    init_facts = set()
+    init_assignments = {}
+    for element in task.init:
+        if isinstance(element, pddl.Assign):
+            init_assignments[element.fluent] = element.expression
+        else:
+            init_facts.add(element)
+
+    # The objects by type are only needed for universally quantified
+    # effects, which grounded tasks do not have.
+    if grounded_input.is_grounded(task):
+        type_to_objects = {}
+    else:
+        type_to_objects = get_objects_by_type(task.objects, task.types)
+    fluent_predicates = get_fluent_predicates(task)
+    preconditions = {action: get_static_first_precondition(
+                         action, fluent_predicates)
+                     for action in task.actions}
+
+    def instantiate_action(atom):
+        action = atom.predicate
+        variable_mapping = {par.name: arg
+                            for par, arg in zip(action.parameters, atom.args)}
+        return action.instantiate(
+            variable_mapping, init_facts, init_assignments,
+            fluent_facts, type_to_objects,
+            task.use_min_cost_metric, preconditions[action])
+
+    def instantiate_actions(action_atoms):
+        # The result contains None for action atoms that cannot be
+        # instantiated, so that it is aligned with action_atoms.
+        return [instantiate_action(atom) for atom in action_atoms]
+
+    action_atoms = []
+    instantiated_axioms = []
+    reachable_action_parameters = defaultdict(list)
+    for atom in model:
+        if isinstance(atom.predicate, pddl.Action):
+            action = atom.predicate
+            parameters = action.parameters
+            inst_parameters = atom.args[:len(parameters)]
+            # Note: It's important that we use the action object
+            # itself as the key in reachable_action_parameters (rather
+            # than action.name) since we can have multiple different
+            # actions with the same name after normalization, and we
+            # want to distinguish their instantiations.
+            reachable_action_parameters[action].append(inst_parameters)
+            action_atoms.append(atom)
+        elif isinstance(atom.predicate, pddl.Axiom):
+            axiom = atom.predicate
+            variable_mapping = {par.name: arg
+                                for par, arg in zip(axiom.parameters, atom.args)}
+            inst_axiom = axiom.instantiate(variable_mapping, init_facts, fluent_facts)
+            if statistics is not None:
+                statistics.count_reachable(axiom)
+            if inst_axiom:
+                instantiated_axioms.append(inst_axiom)
+                if statistics is not None:
+                    statistics.count_instantiated(axiom)
+        elif atom.predicate == "@goal-reachable":
+            relaxed_reachable = True
+
+    if statistics is not None:
+        for atom in action_atoms:
+            statistics.count_reachable(atom.predicate)
+
+    if stream_actions:
+        derived_predicates = {axiom.name for axiom in task.axioms}
+        instantiated_actions = ActionStream(
+            action_atoms, instantiate_action, derived_predicates, statistics)
+    else:
+        if parallel.can_fork(jobs):
+            inst_actions = []
+            for chunk_result in parallel.map_chunks(
+                    instantiate_actions, action_atoms, jobs):
+                inst_actions += chunk_result
+        else:
+            inst_actions = instantiate_actions(action_atoms)
+        if statistics is not None:
+            for atom, inst_action in zip(action_atoms, inst_actions):
+                if inst_action:
+                    statistics.count_instantiated(atom.predicate)
+        instantiated_actions = [inst_action for inst_action in inst_actions
+                                if inst_action]
+
+    instantiated_goal = instantiate_goal(task.goal, init_facts, fluent_facts)
+
+    return (relaxed_reachable, fluent_facts,
+            instantiated_actions, instantiated_goal,
+            sorted(instantiated_axioms), reachable_action_parameters)
+
+
+def explore(task, relevance_analysis=False, jobs=1, statistics=None,
+            store=None, stream_actions=False):
+    if options.grounded_fast_path and grounded_input.is_grounded(task):
+        print("Task is grounded, computing model without Datalog program")
+        model = grounded_input.compute_model(task, statistics)
+    else:
+        prog = pddl_to_prolog.translate(task)
+        model = build_model.compute_model(prog, statistics, store)
+    if relevance_analysis:
+        with timers.timing("Filtering irrelevant atoms", block=True):
+            model = relevance.filter_irrelevant_atoms(task, model)
+    with timers.timing("Completing instantiation"):
+        return instantiate(task, model, jobs, statistics, stream_actions)
+
+
+if __name__ == "__main__":
+    import pddl_parser
+    task = pddl_parser.open()
+    relaxed_reachable, atoms, actions, goals, axioms, _ = explore(task)
+    print("goal relaxed reachable: %s" % relaxed_reachable)
+    print("%d atoms:" % len(atoms))
+    for atom in atoms:
+        print(" ", atom)
+    print()
+    print("%d actions:" % len(actions))
+    for action in actions:
+        action.dump()
+        print()
+    print("%d axioms:" % len(axioms))
+    for axiom in axioms:
+        axiom.dump()
+        print()
+    print()
+    if goals is None:
+        print("impossible goal")
+    else:
+        print("%d goals:" % len(goals))
+        for literal in goals:
+            literal.dump()
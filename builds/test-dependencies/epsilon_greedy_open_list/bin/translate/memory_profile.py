@@ -0,0 +1,104 @@
+import gc
+from collections import Counter
+import sys
+import tracemalloc
+
+# Number of allocation sites and object types listed in the summary.
+NUM_TOP_ENTRIES = 10
+
+
+def _format_size(size):
+    return "%.1f MB" % (size / 2**20)
+
+
+class Phase:
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.peak = 0
+        self.final_size = None
+
+
+class MemoryProfile:
+    """Record the peak size of the memory allocated by Python in each
+    phase timed with timers.timing, using tracemalloc.
+
+    tracemalloc only has a single peak counter, which is reset whenever
+    a phase begins. Before resetting it, we add the peak reached so far
+    to all open phases, so that the peak of a phase includes the peaks
+    of its subphases. Allocations in forked worker processes are not
+    traced."""
+
+    def __init__(self):
+        self.phases = []
+        self.open_phases = []
+        tracemalloc.start()
+
+    def _update_open_phases(self):
+        peak = tracemalloc.get_traced_memory()[1]
+        for phase in self.open_phases:
+            phase.peak = max(phase.peak, peak)
+
+    def begin_phase(self, name):
+        self._update_open_phases()
+        tracemalloc.reset_peak()
+        phase = Phase(name, len(self.open_phases))
+        self.phases.append(phase)
+        self.open_phases.append(phase)
+
+    def end_phase(self):
+        self._update_open_phases()
+        phase = self.open_phases.pop()
+        phase.final_size = tracemalloc.get_traced_memory()[0]
+
+    def dump(self):
+        """Print the peak memory of the phases, the allocation sites with
+        the most memory and the object types with the most instances.
+        This is also called after running out of memory, where it shows
+        the unfinished phases."""
+        self._update_open_phases()
+        size, peak = tracemalloc.get_traced_memory()
+        print("Memory profile (memory allocated by Python):")
+        for phase in self.phases:
+            if phase.final_size is None:
+                final_size = "unfinished"
+            else:
+                final_size = _format_size(phase.final_size)
+            print("%s%s: peak %s, at end %s" % (
+                "  " * (phase.depth + 1), phase.name,
+                _format_size(phase.peak), final_size))
+        print("  Total: peak %s, current %s" % (
+            _format_size(max([peak] + [phase.peak for phase in self.phases])),
+            _format_size(size)))
+        self.dump_allocation_sites()
+        self.dump_object_types()
+
+    def dump_allocation_sites(self):
+        try:
+            snapshot = tracemalloc.take_snapshot()
+        except MemoryError:
+            print("Not enough memory to list allocation sites.")
+            return
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)])
+        print("Top allocation sites of live memory:")
+        for stat in snapshot.statistics("lineno")[:NUM_TOP_ENTRIES]:
+            frame = stat.traceback[0]
+            print("  %s:%d: %s in %d blocks" % (
+                frame.filename, frame.lineno, _format_size(stat.size),
+                stat.count))
+
+    def dump_object_types(self):
+        # Only objects tracked by the garbage collector are counted, which
+        # excludes for example strings and numbers.
+        counts = Counter()
+        sizes = Counter()
+        for obj in gc.get_objects():
+            name = type(obj).__name__
+            counts[name] += 1
+            sizes[name] += sys.getsizeof(obj)
+        print("Top object types of live objects:")
+        for name, size in sizes.most_common(NUM_TOP_ENTRIES):
+            print("  %s: %s in %d objects" % (
+                name, _format_size(size), counts[name]))
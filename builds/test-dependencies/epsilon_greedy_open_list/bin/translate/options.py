@@ -0,0 +1,202 @@
+import argparse
+import sys
+
+
+def parse_args():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument(
+        "domain", help="path to domain pddl file")
+    argparser.add_argument(
+        "task", help="path to task pddl file")
+    argparser.add_argument(
+        "--relaxed", dest="generate_relaxed_task", action="store_true",
+        help="output relaxed task (no delete effects)")
+    argparser.add_argument(
+        "--full-encoding",
+        dest="use_partial_encoding", action="store_false",
+        help="By default we represent facts that occur in multiple "
+        "mutex groups only in one variable. Using this parameter adds "
+        "these facts to multiple variables. This can make the meaning "
+        "of the variables clearer, but increases the number of facts.")
+    argparser.add_argument(
+        "--invariant-generation-max-candidates", default=100000, type=int,
+        help="max number of candidates for invariant generation "
+        "(default: %(default)d). Set to 0 to disable invariant "
+        "generation and obtain only binary variables. The limit is "
+        "needed for grounded input files that would otherwise produce "
+        "too many candidates.")
+    argparser.add_argument(
+        "--sas-file", default="output.sas",
+        help="path to the SAS output file (default: %(default)s)")
+    argparser.add_argument(
+        "--invariant-generation-max-time", default=300, type=int,
+        help="max time for invariant generation (default: %(default)ds)")
+    argparser.add_argument(
+        "--add-implied-preconditions", action="store_true",
+        help="infer additional preconditions. This setting can cause a "
+        "severe performance penalty due to weaker relevance analysis "
+        "(see issue7).")
+    argparser.add_argument(
+        "--negative-conditions", default="multiply-out",
+        choices=["multiply-out", "derived", "auto"],
+        help="how to translate negative operator preconditions on variables "
+        "with more than two values. 'multiply-out' creates one operator for "
+        "each other value of the variable, which can lead to an exponential "
+        "blow-up. 'derived' introduces a derived variable instead. 'auto' "
+        "picks the encoding with the smaller estimated size for each "
+        "operator (default: %(default)s).")
+    argparser.add_argument(
+        "--max-dnf-disjuncts", type=int, default=None,
+        help="when bringing a condition into disjunctive normal form would "
+        "create more than this many disjuncts, introduce derived predicates "
+        "for disjunctions nested in conjunctions instead. Each disjunct "
+        "becomes a separate action, effect or axiom. By default, the number "
+        "of disjuncts is not limited.")
+    argparser.add_argument(
+        "--jobs", default=1, type=int,
+        help="number of worker processes used for instantiating actions and "
+        "translating operators (default: %(default)d). Requires support for "
+        "forking processes; otherwise, the translator runs serially. The "
+        "output is the same as for the serial run.")
+    argparser.add_argument(
+        "--parallel-invariant-synthesis", action="store_true",
+        help="check the invariant candidates in the worker processes given by "
+        "--jobs. The invariant synthesis then makes its random choices for "
+        "each candidate separately, so the output does not depend on the "
+        "number of jobs, but can differ from the output without this option "
+        "in rare cases. The time limit for invariant generation refers to "
+        "the CPU time of all processes.")
+    argparser.add_argument(
+        "--out-of-core-grounding", action="store_true",
+        help="keep the atoms computed during grounding and the indexes used "
+        "to compute them in a temporary database on disk (in the directory "
+        "given by the TMPDIR environment variable) instead of in memory. "
+        "This is slower, but can ground tasks whose relaxed reachable atoms "
+        "do not fit into memory.")
+    argparser.add_argument(
+        "--out-of-core-memory-budget", default=512, type=int, metavar="MB",
+        help="memory in MB used for caching the database of "
+        "--out-of-core-grounding (default: %(default)d)")
+    argparser.add_argument(
+        "--streaming-translation", action="store_true",
+        help="instantiate the actions only after computing the fact groups "
+        "and translate each ground action to SAS+ operators right away, "
+        "so that the ground actions are never held in memory all at once. "
+        "The output is the same as without this option. Ignored with "
+        "--dump-task.")
+    argparser.add_argument(
+        "--translation-cache", metavar="DIR",
+        help="reuse the invariants and translated operators of an earlier "
+        "translation of a task with the same domain, objects and static "
+        "facts, but a different initial state or goal, and store the "
+        "results of this translation in DIR. The grounding is always "
+        "computed again, and the cached results are only used if they are "
+        "still valid, so the output is the same as without this option. "
+        "Implies --streaming-translation. Ignored with --dump-task, "
+        "--explain-grounding and --explain-grounding-json.")
+    argparser.add_argument(
+        "--relevance-analysis", action="store_true",
+        help="only ground actions and axioms that can contribute to reaching "
+        "the goal, as determined by a backward relevance analysis")
+    argparser.add_argument(
+        "--keep-unreachable-facts",
+        dest="filter_unreachable_facts", action="store_false",
+        help="keep facts that can't be reached from the initial state")
+    argparser.add_argument(
+        "--skip-grounded-fast-path",
+        dest="grounded_fast_path", action="store_false",
+        help="process tasks whose actions and axioms have no parameters like "
+        "all other tasks, i.e., compute the reachable atoms with a Datalog "
+        "program and synthesize lifted invariants, instead of using "
+        "reachability and invariant synthesis on ground atoms")
+    argparser.add_argument(
+        "--skip-variable-reordering",
+        dest="reorder_variables", action="store_false",
+        help="do not reorder variables based on the causal graph. Do not use "
+        "this option with the causal graph heuristic!")
+    argparser.add_argument(
+        "--keep-unimportant-variables",
+        dest="filter_unimportant_vars", action="store_false",
+        help="keep variables that do not influence the goal in the causal graph")
+    argparser.add_argument(
+        "--h2-mutexes", action="store_true",
+        help="compute h^2 mutexes on the SAS task, remove the operators "
+        "whose preconditions they make unreachable (and with them facts that "
+        "become unreachable) and add them to the mutex groups of the output")
+    argparser.add_argument(
+        "--h2-max-time", default=60, type=int,
+        help="max CPU time for computing h^2 mutexes. If it is exceeded, the "
+        "task is not changed. (default: %(default)ds)")
+    argparser.add_argument(
+        "--prune-dominated-operators", action="store_true",
+        help="remove operators that are identical to an earlier operator "
+        "except for their names, or that have the same effects as another "
+        "operator with a subset of their preconditions and at most their "
+        "cost. Requires --pruned-operators-file.")
+    argparser.add_argument(
+        "--pruned-operators-file", metavar="FILE",
+        help="write the operators removed by --prune-dominated-operators "
+        "together with the operators that replace them to FILE in JSON "
+        "format, so that plans can be mapped to the removed operators")
+    argparser.add_argument(
+        "--dump-task", action="store_true",
+        help="dump human-readable SAS+ representation of the task")
+    argparser.add_argument(
+        "--trace", metavar="FILE",
+        help="write wall-clock and CPU time, memory usage and object counts "
+        "of the translator phases to FILE")
+    argparser.add_argument(
+        "--trace-format", default="json", choices=["json", "chrome"],
+        help="format of the trace file. 'json' writes the tree of phases, "
+        "'chrome' writes events in the Chrome trace event format, which can "
+        "be viewed in chrome://tracing or Perfetto (default: %(default)s)")
+    argparser.add_argument(
+        "--memory-profile", action="store_true",
+        help="trace the memory allocated by Python and print the peak memory "
+        "of each phase, the top allocation sites and the top object types at "
+        "the end or when running out of memory. This slows down the "
+        "translator considerably. Memory allocated in worker processes "
+        "(see --jobs) is not traced.")
+    argparser.add_argument(
+        "--estimate-only", action="store_true",
+        help="only estimate the numbers of ground atoms, operators and axioms "
+        "from the sizes of the types and static relations, print them and "
+        "stop without grounding the task or writing the output file")
+    argparser.add_argument(
+        "--max-estimated-operators", type=int, metavar="N",
+        help="estimate the number of operators as for --estimate-only before "
+        "grounding and stop with exit code 25 (TRANSLATE_TASK_TOO_LARGE) if "
+        "the estimate exceeds N")
+    argparser.add_argument(
+        "--explain-grounding", action="store_true",
+        help="print tables of the atoms per predicate, the firings and "
+        "matches per rule of the Datalog program used for grounding, and "
+        "the reachable and instantiated actions and axioms per schema")
+    argparser.add_argument(
+        "--explain-grounding-json", metavar="FILE",
+        help="write the statistics of --explain-grounding (for all "
+        "predicates, rules and schemas) to FILE in JSON format")
+    argparser.add_argument(
+        "--layer-strategy", default="min", choices=["min", "max"],
+        help="How to assign layers to derived variables. 'min' attempts to put as "
+        "many variables into the same layer as possible, while 'max' puts each variable "
+        "into its own layer unless it is part of a cycle.")
+    args = argparser.parse_args()
+    if args.prune_dominated_operators and not args.pruned_operators_file:
+        argparser.error("--prune-dominated-operators requires "
+                        "--pruned-operators-file")
+    return args
+
+
+def copy_args_to_module(args):
+    module_dict = sys.modules[__name__].__dict__
+    for key, value in vars(args).items():
+        module_dict[key] = value
+
+
+def setup():
+    args = parse_args()
+    copy_args_to_module(args)
+
+
+setup()
@@ -0,0 +1,159 @@
+import copy
+from typing import List, Optional, Tuple
+
+from . import conditions
+from .conditions import Condition, Literal
+from .effects import Effect
+from .f_expression import Increase
+from .pddl_types import TypedObject
+
+
+class Action:
+    def __init__(self, name: str, parameters: List[TypedObject],
+            num_external_parameters: int,
+            precondition: Condition, effects: List[Effect],
+            cost: Optional[Increase]):
+        assert 0 <= num_external_parameters <= len(parameters)
+        self.name = name
+        self.parameters = parameters
+        # num_external_parameters denotes how many of the parameters
+        # are "external", i.e., should be part of the grounded action
+        # name. Usually all parameters are external, but "invisible"
+        # parameters can be created when compiling away existential
+        # quantifiers in conditions.
+        self.num_external_parameters = num_external_parameters
+        self.precondition = precondition
+        self.effects = effects
+        self.cost = cost
+        self.uniquify_variables() # TODO: uniquify variables in cost?
+
+    def __repr__(self):
+        return "<Action %r at %#x>" % (self.name, id(self))
+
+    def dump(self):
+        print("%s(%s)" % (self.name, ", ".join(map(str, self.parameters))))
+        print("Precondition:")
+        self.precondition.dump()
+        print("Effects:")
+        for eff in self.effects:
+            eff.dump()
+        print("Cost:")
+        if self.cost:
+            self.cost.dump()
+        else:
+            print("  None")
+
+    def uniquify_variables(self):
+        self.type_map = {par.name: par.type_name for par in self.parameters}
+        self.precondition = self.precondition.uniquify_variables(self.type_map)
+        for effect in self.effects:
+            effect.uniquify_variables(self.type_map)
+
+    def relaxed(self):
+        new_effects = []
+        for eff in self.effects:
+            relaxed_eff = eff.relaxed()
+            if relaxed_eff:
+                new_effects.append(relaxed_eff)
+        return Action(self.name, self.parameters, self.num_external_parameters,
+                      self.precondition.relaxed().simplified(),
+                      new_effects)
+
+    def untyped(self):
+        # We do not actually remove the types from the parameter lists,
+        # just additionally incorporate them into the conditions.
+        # Maybe not very nice.
+        result = copy.copy(self)
+        parameter_atoms = [par.to_untyped_strips() for par in self.parameters]
+        new_precondition = self.precondition.untyped()
+        result.precondition = conditions.Conjunction(parameter_atoms + [new_precondition])
+        result.effects = [eff.untyped() for eff in self.effects]
+        return result
+
+    def instantiate(self, var_mapping, init_facts, init_assignments,
+                    fluent_facts, objects_by_type, metric,
+                    precondition=None):
+        """Return a PropositionalAction which corresponds to the instantiation of
+        this action with the arguments in var_mapping. Only fluent parts of the
+        conditions (those in fluent_facts) are included. init_facts are evaluated
+        while instantiating.
+        Precondition and effect conditions must be normalized for this to work.
+        If given, precondition is evaluated instead of self.precondition. It
+        must be equivalent to it for all instantiations that are considered.
+        Returns None if var_mapping does not correspond to a valid instantiation
+        (because it has impossible preconditions or an empty effect list.)"""
+        arg_list = [var_mapping[par.name]
+                    for par in self.parameters[:self.num_external_parameters]]
+
+        if precondition is None:
+            precondition = self.precondition
+        inst_precondition = []
+        try:
+            precondition.instantiate(var_mapping, init_facts,
+                                     fluent_facts, inst_precondition)
+        except conditions.Impossible:
+            return None
+        effects = []
+        for eff in self.effects:
+            eff.instantiate(var_mapping, init_facts, fluent_facts,
+                            objects_by_type, effects)
+        if effects:
+            if metric:
+                if self.cost is None:
+                    cost = 0
+                else:
+                    cost = int(self.cost.instantiate(
+                        var_mapping, init_assignments).expression.value)
+            else:
+                cost = 1
+            return PropositionalAction(self.name, inst_precondition, effects,
+                                       cost, arg_list)
+        else:
+            return None
+
+
+class PropositionalAction:
+    __slots__ = ["_name", "_args", "precondition", "add_effects",
+                 "del_effects", "cost"]
+
+    def __init__(self, name: str, precondition: List[Literal], effects:
+            List[Tuple[List[Literal], Literal]], cost: int,
+            args: Optional[List[str]] = None):
+        # If args is given, name is the name of the action schema, and
+        # the name of the ground action is only built when it is needed.
+        self._name = name
+        self._args = args
+        self.precondition = precondition
+        self.add_effects = []
+        self.del_effects = []
+        add_effects = set()
+        for condition, effect in effects:
+            if not effect.negated:
+                self.add_effects.append((condition, effect))
+                add_effects.add((tuple(condition), effect))
+        for condition, effect in effects:
+            if effect.negated:
+                atom = conditions.intern_literal(effect.negate())
+                if (tuple(condition), atom) not in add_effects:
+                    self.del_effects.append((condition, atom))
+        self.cost = cost
+
+    @property
+    def name(self):
+        if self._args is not None:
+            self._name = "(%s %s)" % (self._name, " ".join(self._args))
+            self._args = None
+        return self._name
+
+    def __repr__(self):
+        return "<PropositionalAction %r at %#x>" % (self.name, id(self))
+
+    def dump(self):
+        print(self.name)
+        for fact in self.precondition:
+            print("PRE: %s" % fact)
+        for cond, fact in self.add_effects:
+            print("ADD: %s -> %s" % (", ".join(map(str, cond)), fact))
+        for cond, fact in self.del_effects:
+            print("DEL: %s -> %s" % (", ".join(map(str, cond)), fact))
+        print("cost:", self.cost)
@@ -0,0 +1,205 @@
+"""Disk-backed storage for the atoms computed during grounding.
+
+In the default mode, build_model keeps all atoms of the model in memory
+twice (in the queue and in the set of enqueued atoms) and the join
+rules keep indexes of all atoms that matched their conditions. For
+tasks with tens of millions of atoms, this does not fit into memory.
+With a RelationStore, these structures live in a temporary sqlite
+database instead:
+
+- DiskQueue stores the atoms in a table whose row ids give the queue
+  order. A uniqueness constraint on the atoms replaces the set of
+  enqueued atoms. A set of recently pushed atoms, which is cleared when
+  it reaches its size limit, answers most duplicate pushes without a
+  database query.
+- DiskJoinIndex stores the index of one condition of a join rule.
+- DiskModel gives sequential and random access to the computed model,
+  which is what instantiate and the relevance analysis need.
+
+Predicates (which can be action and axiom objects) are mapped to
+numbers in memory. Arguments are stored as a single string separated
+by spaces, which cannot occur in PDDL names.
+
+The memory budget is split between the page cache of sqlite and the
+set of recently pushed atoms. Everything else that build_model and
+instantiate keep in memory (rules, static atoms, ground actions) is
+not affected."""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pddl
+
+# Rough number of bytes used by an entry of the set of recently pushed
+# atoms, and number of rows fetched at a time when reading atoms.
+BYTES_PER_CACHED_ATOM = 200
+BATCH_SIZE = 10000
+
+
+def _encode_args(args):
+    return " ".join(args)
+
+
+def _decode_args(encoded_args):
+    # Interning the names makes the decoded atoms share the strings
+    # with each other and with the rest of the task.
+    if not encoded_args:
+        return []
+    return [sys.intern(arg) for arg in encoded_args.split(" ")]
+
+
+class RelationStore:
+    def __init__(self, memory_budget_mb, directory=None):
+        self.directory = tempfile.TemporaryDirectory(
+            prefix="translate-", dir=directory)
+        self.connection = sqlite3.connect(
+            os.path.join(self.directory.name, "relations.db"),
+            isolation_level=None)
+        budget_kb = memory_budget_mb * 1024
+        # A negative cache size is interpreted as a size in KB.
+        self.connection.execute("PRAGMA cache_size = %d" % -(budget_kb // 2))
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute("PRAGMA temp_store = FILE")
+        self.connection.execute("BEGIN")
+        self.max_cached_atoms = max(
+            budget_kb * 1024 // 2 // BYTES_PER_CACHED_ATOM, 1)
+        self.predicates = []
+        self.predicate_ids = {}
+        self.num_join_indexes = 0
+
+    def close(self):
+        self.connection.close()
+        self.directory.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_predicate_id(self, predicate):
+        predicate_id = self.predicate_ids.get(predicate)
+        if predicate_id is None:
+            predicate_id = len(self.predicates)
+            self.predicates.append(predicate)
+            self.predicate_ids[predicate] = predicate_id
+        return predicate_id
+
+    def create_queue(self, atoms):
+        return DiskQueue(self, atoms)
+
+    def create_join_index(self, predicate):
+        index_id = self.num_join_indexes
+        self.num_join_indexes += 1
+        if index_id == 0:
+            self.connection.execute(
+                "CREATE TABLE join_atoms (index_id INTEGER, key TEXT, "
+                "args TEXT)")
+            self.connection.execute(
+                "CREATE INDEX join_atoms_by_key ON join_atoms "
+                "(index_id, key)")
+        return DiskJoinIndex(self.connection, index_id, predicate)
+
+
+class DiskQueue:
+    """Replacement for build_model.Queue. The atoms that have been
+    pushed are available as the sequence self.queue."""
+
+    def __init__(self, store, atoms):
+        self.store = store
+        self.connection = store.connection
+        self.connection.execute(
+            "CREATE TABLE atoms (id INTEGER PRIMARY KEY, predicate INTEGER, "
+            "args TEXT, UNIQUE (predicate, args))")
+        self.queue = DiskModel(store)
+        self.recently_pushed = set()
+        self.num_pushes = 0
+        for atom in atoms:
+            self.push(atom.predicate, atom.args)
+        self.popped = []
+        self.popped_pos = 0
+        self.queue_pos = 0
+
+    def __bool__(self):
+        return self.queue_pos < len(self.queue)
+    __nonzero__ = __bool__
+
+    def push(self, predicate, args):
+        self.num_pushes += 1
+        key = (self.store.get_predicate_id(predicate), _encode_args(args))
+        if key in self.recently_pushed:
+            return
+        if len(self.recently_pushed) >= self.store.max_cached_atoms:
+            self.recently_pushed.clear()
+        self.recently_pushed.add(key)
+        cursor = self.connection.execute(
+            "INSERT OR IGNORE INTO atoms (predicate, args) VALUES (?, ?)", key)
+        if cursor.rowcount > 0:
+            self.queue.length += 1
+
+    def pop(self):
+        if self.popped_pos == len(self.popped):
+            self.popped = self.queue.get_range(
+                self.queue_pos, self.queue_pos + BATCH_SIZE)
+            self.popped_pos = 0
+        result = self.popped[self.popped_pos]
+        self.popped_pos += 1
+        self.queue_pos += 1
+        return result
+
+
+class DiskModel:
+    """Read-only sequence of the atoms in the queue table."""
+
+    def __init__(self, store):
+        self.store = store
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def get_range(self, begin, end):
+        # Row ids start at 1 and have no gaps because rows are never
+        # deleted.
+        rows = self.store.connection.execute(
+            "SELECT predicate, args FROM atoms WHERE id > ? AND id <= ? "
+            "ORDER BY id", (begin, end))
+        predicates = self.store.predicates
+        return [pddl.Atom(predicates[predicate], _decode_args(args))
+                for predicate, args in rows]
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+        return self.get_range(index, index + 1)[0]
+
+    def __iter__(self):
+        for begin in range(0, self.length, BATCH_SIZE):
+            yield from self.get_range(begin, begin + BATCH_SIZE)
+
+
+class DiskJoinIndex:
+    """Replacement for the dicts mapping the values of the join
+    variables to the matching atoms in build_model.JoinRule. Only the
+    arguments of the atoms are stored, since the predicate is that of
+    the indexed condition."""
+
+    def __init__(self, connection, index_id, predicate):
+        self.connection = connection
+        self.index_id = index_id
+        self.predicate = predicate
+
+    def add(self, key, atom):
+        self.connection.execute(
+            "INSERT INTO join_atoms (index_id, key, args) VALUES (?, ?, ?)",
+            (self.index_id, _encode_args(key), _encode_args(atom.args)))
+
+    def get(self, key, default=None):
+        rows = self.connection.execute(
+            "SELECT args FROM join_atoms WHERE index_id = ? AND key = ?",
+            (self.index_id, _encode_args(key)))
+        return [pddl.Atom(self.predicate, _decode_args(args))
+                for args, in rows]
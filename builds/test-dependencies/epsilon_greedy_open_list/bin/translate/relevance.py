@@ -0,0 +1,224 @@
+#! /usr/bin/env python3
+
+# Backward relevance analysis.
+#
+# An action is relevant if it can add a fact whose truth matters for
+# reaching the goal or delete a fact whose falsity matters, and the
+# conditions of relevant actions matter in turn. Derived predicates
+# matter in both directions, so an axiom is relevant if its head
+# matters and its body then matters with the same (head true) or the
+# opposite (head false) polarity. All other actions and axioms can
+# be dropped without losing any plans.
+#
+# The analysis is run twice: a lifted, predicate-level pass that
+# removes whole action schemas and axioms from the normalized task
+# before the Datalog program is generated, and a ground pass over the
+# relaxed reachable model that removes irrelevant action and axiom
+# atoms before they are instantiated.
+#
+# Relevance is tracked for (negated, x) keys, where x is a predicate
+# in the lifted pass and a ground atom in the ground pass, and
+# negated tells whether the fact must be made false (True) or true
+# (False).
+
+from collections import defaultdict
+
+import pddl
+
+
+def get_literals(condition):
+    if isinstance(condition, pddl.Literal):
+        return [condition]
+    result = []
+    for part in condition.parts:
+        result += get_literals(part)
+    return result
+
+
+def get_condition_literals(action):
+    result = get_literals(action.precondition)
+    for effect in action.effects:
+        result += get_literals(effect.condition)
+    return result
+
+
+def prune_irrelevant_schemas(task):
+    """Remove actions and axioms from the normalized task whose effects
+    cannot contribute to the goal on the level of predicates."""
+    relevant = set()
+    queue = []
+    def mark(negated, predicate):
+        key = (negated, predicate)
+        if key not in relevant:
+            relevant.add(key)
+            queue.append(key)
+
+    achievers = defaultdict(list)
+    for action in task.actions:
+        for effect in action.effects:
+            literal = effect.literal
+            achievers[(literal.negated, literal.predicate)].append(action)
+    axioms_by_name = defaultdict(list)
+    for axiom in task.axioms:
+        axioms_by_name[axiom.name].append(axiom)
+
+    for literal in get_literals(task.goal):
+        mark(literal.negated, literal.predicate)
+
+    relevant_actions = set()
+    while queue:
+        negated, predicate = queue.pop()
+        for action in achievers[(negated, predicate)]:
+            if action not in relevant_actions:
+                relevant_actions.add(action)
+                for literal in get_condition_literals(action):
+                    mark(literal.negated, literal.predicate)
+        for axiom in axioms_by_name[predicate]:
+            for literal in get_literals(axiom.condition):
+                mark(literal.negated != negated, literal.predicate)
+
+    num_actions = len(task.actions)
+    num_axioms = len(task.axioms)
+    task.actions = [action for action in task.actions
+                    if action in relevant_actions]
+    task.axioms = [axiom for axiom in task.axioms
+                   if (False, axiom.name) in relevant or
+                   (True, axiom.name) in relevant]
+    print("%d of %d action schemas relevant" % (len(task.actions), num_actions))
+    print("%d of %d axiom schemas relevant" % (len(task.axioms), num_axioms))
+
+
+def _ground_literal(literal, var_mapping, free_variables):
+    """Return the key of the literal grounded with var_mapping, or the
+    predicate-level key if it mentions one of the free_variables."""
+    if any(arg in free_variables for arg in literal.args):
+        return literal.negated, literal.predicate, None
+    args = [var_mapping.get(arg, arg) for arg in literal.args]
+    return literal.negated, literal.predicate, pddl.Atom(literal.predicate, args)
+
+
+class _GroundRelevance:
+    def __init__(self):
+        self.relevant = set()
+        self.relevant_predicates = set()
+        # Nodes are model atom indices for actions and (index, negated)
+        # pairs for axioms, whose conditions depend on the polarity in
+        # which their head matters.
+        self.relevant_nodes = set()
+        self.queue = []
+        # Nodes that can achieve a given (negated, atom) key, nodes
+        # whose effect mentions universally quantified variables and
+        # is therefore only known on the level of (negated, predicate),
+        # and all nodes that can achieve some key of a given (negated,
+        # predicate) pair.
+        self.achievers = defaultdict(list)
+        self.unbound_achievers = defaultdict(list)
+        self.achievers_by_predicate = defaultdict(list)
+
+    def add_achiever(self, node, key):
+        negated, predicate, atom = key
+        if atom is not None:
+            self.achievers[(negated, atom)].append(node)
+        else:
+            self.unbound_achievers[(negated, predicate)].append(node)
+        self.achievers_by_predicate[(negated, predicate)].append(node)
+
+    def mark(self, key):
+        negated, predicate, atom = key
+        if atom is None:
+            if (negated, predicate) not in self.relevant_predicates:
+                self.relevant_predicates.add((negated, predicate))
+                self._make_relevant(
+                    self.achievers_by_predicate[(negated, predicate)])
+        elif (negated, atom) not in self.relevant:
+            self.relevant.add((negated, atom))
+            self._make_relevant(self.achievers[(negated, atom)])
+            self._make_relevant(self.unbound_achievers[(negated, predicate)])
+
+    def _make_relevant(self, nodes):
+        for node in nodes:
+            if node not in self.relevant_nodes:
+                self.relevant_nodes.add(node)
+                self.queue.append(node)
+
+
+def _get_action_conditions(action, atom):
+    var_mapping = {par.name: arg
+                   for par, arg in zip(action.parameters, atom.args)}
+    result = [_ground_literal(literal, var_mapping, ())
+              for literal in get_literals(action.precondition)]
+    for effect in action.effects:
+        effect_vars = {par.name for par in effect.parameters}
+        result += [_ground_literal(literal, var_mapping, effect_vars)
+                   for literal in get_literals(effect.condition)]
+    return result
+
+
+def _get_axiom_conditions(axiom, atom, head_negated):
+    var_mapping = {par.name: arg
+                   for par, arg in zip(axiom.parameters, atom.args)}
+    result = []
+    for literal in get_literals(axiom.condition):
+        negated, predicate, ground_atom = _ground_literal(
+            literal, var_mapping, ())
+        result.append((negated != head_negated, predicate, ground_atom))
+    return result
+
+
+def filter_irrelevant_atoms(task, model):
+    """Return the model without the action and axiom atoms that cannot
+    contribute to reaching the goal."""
+    analysis = _GroundRelevance()
+    for atom_no, atom in enumerate(model):
+        if isinstance(atom.predicate, pddl.Action):
+            action = atom.predicate
+            var_mapping = {par.name: arg
+                           for par, arg in zip(action.parameters, atom.args)}
+            for effect in action.effects:
+                effect_vars = {par.name for par in effect.parameters}
+                analysis.add_achiever(atom_no, _ground_literal(
+                    effect.literal, var_mapping, effect_vars))
+        elif isinstance(atom.predicate, pddl.Axiom):
+            axiom = atom.predicate
+            head = pddl.Atom(axiom.name,
+                             atom.args[:axiom.num_external_parameters])
+            for negated in [False, True]:
+                analysis.add_achiever((atom_no, negated),
+                                      (negated, axiom.name, head))
+
+    for literal in get_literals(task.goal):
+        analysis.mark(_ground_literal(literal, {}, ()))
+    while analysis.queue:
+        node = analysis.queue.pop()
+        if isinstance(node, tuple):
+            atom_no, negated = node
+            atom = model[atom_no]
+            keys = _get_axiom_conditions(atom.predicate, atom, negated)
+        else:
+            atom = model[node]
+            keys = _get_action_conditions(atom.predicate, atom)
+        for key in keys:
+            analysis.mark(key)
+
+    result = []
+    num_actions = num_relevant_actions = 0
+    num_axioms = num_relevant_axioms = 0
+    for atom_no, atom in enumerate(model):
+        if isinstance(atom.predicate, pddl.Action):
+            num_actions += 1
+            if atom_no not in analysis.relevant_nodes:
+                continue
+            num_relevant_actions += 1
+        elif isinstance(atom.predicate, pddl.Axiom):
+            num_axioms += 1
+            if ((atom_no, False) not in analysis.relevant_nodes and
+                    (atom_no, True) not in analysis.relevant_nodes):
+                continue
+            num_relevant_axioms += 1
+        result.append(atom)
+    print("%d of %d ground actions relevant (%d avoided)" % (
+        num_relevant_actions, num_actions,
+        num_actions - num_relevant_actions))
+    print("%d of %d ground axioms relevant (%d avoided)" % (
+        num_relevant_axioms, num_axioms, num_axioms - num_relevant_axioms))
+    return result
@@ -0,0 +1,732 @@
+from array import array
+from itertools import compress, repeat
+from typing import Iterable, List, Tuple
+
+SAS_FILE_VERSION = 3
+
+# Number of operators or axioms that are serialized into one string
+# before it is written to the output stream.
+OUTPUT_CHUNK_SIZE = 10000
+
+DEBUG = False
+
+VarValPair = Tuple[int, int]
+
+class SASTask:
+    """Planning task in finite-domain representation.
+
+    The user is responsible for making sure that the data fits a
+    number of structural restrictions. For example, conditions should
+    generally be sorted and mention each variable at most once. See
+    the validate methods for details."""
+
+    def __init__(self,
+                 variables: "SASTask",
+                 mutexes: List["SASMutexGroup"],
+                 init: "SASInit",
+                 goal: "SASGoal",
+                 operators: Iterable["SASOperator"],
+                 axioms: List["SASAxiom"],
+                 metric: bool) -> None:
+        self.variables = variables
+        self.mutexes = mutexes
+        self.init = init
+        self.goal = goal
+        self.operators = SASOperatorTable(sorted(operators, key=lambda op: (
+            op.name, op.prevail, op.pre_post)))
+        self.axioms = sorted(axioms, key=lambda axiom: (
+            axiom.condition, axiom.effect))
+        self.metric = metric
+        if DEBUG:
+            self.validate()
+
+    def validate(self):
+        """Fail an assertion if the task is invalid.
+
+        A task is valid if all its components are valid. Valid tasks
+        are almost in a kind of "canonical form", but not quite. For
+        example, operators and axioms are permitted to be listed in
+        any order, even though it would be possible to require some
+        kind of canonical sorting.
+
+        Note that we require that all derived variables are binary.
+        This is stricter than what later parts of the planner are
+        supposed to handle, but some parts of the translator rely on
+        this. We might want to consider making this a general
+        requirement throughout the planner.
+
+        Note also that there is *no* general rule on what the init (=
+        fallback) value of a derived variable is. For example, in
+        PSR-Large #1, it can be either 0 or 1. While it is "usually"
+        1, code should not rely on this.
+        """
+        self.variables.validate()
+        for mutex in self.mutexes:
+            mutex.validate(self.variables)
+        self.init.validate(self.variables)
+        self.goal.validate(self.variables)
+        self.operators.validate(self.variables)
+        for axiom in self.axioms:
+            axiom.validate(self.variables, self.init)
+        assert self.metric is False or self.metric is True, self.metric
+
+    def dump(self):
+        print("variables:")
+        self.variables.dump()
+        print("%d mutex groups:" % len(self.mutexes))
+        for mutex in self.mutexes:
+            print("group:")
+            mutex.dump()
+        print("init:")
+        self.init.dump()
+        print("goal:")
+        self.goal.dump()
+        print("%d operators:" % len(self.operators))
+        for operator in self.operators:
+            operator.dump()
+        print("%d axioms:" % len(self.axioms))
+        for axiom in self.axioms:
+            axiom.dump()
+        print("metric: %s" % self.metric)
+
+    def output(self, stream):
+        # Each part of the task is serialized into a string with
+        # str.join, and the strings for the operators and axioms are
+        # written in chunks, so the output is streamed without holding
+        # the whole file in memory.
+        stream.write("begin_version\n%d\nend_version\n"
+                     "begin_metric\n%d\nend_metric\n" % (
+                         SAS_FILE_VERSION, int(self.metric)))
+        self.variables.output(stream)
+        self._output_chunked(stream, self.mutexes)
+        self.init.output(stream)
+        self.goal.output(stream)
+        stream.write("%d\n" % len(self.operators))
+        for start in range(0, len(self.operators), OUTPUT_CHUNK_SIZE):
+            stream.write(self.operators.get_output(
+                start, min(start + OUTPUT_CHUNK_SIZE, len(self.operators))))
+        self._output_chunked(stream, self.axioms)
+
+    @staticmethod
+    def _output_chunked(stream, parts):
+        stream.write("%d\n" % len(parts))
+        for start in range(0, len(parts), OUTPUT_CHUNK_SIZE):
+            stream.write("".join([
+                part.get_output()
+                for part in parts[start:start + OUTPUT_CHUNK_SIZE]]))
+
+    def get_encoding_size(self):
+        task_size = 0
+        task_size += self.variables.get_encoding_size()
+        for mutex in self.mutexes:
+            task_size += mutex.get_encoding_size()
+        task_size += self.goal.get_encoding_size()
+        task_size += self.operators.get_encoding_size()
+        for axiom in self.axioms:
+            task_size += axiom.get_encoding_size()
+        return task_size
+
+
+class SASVariables:
+    def __init__(self, ranges: List[int], axiom_layers: List[int],
+                 value_names: List[List[str]]) -> None:
+        self.ranges = ranges
+        self.axiom_layers = axiom_layers
+        self.value_names = value_names
+
+    def validate(self):
+        """Validate variables.
+
+        All variables must have range at least 2, and derived
+        variables must have range exactly 2. See comment on derived
+        variables in the docstring of SASTask.validate.
+        """
+        assert len(self.ranges) == len(self.axiom_layers) == len(
+            self.value_names)
+        for (var_range, layer, var_value_names) in zip(
+                self.ranges, self.axiom_layers, self.value_names):
+            assert var_range == len(var_value_names)
+            assert var_range >= 2
+            assert layer == -1 or layer >= 0
+            if layer != -1:
+                assert var_range == 2
+
+    def validate_fact(self, fact):
+        """Assert that fact is a valid (var, value) pair."""
+        var, value = fact
+        assert 0 <= var < len(self.ranges)
+        assert 0 <= value < self.ranges[var]
+
+    def validate_condition(self, condition):
+        """Assert that the condition (list of facts) is sorted, mentions each
+        variable at most once, and only consists of valid facts."""
+        last_var = -1
+        for (var, value) in condition:
+            self.validate_fact((var, value))
+            assert var > last_var
+            last_var = var
+
+    def dump(self):
+        for var, (rang, axiom_layer) in enumerate(
+                zip(self.ranges, self.axiom_layers)):
+            if axiom_layer != -1:
+                axiom_str = " [axiom layer %d]" % axiom_layer
+            else:
+                axiom_str = ""
+            print("v%d in {%s}%s" % (var, list(range(rang)), axiom_str))
+
+    def output(self, stream):
+        lines = [str(len(self.ranges))]
+        for var, (rang, axiom_layer, values) in enumerate(zip(
+                self.ranges, self.axiom_layers, self.value_names)):
+            assert rang == len(values), (rang, values)
+            lines.append("begin_variable\nvar%d\n%d\n%d" % (
+                var, axiom_layer, rang))
+            lines.extend(values)
+            lines.append("end_variable")
+        lines.append("")
+        stream.write("\n".join(lines))
+
+    def get_encoding_size(self):
+        # A variable with range k has encoding size k + 1 to also give the
+        # variable itself some weight.
+        return len(self.ranges) + sum(self.ranges)
+
+
+class SASMutexGroup:
+    def __init__(self, facts: List[VarValPair]):
+        self.facts = sorted(facts)
+
+    def validate(self, variables):
+        """Assert that the facts in the mutex group are sorted and unique
+        and that they are all valid."""
+        for fact in self.facts:
+            variables.validate_fact(fact)
+        assert self.facts == sorted(set(self.facts))
+
+    def dump(self):
+        for var, val in self.facts:
+            print("v%d: %d" % (var, val))
+
+    def output(self, stream):
+        stream.write(self.get_output())
+
+    def get_output(self):
+        return "begin_mutex_group\n%d\n%send_mutex_group\n" % (
+            len(self.facts),
+            "".join(["%d %d\n" % (var, val) for var, val in self.facts]))
+
+    def get_encoding_size(self):
+        return len(self.facts)
+
+
+class SASInit:
+    def __init__(self, values):
+        self.values = values
+
+    def validate(self, variables):
+        """Validate initial state.
+
+        Assert that the initial state contains the correct number of
+        values and that all values are in range.
+        """
+
+        assert len(self.values) == len(variables.ranges)
+        for fact in enumerate(self.values):
+            variables.validate_fact(fact)
+
+    def dump(self):
+        for var, val in enumerate(self.values):
+            print("v%d: %d" % (var, val))
+
+    def output(self, stream):
+        stream.write("begin_state\n%send_state\n" % "".join(
+            ["%d\n" % val for val in self.values]))
+
+
+class SASGoal:
+    def __init__(self, pairs: List[Tuple[int, int]]) -> None:
+        self.pairs = sorted(pairs)
+
+    def validate(self, variables):
+        """Assert that the goal is nonempty and a valid condition."""
+        assert self.pairs
+        variables.validate_condition(self.pairs)
+
+    def dump(self):
+        for var, val in self.pairs:
+            print("v%d: %d" % (var, val))
+
+    def output(self, stream):
+        stream.write("begin_goal\n%d\n%send_goal\n" % (
+            len(self.pairs),
+            "".join(["%d %d\n" % (var, val) for var, val in self.pairs])))
+
+    def get_encoding_size(self):
+        return len(self.pairs)
+
+
+class SASOperator:
+    def __init__(self, name: str, prevail: List[VarValPair], pre_post:
+            List[Tuple[int, int, int, List[VarValPair]]], cost: int) -> None:
+        self.name = name
+        self.prevail = sorted(prevail)
+        self.pre_post = self._canonical_pre_post(pre_post)
+        self.cost = cost
+
+    def _canonical_pre_post(self, pre_post):
+        # Return a sorted and uniquified version of pre_post. We would
+        # like to just use sorted(set(pre_post)), but this fails because
+        # the effect conditions are a list and hence not hashable.
+        def tuplify(entry):
+            var, pre, post, cond = entry
+            return var, pre, post, tuple(cond)
+        def listify(entry):
+            var, pre, post, cond = entry
+            return var, pre, post, list(cond)
+        pre_post = map(tuplify, pre_post)
+        pre_post = sorted(set(pre_post))
+        pre_post = list(map(listify, pre_post))
+        return pre_post
+
+    def validate(self, variables):
+        """Validate the operator.
+
+        Assert that
+        1. Prevail conditions are valid conditions (i.e., sorted and
+           all referring to different variables)
+        2. The pre_post list is sorted by (var, pre, post, cond), and the
+           same (var, pre, post, cond) 4-tuple is not repeated.
+        3. Effect conditions are valid conditions and do not contain variables
+           from the pre- or prevail conditions.
+        4. Variables occurring in pre_post rules do not have a prevail
+           condition.
+        5. Preconditions in pre_post are -1 or valid facts.
+        6. Effects are valid facts.
+        7. Effect variables are non-derived.
+        8. If a variable has multiple pre_post rules, then pre is
+           identical in all these rules.
+        9. There is at least one effect.
+        10. Costs are non-negative integers.
+
+        Odd things that are *not* illegal:
+        - The effect in a pre_post rule may be identical to the
+          precondition or to an effect condition of that effect.
+
+        TODO/open question:
+        - It is currently not very clear what the semantics of operators
+          should be when effects "conflict", i.e., when multiple effects
+          trigger and want to set a given variable to two different
+          values. In the case where both are unconditional effects, we
+          should make sure that our representation doesn't actually
+          contain two such effects, but when at least one of them is
+          conditional, things are not so easy.
+
+          To make our life simpler when generating SAS+ tasks from
+          PDDL tasks, it probably makes most sense to generalize the
+          PDDL rule in this case: there is a value order where certain
+          values "win" over others in this situation. It probably
+          makes sense to say the "highest" values should win in this
+          case, because that's consistent with the PDDL rules if we
+          say false = 0 and true = 1, and also with our sort order of
+          effects it means we get the right result if we just apply
+          effects in sequence.
+
+          But whatever we end up deciding, we need to be clear about it,
+          document it and make sure that all of our code knows the rules
+          and follows them.
+        """
+
+        variables.validate_condition(self.prevail)
+        assert self.pre_post == self._canonical_pre_post(self.pre_post)
+        prevail_vars = {var for (var, value) in self.prevail}
+        pre_values = {}
+        for var, pre, post, cond in self.pre_post:
+            variables.validate_condition(cond)
+            assert var not in prevail_vars
+            if pre != -1:
+                variables.validate_fact((var, pre))
+            variables.validate_fact((var, post))
+            assert variables.axiom_layers[var] == -1
+            if var in pre_values:
+                assert pre_values[var] == pre
+            else:
+                pre_values[var] = pre
+        for var, pre, post, cond in self.pre_post:
+            for cvar, cval in cond:
+                assert cvar not in pre_values or pre_values[cvar] == -1
+                assert cvar not in prevail_vars
+        assert self.pre_post
+        assert self.cost >= 0 and self.cost == int(self.cost)
+
+    def dump(self):
+        print(self.name)
+        print("Prevail:")
+        for var, val in self.prevail:
+            print("  v%d: %d" % (var, val))
+        print("Pre/Post:")
+        for var, pre, post, cond in self.pre_post:
+            if cond:
+                cond_str = " [%s]" % ", ".join(
+                    ["%d: %d" % tuple(c) for c in cond])
+            else:
+                cond_str = ""
+            print("  v%d: %d -> %d%s" % (var, pre, post, cond_str))
+
+    def output(self, stream):
+        stream.write(self.get_output())
+
+    def get_output(self):
+        lines = ["begin_operator", self.name[1:-1], str(len(self.prevail))]
+        lines.extend(["%d %d" % (var, val) for var, val in self.prevail])
+        lines.append(str(len(self.pre_post)))
+        for var, pre, post, cond in self.pre_post:
+            lines.append("%d %s%d %d %d" % (
+                len(cond), "".join(["%d %d " % (cvar, cval) for cvar, cval in cond]),
+                var, pre, post))
+        lines.append(str(self.cost))
+        lines.append("end_operator\n")
+        return "\n".join(lines)
+
+    def get_encoding_size(self):
+        size = 1 + len(self.prevail)
+        for var, pre, post, cond in self.pre_post:
+            size += 1 + len(cond)
+            if pre != -1:
+                size += 1
+        return size
+
+    def get_applicability_conditions(self):
+        """Return the combined applicability conditions
+        (prevail conditions and preconditions) of the operator.
+
+        Returns a sorted list of (var, value) pairs. This is
+        guaranteed to contain at most one fact per variable and
+        must hence be non-contradictory."""
+        conditions = {}
+        for var, val in self.prevail:
+            assert var not in conditions
+            conditions[var] = val
+        for var, pre, post, cond in self.pre_post:
+            if pre != -1:
+                assert var not in conditions or conditions[var] == pre
+                conditions[var] = pre
+        return sorted(conditions.items())
+
+
+class SASOperatorTable:
+    """Operators stored column-wise in flat integer arrays.
+
+    The prevail conditions of operator i are the pairs
+    (prevail_vars[j], prevail_values[j]) for j in
+    range(prevail_start[i], prevail_start[i + 1]), and likewise for
+    its pre_post entries (effect_start) and for the conditions of
+    effect j (condition_start). This is much more compact than one
+    SASOperator object per operator, whose conditions are lists of
+    tuples.
+
+    Indexing and iterating create SASOperator objects on the fly.
+    Their prevail and pre_post lists are taken over as they are
+    stored, so they are not sorted again."""
+
+    def __init__(self, operators=()):
+        self.names = []
+        self.costs = array("q")
+        self.prevail_start = array("i", [0])
+        self.prevail_vars = array("i")
+        self.prevail_values = array("i")
+        self.effect_start = array("i", [0])
+        self.effect_vars = array("i")
+        self.effect_pres = array("i")
+        self.effect_posts = array("i")
+        self.condition_start = array("i", [0])
+        self.condition_vars = array("i")
+        self.condition_values = array("i")
+        for op in operators:
+            self.append(op.name, op.prevail, op.pre_post, op.cost)
+
+    def append(self, name, prevail, pre_post, cost):
+        self.names.append(name)
+        self.costs.append(cost)
+        for var, val in prevail:
+            self.prevail_vars.append(var)
+            self.prevail_values.append(val)
+        self.prevail_start.append(len(self.prevail_vars))
+        for var, pre, post, cond in pre_post:
+            self.effect_vars.append(var)
+            self.effect_pres.append(pre)
+            self.effect_posts.append(post)
+            for cvar, cval in cond:
+                self.condition_vars.append(cvar)
+                self.condition_values.append(cval)
+            self.condition_start.append(len(self.condition_vars))
+        self.effect_start.append(len(self.effect_vars))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, op_no):
+        if op_no < 0:
+            op_no += len(self.names)
+        if not 0 <= op_no < len(self.names):
+            raise IndexError("operator index out of range")
+        prevail_vars = self.prevail_vars
+        prevail_values = self.prevail_values
+        condition_start = self.condition_start
+        condition_vars = self.condition_vars
+        condition_values = self.condition_values
+        prevail = [(prevail_vars[i], prevail_values[i]) for i in range(
+            self.prevail_start[op_no], self.prevail_start[op_no + 1])]
+        pre_post = []
+        for eff_no in range(self.effect_start[op_no],
+                            self.effect_start[op_no + 1]):
+            cond = [(condition_vars[i], condition_values[i]) for i in range(
+                condition_start[eff_no], condition_start[eff_no + 1])]
+            pre_post.append((self.effect_vars[eff_no], self.effect_pres[eff_no],
+                             self.effect_posts[eff_no], cond))
+        op = SASOperator.__new__(SASOperator)
+        op.name = self.names[op_no]
+        op.prevail = prevail
+        op.pre_post = pre_post
+        op.cost = self.costs[op_no]
+        return op
+
+    def __iter__(self):
+        for op_no in range(len(self.names)):
+            yield self[op_no]
+
+    def validate(self, variables):
+        """Validate all operators. See SASOperator.validate for the
+        conditions that are checked."""
+        ranges = variables.ranges
+        axiom_layers = variables.axiom_layers
+        assert len(self.costs) == len(self.names)
+        for values, var_nos in [
+                (self.prevail_values, self.prevail_vars),
+                (self.effect_posts, self.effect_vars),
+                (self.condition_values, self.condition_vars)]:
+            assert len(values) == len(var_nos)
+            for var, val in zip(var_nos, values):
+                assert 0 <= var < len(ranges)
+                assert 0 <= val < ranges[var]
+        for var, pre in zip(self.effect_vars, self.effect_pres):
+            assert pre == -1 or 0 <= pre < ranges[var]
+            assert axiom_layers[var] == -1
+        for op_no in range(len(self.names)):
+            prevail_vars = self.prevail_vars[
+                self.prevail_start[op_no]:self.prevail_start[op_no + 1]]
+            self._validate_condition_vars(prevail_vars)
+            effect_begin = self.effect_start[op_no]
+            effect_end = self.effect_start[op_no + 1]
+            assert effect_begin < effect_end
+            pre_values = {}
+            last_entry = None
+            for eff_no in range(effect_begin, effect_end):
+                var = self.effect_vars[eff_no]
+                pre = self.effect_pres[eff_no]
+                assert var not in prevail_vars
+                assert pre_values.setdefault(var, pre) == pre
+                cond_begin = self.condition_start[eff_no]
+                cond_end = self.condition_start[eff_no + 1]
+                self._validate_condition_vars(
+                    self.condition_vars[cond_begin:cond_end])
+                entry = (var, pre, self.effect_posts[eff_no],
+                         tuple(zip(self.condition_vars[cond_begin:cond_end],
+                                   self.condition_values[cond_begin:cond_end])))
+                assert last_entry is None or last_entry < entry
+                last_entry = entry
+            for cvar in self.condition_vars[
+                    self.condition_start[effect_begin]:
+                    self.condition_start[effect_end]]:
+                assert pre_values.get(cvar, -1) == -1
+                assert cvar not in prevail_vars
+        for cost in self.costs:
+            assert cost >= 0
+
+    @staticmethod
+    def _validate_condition_vars(var_nos):
+        for i in range(1, len(var_nos)):
+            assert var_nos[i - 1] < var_nos[i]
+
+    def get_encoding_size(self):
+        # Sum of SASOperator.get_encoding_size over all operators.
+        return (len(self.names) + len(self.prevail_vars) +
+                len(self.effect_vars) + len(self.condition_vars) +
+                len(self.effect_pres) - self.effect_pres.count(-1))
+
+    def rename_variables(self, new_var_nos):
+        """Return a new table where each variable var is renamed to
+        new_var_nos[var]. Conditions and effects on variables mapped
+        to None are removed, as are operators without effects. As in
+        VariableOrder, conditions are not sorted again."""
+        num_ops = len(self.names)
+        effect_vars = [new_var_nos[var] for var in self.effect_vars]
+        keep_effect = [var is not None for var in effect_vars]
+        keep_op = [any(keep_effect[self.effect_start[op_no]:
+                                   self.effect_start[op_no + 1]])
+                   for op_no in range(num_ops)]
+        prevail_vars = [new_var_nos[var] for var in self.prevail_vars]
+        keep_prevail = [
+            var is not None and keep
+            for var, keep in zip(prevail_vars, self._repeat(
+                keep_op, self.prevail_start))]
+        condition_vars = [new_var_nos[var] for var in self.condition_vars]
+        keep_condition = [
+            var is not None and keep
+            for var, keep in zip(condition_vars, self._repeat(
+                keep_effect, self.condition_start))]
+
+        result = SASOperatorTable()
+        result.names = list(compress(self.names, keep_op))
+        result.costs = array("q", compress(self.costs, keep_op))
+        result.prevail_vars = array("i", compress(prevail_vars, keep_prevail))
+        result.prevail_values = array(
+            "i", compress(self.prevail_values, keep_prevail))
+        result.prevail_start = self._get_new_start(
+            self.prevail_start, keep_prevail, keep_op)
+        result.effect_vars = array("i", compress(effect_vars, keep_effect))
+        result.effect_pres = array("i", compress(self.effect_pres, keep_effect))
+        result.effect_posts = array(
+            "i", compress(self.effect_posts, keep_effect))
+        result.effect_start = self._get_new_start(
+            self.effect_start, keep_effect, keep_op)
+        result.condition_vars = array(
+            "i", compress(condition_vars, keep_condition))
+        result.condition_values = array(
+            "i", compress(self.condition_values, keep_condition))
+        result.condition_start = self._get_new_start(
+            self.condition_start, keep_condition, keep_effect)
+        return result
+
+    @staticmethod
+    def _repeat(values, start):
+        # Repeat the i-th value as often as there are entries in
+        # range(start[i], start[i + 1]).
+        for value, begin, end in zip(values, start, start[1:]):
+            yield from repeat(value, end - begin)
+
+    @staticmethod
+    def _get_new_start(start, keep_entry, keep_group):
+        # Offset table after removing the entries and groups of entries
+        # that are not kept.
+        new_start = array("i", [0])
+        num_kept = 0
+        for begin, end, keep in zip(start, start[1:], keep_group):
+            if keep:
+                num_kept += sum(keep_entry[begin:end])
+                new_start.append(num_kept)
+        return new_start
+
+    def get_output(self, begin, end):
+        """Return the output of the operators with indices in
+        range(begin, end) in the format of SASOperator.get_output."""
+        lines = []
+        prevail_start = self.prevail_start
+        effect_start = self.effect_start
+        condition_start = self.condition_start
+        prevail = ["%d %d" % pair for pair in zip(
+            self.prevail_vars[prevail_start[begin]:prevail_start[end]],
+            self.prevail_values[prevail_start[begin]:prevail_start[end]])]
+        prevail_offset = prevail_start[begin]
+        for op_no in range(begin, end):
+            lines.append("begin_operator")
+            lines.append(self.names[op_no][1:-1])
+            prevail_begin = prevail_start[op_no] - prevail_offset
+            prevail_end = prevail_start[op_no + 1] - prevail_offset
+            lines.append(str(prevail_end - prevail_begin))
+            lines.extend(prevail[prevail_begin:prevail_end])
+            lines.append(str(effect_start[op_no + 1] - effect_start[op_no]))
+            for eff_no in range(effect_start[op_no], effect_start[op_no + 1]):
+                cond_begin = condition_start[eff_no]
+                cond_end = condition_start[eff_no + 1]
+                lines.append("%d %s%d %d %d" % (
+                    cond_end - cond_begin,
+                    "".join(["%d %d " % pair for pair in zip(
+                        self.condition_vars[cond_begin:cond_end],
+                        self.condition_values[cond_begin:cond_end])]),
+                    self.effect_vars[eff_no], self.effect_pres[eff_no],
+                    self.effect_posts[eff_no]))
+            lines.append(str(self.costs[op_no]))
+            lines.append("end_operator")
+        lines.append("")
+        return "\n".join(lines)
+
+class SASAxiom:
+    def __init__(self, condition: List[VarValPair], effect: VarValPair) -> None:
+        self.condition = sorted(condition)
+        self.effect = effect
+        assert self.effect[1] in (0, 1)
+
+        for _, val in condition:
+            assert val >= 0, condition
+
+    def validate(self, variables, init):
+
+        """Validate the axiom.
+
+        Assert that the axiom condition is a valid condition, that the
+        effect is a valid fact, that the effect variable is a derived
+        variable, and that the layering condition is satisfied.
+
+        See the docstring of SASTask.validate for information on the
+        restriction on derived variables. The layering condition boils
+        down to:
+
+        1. Axioms always set the "non-init" value of the derived
+           variable.
+        2. Derived variables in the condition must have a lower of
+           equal layer to derived variables appearing in the effect.
+        3. Conditions with equal layer are only allowed when the
+           condition uses the "non-init" value of that variable.
+
+        TODO/bug: rule #1 is currently disabled because we currently
+        have axioms that violate it. This is likely due to the
+        "extended domain transition graphs" described in the Fast
+        Downward paper, Section 5.1. However, we want to eventually
+        changes this. See issue454. For cases where rule #1 is violated,
+        "non-init" should be "init" in rule #3.
+        """
+
+        variables.validate_condition(self.condition)
+        variables.validate_fact(self.effect)
+        eff_var, eff_value = self.effect
+        eff_layer = variables.axiom_layers[eff_var]
+        assert eff_layer >= 0
+        eff_init_value = init.values[eff_var]
+        ## The following rule is currently commented out because of
+        ## the TODO/bug mentioned in the docstring.
+        # assert eff_value != eff_init_value
+        for cond_var, cond_value in self.condition:
+            cond_layer = variables.axiom_layers[cond_var]
+            if cond_layer != -1:
+                assert cond_layer <= eff_layer
+                if cond_layer == eff_layer:
+                    cond_init_value = init.values[cond_var]
+                    ## Once the TODO/bug above is addressed, the
+                    ## following four lines can be simplified because
+                    ## we are guaranteed to land in the "if" branch.
+                    if eff_value != eff_init_value:
+                        assert cond_value != cond_init_value
+                    else:
+                        assert cond_value == cond_init_value
+
+    def dump(self):
+        print("Condition:")
+        for var, val in self.condition:
+            print("  v%d: %d" % (var, val))
+        print("Effect:")
+        var, val = self.effect
+        print("  v%d: %d" % (var, val))
+
+    def output(self, stream):
+        stream.write(self.get_output())
+
+    def get_output(self):
+        var, val = self.effect
+        return "begin_rule\n%d\n%s%d %d %d\nend_rule\n" % (
+            len(self.condition),
+            "".join(["%d %d\n" % (cvar, cval) for cvar, cval in self.condition]),
+            var, 1 - val, val)
+
+    def get_encoding_size(self):
+        return 1 + len(self.condition)
@@ -0,0 +1,151 @@
+"""Tarjan's algorithm for maximal strongly connected components.
+
+We provide three versions of the algorithm for different graph
+representations. They all use the same implementation on successor
+arrays.
+
+Since the original recursive version exceeds python's maximal
+recursion depth on some planning instances, this is an iterative
+version with an explicit recursion stack (iter_stack).
+
+Note that the derived graph where each SCC is a single "supernode" is
+necessarily acyclic. The SCCs returned by the algorithm are in a
+topological sort order with respect to this derived DAG.
+"""
+
+from array import array
+from itertools import accumulate, chain
+
+__all__ = ["get_sccs_adjacency_list", "get_sccs_adjacency_dict",
+           "get_sccs_successor_arrays"]
+
+
+def get_sccs_adjacency_list(adjacency_list):
+    """Compute SCCs for a graph represented as an adjacency list.
+
+    `adjacency_list` is a list (or similar data structure) whose
+    indices correspond to the graph nodes. For example, if
+    `len(adjacency_list)` is N, the graph nodes are {0, ..., N-1}.
+
+    For every node `u`, `adjacency_list[u]` is the list (or similar data
+    structure) of successors of `u`.
+
+    Returns a list of lists that defines a partition of {0, ..., N-1},
+    where each block in the partition is an SCC of the graph, and
+    the partition is given in a topologically sort order."""
+    start = array("i", [0])
+    start.extend(accumulate(len(successors) for successors in adjacency_list))
+    successors = array("i", chain.from_iterable(adjacency_list))
+    return get_sccs_successor_arrays(start, successors)
+
+def get_sccs_successor_arrays(start, successors):
+    """Compute SCCs for a graph represented by successor arrays.
+
+    The graph nodes are {0, ..., N-1}, where N is `len(start) - 1`.
+    The successors of node `u` are `successors[start[u]:start[u + 1]]`.
+
+    Returns a list of lists that defines a partition of {0, ..., N-1},
+    where each block in the partition is an SCC of the graph, and
+    the partition is given in a topologically sort order."""
+    return StronglyConnectedComponentComputation(
+        start, successors).get_result()
+
+def get_sccs_adjacency_dict(adjacency_dict):
+    """Compute SCCs for a graph represented as an adjacency dict.
+
+    `adjacency_dict` is a dictionary whose keys are the vertices of
+    the graph.
+
+    For every node `u`, adjacency_dict[u]` is the list (or similar
+    data structure) of successors of `u`.
+
+    Returns a list of lists that defines a partition of the graph
+    nodes, where each block in the partition is an SCC of the graph,
+    and the partition is given in a topologically sort order."""
+    node_to_index = {}
+    index_to_node = []
+    for index, node in enumerate(adjacency_dict):
+        node_to_index[node] = index
+        index_to_node.append(node)
+
+    adjacency_list = []
+    for index, node in enumerate(index_to_node):
+        successors = adjacency_dict[node]
+        successor_indices = [node_to_index[v] for v in successors]
+        adjacency_list.append(successor_indices)
+
+    result_indices = get_sccs_adjacency_list(adjacency_list)
+
+    result = []
+    for block_indices in result_indices:
+        block = [index_to_node[index] for index in block_indices]
+        result.append(block)
+    return result
+
+
+class StronglyConnectedComponentComputation:
+    def __init__(self, start, successors):
+        self.start = start
+        self.successors = successors
+
+    def get_result(self):
+        num_nodes = len(self.start) - 1
+        # Node indices start at 1, so that 0 marks unvisited nodes.
+        self.indices = array("i", [0]) * num_nodes
+        self.lowlinks = array("i", [0]) * num_nodes
+        # Position of each node on the stack, or -1 if it is not on it.
+        self.stack_indices = array("i", [-1]) * num_nodes
+        self.current_index = 0
+        self.stack = []
+        self.sccs = []
+
+        for i in range(num_nodes):
+            if not self.indices[i]:
+                self.visit(i)
+        self.sccs.reverse()
+        return self.sccs
+
+    def visit(self, vertex):
+        # The entries of iter_stack are pairs (v, pos), where pos is the
+        # position of the next successor of v to consider in
+        # self.successors. The successor that is currently being
+        # visited is the one at pos - 1.
+        start = self.start
+        successors = self.successors
+        indices = self.indices
+        lowlinks = self.lowlinks
+        stack_indices = self.stack_indices
+        stack = self.stack
+
+        def begin(v):
+            self.current_index += 1
+            indices[v] = lowlinks[v] = self.current_index
+            stack_indices[v] = len(stack)
+            stack.append(v)
+            iter_stack.append((v, start[v]))
+
+        iter_stack = []
+        begin(vertex)
+        while iter_stack:
+            v, pos = iter_stack.pop()
+            if pos > start[v]:
+                # Returning from the successor at pos - 1.
+                w = successors[pos - 1]
+                lowlinks[v] = min(lowlinks[v], lowlinks[w])
+            while pos < start[v + 1]:
+                w = successors[pos]
+                pos += 1
+                if not indices[w]:
+                    iter_stack.append((v, pos))
+                    begin(w)
+                    break
+                elif stack_indices[w] != -1:
+                    lowlinks[v] = min(lowlinks[v], indices[w])
+            else:
+                if lowlinks[v] == indices[v]:
+                    stack_index = stack_indices[v]
+                    scc = stack[stack_index:]
+                    del stack[stack_index:]
+                    for n in scc:
+                        stack_indices[n] = -1
+                    self.sccs.append(scc)
@@ -0,0 +1,159 @@
+import contextlib
+import gc
+import json
+import os
+import sys
+import time
+
+import memory_profile as memory_profile_module
+import tools
+
+
+class Timer:
+    def __init__(self):
+        self.start_time = time.time()
+        self.start_clock = self._clock()
+
+    def _clock(self):
+        times = os.times()
+        return times[0] + times[1]
+
+    def elapsed_cpu_time(self):
+        return self._clock() - self.start_clock
+
+    def elapsed_wall_time(self):
+        return time.time() - self.start_time
+
+    def __str__(self):
+        return "[%.3fs CPU, %.3fs wall-clock]" % (
+            self.elapsed_cpu_time(), self.elapsed_wall_time())
+
+
+def _get_memory_in_kb(get_memory):
+    try:
+        return get_memory()
+    except Warning:
+        return None
+
+
+class Trace:
+    """Hierarchical record of the phases timed with timing().
+
+    Each phase is a dict with its name, its start relative to the start
+    of the trace, wall-clock and CPU time, the change of the resident
+    set size, the peak resident set size at its end, the number of
+    objects tracked by the garbage collector before and after the
+    phase, and the list of its subphases. Memory values are in KB and
+    are None if they cannot be determined. Counting the objects takes
+    time linear in the number of objects, so the trace is only
+    recorded if requested."""
+
+    def __init__(self):
+        self.timer = Timer()
+        self.phases = []
+        self.open_phases = []
+
+    def begin_phase(self, name):
+        phase = {
+            "name": name,
+            "start": self.timer.elapsed_wall_time(),
+            "rss_before": _get_memory_in_kb(tools.get_resident_memory_in_kb),
+            "objects_before": len(gc.get_objects()),
+            "children": [],
+        }
+        if self.open_phases:
+            self.open_phases[-1]["children"].append(phase)
+        else:
+            self.phases.append(phase)
+        self.open_phases.append(phase)
+
+    def end_phase(self, timer):
+        phase = self.open_phases.pop()
+        rss_before = phase.pop("rss_before")
+        rss_after = _get_memory_in_kb(tools.get_resident_memory_in_kb)
+        phase["wall_time"] = timer.elapsed_wall_time()
+        phase["cpu_time"] = timer.elapsed_cpu_time()
+        if rss_before is None or rss_after is None:
+            phase["rss_delta"] = None
+        else:
+            phase["rss_delta"] = rss_after - rss_before
+        phase["peak_rss"] = _get_memory_in_kb(
+            tools.get_peak_resident_memory_in_kb)
+        phase["objects_after"] = len(gc.get_objects())
+        phase["children"] = phase.pop("children")
+
+    def get_chrome_events(self):
+        """Return the phases as complete events ("ph": "X") of the Chrome
+        trace event format, which can be loaded in chrome://tracing or
+        Perfetto."""
+        events = []
+        pid = os.getpid()
+        def add_events(phases):
+            for phase in phases:
+                args = {key: value for key, value in phase.items()
+                        if key not in ["name", "start", "wall_time",
+                                       "children"]}
+                events.append({
+                    "name": phase["name"], "ph": "X", "pid": pid, "tid": 0,
+                    "ts": round(phase["start"] * 1e6),
+                    "dur": round(phase["wall_time"] * 1e6),
+                    "args": args})
+                add_events(phase["children"])
+        add_events(self.phases)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, filename, format):
+        if format == "chrome":
+            data = self.get_chrome_events()
+        else:
+            data = {
+                "wall_time": self.timer.elapsed_wall_time(),
+                "cpu_time": self.timer.elapsed_cpu_time(),
+                "peak_rss": _get_memory_in_kb(
+                    tools.get_peak_resident_memory_in_kb),
+                "phases": self.phases,
+            }
+        with open(filename, "w") as trace_file:
+            json.dump(data, trace_file, indent=1)
+            trace_file.write("\n")
+
+
+# The trace and memory profile that timing() records phases in, if any.
+trace = None
+memory_profile = None
+
+
+def start_trace():
+    global trace
+    trace = Trace()
+    return trace
+
+
+def start_memory_profile():
+    global memory_profile
+    memory_profile = memory_profile_module.MemoryProfile()
+    return memory_profile
+
+
+@contextlib.contextmanager
+def timing(text, block=False):
+    if trace is not None:
+        trace.begin_phase(text)
+    if memory_profile is not None:
+        memory_profile.begin_phase(text)
+    timer = Timer()
+    if block:
+        print("%s..." % text)
+    else:
+        print("%s..." % text, end=' ')
+    sys.stdout.flush()
+    yield
+    if memory_profile is not None:
+        memory_profile.end_phase()
+    if trace is not None:
+        trace.end_phase(timer)
+    if block:
+        print("%s: %s" % (text, timer))
+    else:
+        print(timer)
+    sys.stdout.flush()
@@ -0,0 +1,208 @@
+"""Cache for translating tasks that only differ in their initial state
+and goal.
+
+The cache directory contains one file per task, where tasks with the same
+domain, objects, static facts and relevant options (after normalizing and
+pruning irrelevant schemas) share a file. The file stores the results of
+the last translation of such a task:
+
+- a digest of the grounding (the fluent facts, the reachable action atoms
+  and the ground axioms),
+- the invariants, which only depend on the schemas and the reachable
+  action atoms,
+- a digest of the fact groups and mutex groups, and
+- the SAS operators of each reachable action atom, which only depend on
+  the ground action and the encoding given by the groups.
+
+A translation with a cache still parses and normalizes the task, computes
+the model and (with --relevance-analysis) filters it, because the new
+initial state or goal can change which atoms are reachable or relevant.
+If the grounding has the same digest as the cached one, we reuse the
+invariants instead of synthesizing them again. If the fact groups are
+also the same, we reuse the SAS operators instead of instantiating and
+translating the actions, taking them in the order of the new model. The
+initial state, goal and axioms are always translated again, and the SAS
+task is simplified as usual, so the output is the same as without the
+cache. Whenever a digest differs, we fall back to computing the results
+and replace the cached ones.
+
+Operators that use derived variables for negative conditions (see
+--negative-conditions) are not reused, since the numbering of these
+variables depends on the order of the actions."""
+
+import contextlib
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+
+import instantiate
+import invariant_finder
+import options
+import pddl
+import timers
+
+# Increase this when changing what is cached or how the cached results
+# are computed, so that old cache files are ignored.
+CACHE_VERSION = 2
+
+# Options that influence the cached results.
+KEY_OPTIONS = [
+    "generate_relaxed_task", "use_partial_encoding",
+    "invariant_generation_max_candidates", "invariant_generation_max_time",
+    "add_implied_preconditions", "negative_conditions", "max_dnf_disjuncts",
+    "relevance_analysis", "grounded_fast_path", "jobs",
+    "parallel_invariant_synthesis"]
+
+
+def _dump_to_string(obj):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        obj.dump()
+    return output.getvalue()
+
+
+def _get_digest(lines):
+    digest = hashlib.sha256()
+    for line in lines:
+        digest.update(line.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def get_task_key(task):
+    fluent_predicates = instantiate.get_fluent_predicates(task)
+    static_facts = [fact for fact in task.init
+                    if isinstance(fact, pddl.Assign) or
+                    fact.predicate not in fluent_predicates]
+    lines = ["version %d" % CACHE_VERSION]
+    lines += ["%s = %r" % (name, getattr(options, name))
+              for name in KEY_OPTIONS]
+    lines += [task.domain_name, str(task.requirements),
+              "use_min_cost_metric = %r" % task.use_min_cost_metric]
+    for items in [task.types, task.objects, task.predicates, task.functions]:
+        lines += map(str, items)
+    lines += sorted(map(str, static_facts))
+    lines += [_dump_to_string(schema)
+              for schema in task.actions + task.axioms]
+    return _get_digest(lines)
+
+
+class TranslationCache:
+    def __init__(self, directory, task):
+        self.task = task
+        self.schema_numbers = {action: action_no for action_no, action
+                               in enumerate(task.actions)}
+        os.makedirs(directory, exist_ok=True)
+        self.filename = os.path.join(directory, get_task_key(task) + ".pickle")
+        self.cached = self._load()
+        self.entry = {}
+        self.grounding_reused = False
+        self.groups_reused = False
+        self.operators_reused = False
+
+    def _load(self):
+        try:
+            with open(self.filename, "rb") as cache_file:
+                return pickle.load(cache_file)
+        except FileNotFoundError:
+            print("No cached translation for this task")
+        except (OSError, EOFError, pickle.UnpicklingError) as error:
+            print("Ignoring unreadable translation cache: %s" % error)
+        return {}
+
+    def _get_action_key(self, atom):
+        return (self.schema_numbers[atom.predicate], tuple(atom.args))
+
+    def check_grounding(self, fluent_facts, actions, axioms):
+        """Compare the grounding, given by the results of instantiate
+        with an ActionStream, to the cached one."""
+        lines = sorted(map(str, fluent_facts))
+        lines += map(str, sorted(map(self._get_action_key,
+                                     actions.action_atoms)))
+        lines += map(repr, axioms)
+        self.entry["grounding"] = _get_digest(lines)
+        self.grounding_reused = (
+            self.cached.get("grounding") == self.entry["grounding"])
+        if self.grounding_reused:
+            print("Grounding matches the cached translation")
+        elif self.cached:
+            print("Grounding differs from the cached translation")
+
+    def get_invariants(self, reachable_action_params):
+        if self.grounding_reused:
+            print("Reusing %d cached invariants" %
+                  len(self.cached["invariants"]))
+            invariants = self.cached["invariants"]
+        else:
+            invariants = invariant_finder.get_invariants(
+                self.task, reachable_action_params)
+        self.entry["invariants"] = invariants
+        return invariants
+
+    def check_groups(self, groups, mutex_groups):
+        # The order of the mutex groups is arbitrary, but the order of
+        # the groups defines the variables.
+        lines = [" ".join(map(str, group)) for group in groups]
+        lines.append("")
+        lines += sorted(" ".join(map(str, group)) for group in mutex_groups)
+        self.entry["groups"] = _get_digest(lines)
+        self.groups_reused = (
+            self.grounding_reused and
+            self.cached.get("groups") == self.entry["groups"])
+
+    def get_operators(self, actions):
+        """Return the cached translation of the actions (an
+        ActionStream) in the order of the stream as a tuple of
+        the SAS operators, the derived atoms in operator conditions,
+        the counts of simplified effect conditions and added implied
+        preconditions, and the counts for negative conditions; or None
+        if the cached translation cannot be used."""
+        operators_by_action = self.cached.get("operators_by_action")
+        if not self.groups_reused or operators_by_action is None:
+            return None
+        operators = []
+        for atom in actions.action_atoms:
+            operators += operators_by_action[self._get_action_key(atom)]
+        print("Reusing %d cached operators" % len(operators))
+        self.operators_reused = True
+        return (operators,) + self.cached["operator_results"]
+
+    def set_operators(self, actions, operator_counts, operators,
+                      derived_condition_atoms, simplified_effect_conditions,
+                      added_implied_preconditions, negative_conditions):
+        """Store the translation of the actions. operator_counts gives the
+        number of operators for each atom of the ActionStream."""
+        if negative_conditions.keys:
+            return
+        operators_by_action = {}
+        pos = 0
+        for atom, num_operators in zip(actions.action_atoms, operator_counts):
+            operators_by_action[self._get_action_key(atom)] = (
+                operators[pos:pos + num_operators])
+            pos += num_operators
+        assert pos == len(operators)
+        self.entry["operators_by_action"] = operators_by_action
+        self.entry["operator_results"] = (
+            derived_condition_atoms, simplified_effect_conditions,
+            added_implied_preconditions,
+            (negative_conditions.encoded_operators,
+             negative_conditions.avoided_operators,
+             negative_conditions.multiplied_out_operators,
+             negative_conditions.added_operators))
+
+    def save(self):
+        """Write the results of this translation to the cache. This must
+        be called before simplifying the SAS task, which modifies the
+        operators."""
+        if self.operators_reused:
+            return
+        with timers.timing("Writing translation cache"):
+            directory = os.path.dirname(self.filename)
+            # Write to a temporary file first, so that concurrent
+            # translations never read a partially written file.
+            with tempfile.NamedTemporaryFile(
+                    dir=directory, suffix=".tmp", delete=False) as cache_file:
+                pickle.dump(self.entry, cache_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(cache_file.name, self.filename)
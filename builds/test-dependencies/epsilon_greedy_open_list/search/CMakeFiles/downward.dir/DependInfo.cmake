@@ -0,0 +1,78 @@
+
+# Consider dependencies only in project.
+set(CMAKE_DEPENDS_IN_PROJECT_ONLY OFF)
+
+# The set of languages for which implicit dependencies are needed:
+set(CMAKE_DEPENDS_LANGUAGES
+  )
+
+# The set of dependency files which are needed:
+set(CMAKE_DEPENDS_DEPENDENCY_FILES
+  "/root/package/src/search/abstract_task.cc" "search/CMakeFiles/downward.dir/abstract_task.cc.o" "gcc" "search/CMakeFiles/downward.dir/abstract_task.cc.o.d"
+  "/root/package/src/search/algorithms/int_packer.cc" "search/CMakeFiles/downward.dir/algorithms/int_packer.cc.o" "gcc" "search/CMakeFiles/downward.dir/algorithms/int_packer.cc.o.d"
+  "/root/package/src/search/axioms.cc" "search/CMakeFiles/downward.dir/axioms.cc.o" "gcc" "search/CMakeFiles/downward.dir/axioms.cc.o.d"
+  "/root/package/src/search/command_line.cc" "search/CMakeFiles/downward.dir/command_line.cc.o" "gcc" "search/CMakeFiles/downward.dir/command_line.cc.o.d"
+  "/root/package/src/search/evaluation_context.cc" "search/CMakeFiles/downward.dir/evaluation_context.cc.o" "gcc" "search/CMakeFiles/downward.dir/evaluation_context.cc.o.d"
+  "/root/package/src/search/evaluation_result.cc" "search/CMakeFiles/downward.dir/evaluation_result.cc.o" "gcc" "search/CMakeFiles/downward.dir/evaluation_result.cc.o.d"
+  "/root/package/src/search/evaluator.cc" "search/CMakeFiles/downward.dir/evaluator.cc.o" "gcc" "search/CMakeFiles/downward.dir/evaluator.cc.o.d"
+  "/root/package/src/search/evaluator_cache.cc" "search/CMakeFiles/downward.dir/evaluator_cache.cc.o" "gcc" "search/CMakeFiles/downward.dir/evaluator_cache.cc.o.d"
+  "/root/package/src/search/heuristic.cc" "search/CMakeFiles/downward.dir/heuristic.cc.o" "gcc" "search/CMakeFiles/downward.dir/heuristic.cc.o.d"
+  "/root/package/src/search/open_list_factory.cc" "search/CMakeFiles/downward.dir/open_list_factory.cc.o" "gcc" "search/CMakeFiles/downward.dir/open_list_factory.cc.o.d"
+  "/root/package/src/search/open_lists/epsilon_greedy_open_list.cc" "search/CMakeFiles/downward.dir/open_lists/epsilon_greedy_open_list.cc.o" "gcc" "search/CMakeFiles/downward.dir/open_lists/epsilon_greedy_open_list.cc.o.d"
+  "/root/package/src/search/operator_cost.cc" "search/CMakeFiles/downward.dir/operator_cost.cc.o" "gcc" "search/CMakeFiles/downward.dir/operator_cost.cc.o.d"
+  "/root/package/src/search/operator_id.cc" "search/CMakeFiles/downward.dir/operator_id.cc.o" "gcc" "search/CMakeFiles/downward.dir/operator_id.cc.o.d"
+  "/root/package/src/search/parser/abstract_syntax_tree.cc" "search/CMakeFiles/downward.dir/parser/abstract_syntax_tree.cc.o" "gcc" "search/CMakeFiles/downward.dir/parser/abstract_syntax_tree.cc.o.d"
+  "/root/package/src/search/parser/decorated_abstract_syntax_tree.cc" "search/CMakeFiles/downward.dir/parser/decorated_abstract_syntax_tree.cc.o" "gcc" "search/CMakeFiles/downward.dir/parser/decorated_abstract_syntax_tree.cc.o.d"
+  "/root/package/src/search/parser/lexical_analyzer.cc" "search/CMakeFiles/downward.dir/parser/lexical_analyzer.cc.o" "gcc" "search/CMakeFiles/downward.dir/parser/lexical_analyzer.cc.o.d"
+  "/root/package/src/search/parser/syntax_analyzer.cc" "search/CMakeFiles/downward.dir/parser/syntax_analyzer.cc.o" "gcc" "search/CMakeFiles/downward.dir/parser/syntax_analyzer.cc.o.d"
+  "/root/package/src/search/parser/token_stream.cc" "search/CMakeFiles/downward.dir/parser/token_stream.cc.o" "gcc" "search/CMakeFiles/downward.dir/parser/token_stream.cc.o.d"
+  "/root/package/src/search/per_state_bitset.cc" "search/CMakeFiles/downward.dir/per_state_bitset.cc.o" "gcc" "search/CMakeFiles/downward.dir/per_state_bitset.cc.o.d"
+  "/root/package/src/search/plan_manager.cc" "search/CMakeFiles/downward.dir/plan_manager.cc.o" "gcc" "search/CMakeFiles/downward.dir/plan_manager.cc.o.d"
+  "/root/package/src/search/planner.cc" "search/CMakeFiles/downward.dir/planner.cc.o" "gcc" "search/CMakeFiles/downward.dir/planner.cc.o.d"
+  "/root/package/src/search/plugins/bounds.cc" "search/CMakeFiles/downward.dir/plugins/bounds.cc.o" "gcc" "search/CMakeFiles/downward.dir/plugins/bounds.cc.o.d"
+  "/root/package/src/search/plugins/doc_printer.cc" "search/CMakeFiles/downward.dir/plugins/doc_printer.cc.o" "gcc" "search/CMakeFiles/downward.dir/plugins/doc_printer.cc.o.d"
+  "/root/package/src/search/plugins/options.cc" "search/CMakeFiles/downward.dir/plugins/options.cc.o" "gcc" "search/CMakeFiles/downward.dir/plugins/options.cc.o.d"
+  "/root/package/src/search/plugins/plugin.cc" "search/CMakeFiles/downward.dir/plugins/plugin.cc.o" "gcc" "search/CMakeFiles/downward.dir/plugins/plugin.cc.o.d"
+  "/root/package/src/search/plugins/plugin_info.cc" "search/CMakeFiles/downward.dir/plugins/plugin_info.cc.o" "gcc" "search/CMakeFiles/downward.dir/plugins/plugin_info.cc.o.d"
+  "/root/package/src/search/plugins/raw_registry.cc" "search/CMakeFiles/downward.dir/plugins/raw_registry.cc.o" "gcc" "search/CMakeFiles/downward.dir/plugins/raw_registry.cc.o.d"
+  "/root/package/src/search/plugins/registry.cc" "search/CMakeFiles/downward.dir/plugins/registry.cc.o" "gcc" "search/CMakeFiles/downward.dir/plugins/registry.cc.o.d"
+  "/root/package/src/search/plugins/types.cc" "search/CMakeFiles/downward.dir/plugins/types.cc.o" "gcc" "search/CMakeFiles/downward.dir/plugins/types.cc.o.d"
+  "/root/package/src/search/pruning_method.cc" "search/CMakeFiles/downward.dir/pruning_method.cc.o" "gcc" "search/CMakeFiles/downward.dir/pruning_method.cc.o.d"
+  "/root/package/src/search/search_algorithm.cc" "search/CMakeFiles/downward.dir/search_algorithm.cc.o" "gcc" "search/CMakeFiles/downward.dir/search_algorithm.cc.o.d"
+  "/root/package/src/search/search_node_info.cc" "search/CMakeFiles/downward.dir/search_node_info.cc.o" "gcc" "search/CMakeFiles/downward.dir/search_node_info.cc.o.d"
+  "/root/package/src/search/search_progress.cc" "search/CMakeFiles/downward.dir/search_progress.cc.o" "gcc" "search/CMakeFiles/downward.dir/search_progress.cc.o.d"
+  "/root/package/src/search/search_space.cc" "search/CMakeFiles/downward.dir/search_space.cc.o" "gcc" "search/CMakeFiles/downward.dir/search_space.cc.o.d"
+  "/root/package/src/search/search_statistics.cc" "search/CMakeFiles/downward.dir/search_statistics.cc.o" "gcc" "search/CMakeFiles/downward.dir/search_statistics.cc.o.d"
+  "/root/package/src/search/state_id.cc" "search/CMakeFiles/downward.dir/state_id.cc.o" "gcc" "search/CMakeFiles/downward.dir/state_id.cc.o.d"
+  "/root/package/src/search/state_registry.cc" "search/CMakeFiles/downward.dir/state_registry.cc.o" "gcc" "search/CMakeFiles/downward.dir/state_registry.cc.o.d"
+  "/root/package/src/search/task_proxy.cc" "search/CMakeFiles/downward.dir/task_proxy.cc.o" "gcc" "search/CMakeFiles/downward.dir/task_proxy.cc.o.d"
+  "/root/package/src/search/task_utils/causal_graph.cc" "search/CMakeFiles/downward.dir/task_utils/causal_graph.cc.o" "gcc" "search/CMakeFiles/downward.dir/task_utils/causal_graph.cc.o.d"
+  "/root/package/src/search/task_utils/successor_generator.cc" "search/CMakeFiles/downward.dir/task_utils/successor_generator.cc.o" "gcc" "search/CMakeFiles/downward.dir/task_utils/successor_generator.cc.o.d"
+  "/root/package/src/search/task_utils/successor_generator_factory.cc" "search/CMakeFiles/downward.dir/task_utils/successor_generator_factory.cc.o" "gcc" "search/CMakeFiles/downward.dir/task_utils/successor_generator_factory.cc.o.d"
+  "/root/package/src/search/task_utils/successor_generator_internals.cc" "search/CMakeFiles/downward.dir/task_utils/successor_generator_internals.cc.o" "gcc" "search/CMakeFiles/downward.dir/task_utils/successor_generator_internals.cc.o.d"
+  "/root/package/src/search/task_utils/task_properties.cc" "search/CMakeFiles/downward.dir/task_utils/task_properties.cc.o" "gcc" "search/CMakeFiles/downward.dir/task_utils/task_properties.cc.o.d"
+  "/root/package/src/search/tasks/cost_adapted_task.cc" "search/CMakeFiles/downward.dir/tasks/cost_adapted_task.cc.o" "gcc" "search/CMakeFiles/downward.dir/tasks/cost_adapted_task.cc.o.d"
+  "/root/package/src/search/tasks/delegating_task.cc" "search/CMakeFiles/downward.dir/tasks/delegating_task.cc.o" "gcc" "search/CMakeFiles/downward.dir/tasks/delegating_task.cc.o.d"
+  "/root/package/src/search/tasks/root_task.cc" "search/CMakeFiles/downward.dir/tasks/root_task.cc.o" "gcc" "search/CMakeFiles/downward.dir/tasks/root_task.cc.o.d"
+  "/root/package/src/search/utils/component_errors.cc" "search/CMakeFiles/downward.dir/utils/component_errors.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/component_errors.cc.o.d"
+  "/root/package/src/search/utils/countdown_timer.cc" "search/CMakeFiles/downward.dir/utils/countdown_timer.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/countdown_timer.cc.o.d"
+  "/root/package/src/search/utils/exceptions.cc" "search/CMakeFiles/downward.dir/utils/exceptions.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/exceptions.cc.o.d"
+  "/root/package/src/search/utils/logging.cc" "search/CMakeFiles/downward.dir/utils/logging.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/logging.cc.o.d"
+  "/root/package/src/search/utils/markup.cc" "search/CMakeFiles/downward.dir/utils/markup.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/markup.cc.o.d"
+  "/root/package/src/search/utils/math.cc" "search/CMakeFiles/downward.dir/utils/math.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/math.cc.o.d"
+  "/root/package/src/search/utils/memory.cc" "search/CMakeFiles/downward.dir/utils/memory.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/memory.cc.o.d"
+  "/root/package/src/search/utils/rng.cc" "search/CMakeFiles/downward.dir/utils/rng.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/rng.cc.o.d"
+  "/root/package/src/search/utils/rng_options.cc" "search/CMakeFiles/downward.dir/utils/rng_options.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/rng_options.cc.o.d"
+  "/root/package/src/search/utils/strings.cc" "search/CMakeFiles/downward.dir/utils/strings.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/strings.cc.o.d"
+  "/root/package/src/search/utils/system.cc" "search/CMakeFiles/downward.dir/utils/system.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/system.cc.o.d"
+  "/root/package/src/search/utils/system_unix.cc" "search/CMakeFiles/downward.dir/utils/system_unix.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/system_unix.cc.o.d"
+  "/root/package/src/search/utils/system_windows.cc" "search/CMakeFiles/downward.dir/utils/system_windows.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/system_windows.cc.o.d"
+  "/root/package/src/search/utils/timer.cc" "search/CMakeFiles/downward.dir/utils/timer.cc.o" "gcc" "search/CMakeFiles/downward.dir/utils/timer.cc.o.d"
+  )
+
+# Targets to which this target links.
+set(CMAKE_TARGET_LINKED_INFO_FILES
+  )
+
+# Fortran module output directory.
+set(CMAKE_Fortran_TARGET_MODULE_DIR "")
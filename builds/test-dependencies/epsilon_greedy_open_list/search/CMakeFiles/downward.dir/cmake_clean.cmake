@@ -0,0 +1,129 @@
+file(REMOVE_RECURSE
+  "../bin/downward"
+  "../bin/downward.pdb"
+  "CMakeFiles/downward.dir/abstract_task.cc.o"
+  "CMakeFiles/downward.dir/abstract_task.cc.o.d"
+  "CMakeFiles/downward.dir/algorithms/int_packer.cc.o"
+  "CMakeFiles/downward.dir/algorithms/int_packer.cc.o.d"
+  "CMakeFiles/downward.dir/axioms.cc.o"
+  "CMakeFiles/downward.dir/axioms.cc.o.d"
+  "CMakeFiles/downward.dir/command_line.cc.o"
+  "CMakeFiles/downward.dir/command_line.cc.o.d"
+  "CMakeFiles/downward.dir/evaluation_context.cc.o"
+  "CMakeFiles/downward.dir/evaluation_context.cc.o.d"
+  "CMakeFiles/downward.dir/evaluation_result.cc.o"
+  "CMakeFiles/downward.dir/evaluation_result.cc.o.d"
+  "CMakeFiles/downward.dir/evaluator.cc.o"
+  "CMakeFiles/downward.dir/evaluator.cc.o.d"
+  "CMakeFiles/downward.dir/evaluator_cache.cc.o"
+  "CMakeFiles/downward.dir/evaluator_cache.cc.o.d"
+  "CMakeFiles/downward.dir/heuristic.cc.o"
+  "CMakeFiles/downward.dir/heuristic.cc.o.d"
+  "CMakeFiles/downward.dir/open_list_factory.cc.o"
+  "CMakeFiles/downward.dir/open_list_factory.cc.o.d"
+  "CMakeFiles/downward.dir/open_lists/epsilon_greedy_open_list.cc.o"
+  "CMakeFiles/downward.dir/open_lists/epsilon_greedy_open_list.cc.o.d"
+  "CMakeFiles/downward.dir/operator_cost.cc.o"
+  "CMakeFiles/downward.dir/operator_cost.cc.o.d"
+  "CMakeFiles/downward.dir/operator_id.cc.o"
+  "CMakeFiles/downward.dir/operator_id.cc.o.d"
+  "CMakeFiles/downward.dir/parser/abstract_syntax_tree.cc.o"
+  "CMakeFiles/downward.dir/parser/abstract_syntax_tree.cc.o.d"
+  "CMakeFiles/downward.dir/parser/decorated_abstract_syntax_tree.cc.o"
+  "CMakeFiles/downward.dir/parser/decorated_abstract_syntax_tree.cc.o.d"
+  "CMakeFiles/downward.dir/parser/lexical_analyzer.cc.o"
+  "CMakeFiles/downward.dir/parser/lexical_analyzer.cc.o.d"
+  "CMakeFiles/downward.dir/parser/syntax_analyzer.cc.o"
+  "CMakeFiles/downward.dir/parser/syntax_analyzer.cc.o.d"
+  "CMakeFiles/downward.dir/parser/token_stream.cc.o"
+  "CMakeFiles/downward.dir/parser/token_stream.cc.o.d"
+  "CMakeFiles/downward.dir/per_state_bitset.cc.o"
+  "CMakeFiles/downward.dir/per_state_bitset.cc.o.d"
+  "CMakeFiles/downward.dir/plan_manager.cc.o"
+  "CMakeFiles/downward.dir/plan_manager.cc.o.d"
+  "CMakeFiles/downward.dir/planner.cc.o"
+  "CMakeFiles/downward.dir/planner.cc.o.d"
+  "CMakeFiles/downward.dir/plugins/bounds.cc.o"
+  "CMakeFiles/downward.dir/plugins/bounds.cc.o.d"
+  "CMakeFiles/downward.dir/plugins/doc_printer.cc.o"
+  "CMakeFiles/downward.dir/plugins/doc_printer.cc.o.d"
+  "CMakeFiles/downward.dir/plugins/options.cc.o"
+  "CMakeFiles/downward.dir/plugins/options.cc.o.d"
+  "CMakeFiles/downward.dir/plugins/plugin.cc.o"
+  "CMakeFiles/downward.dir/plugins/plugin.cc.o.d"
+  "CMakeFiles/downward.dir/plugins/plugin_info.cc.o"
+  "CMakeFiles/downward.dir/plugins/plugin_info.cc.o.d"
+  "CMakeFiles/downward.dir/plugins/raw_registry.cc.o"
+  "CMakeFiles/downward.dir/plugins/raw_registry.cc.o.d"
+  "CMakeFiles/downward.dir/plugins/registry.cc.o"
+  "CMakeFiles/downward.dir/plugins/registry.cc.o.d"
+  "CMakeFiles/downward.dir/plugins/types.cc.o"
+  "CMakeFiles/downward.dir/plugins/types.cc.o.d"
+  "CMakeFiles/downward.dir/pruning_method.cc.o"
+  "CMakeFiles/downward.dir/pruning_method.cc.o.d"
+  "CMakeFiles/downward.dir/search_algorithm.cc.o"
+  "CMakeFiles/downward.dir/search_algorithm.cc.o.d"
+  "CMakeFiles/downward.dir/search_node_info.cc.o"
+  "CMakeFiles/downward.dir/search_node_info.cc.o.d"
+  "CMakeFiles/downward.dir/search_progress.cc.o"
+  "CMakeFiles/downward.dir/search_progress.cc.o.d"
+  "CMakeFiles/downward.dir/search_space.cc.o"
+  "CMakeFiles/downward.dir/search_space.cc.o.d"
+  "CMakeFiles/downward.dir/search_statistics.cc.o"
+  "CMakeFiles/downward.dir/search_statistics.cc.o.d"
+  "CMakeFiles/downward.dir/state_id.cc.o"
+  "CMakeFiles/downward.dir/state_id.cc.o.d"
+  "CMakeFiles/downward.dir/state_registry.cc.o"
+  "CMakeFiles/downward.dir/state_registry.cc.o.d"
+  "CMakeFiles/downward.dir/task_proxy.cc.o"
+  "CMakeFiles/downward.dir/task_proxy.cc.o.d"
+  "CMakeFiles/downward.dir/task_utils/causal_graph.cc.o"
+  "CMakeFiles/downward.dir/task_utils/causal_graph.cc.o.d"
+  "CMakeFiles/downward.dir/task_utils/successor_generator.cc.o"
+  "CMakeFiles/downward.dir/task_utils/successor_generator.cc.o.d"
+  "CMakeFiles/downward.dir/task_utils/successor_generator_factory.cc.o"
+  "CMakeFiles/downward.dir/task_utils/successor_generator_factory.cc.o.d"
+  "CMakeFiles/downward.dir/task_utils/successor_generator_internals.cc.o"
+  "CMakeFiles/downward.dir/task_utils/successor_generator_internals.cc.o.d"
+  "CMakeFiles/downward.dir/task_utils/task_properties.cc.o"
+  "CMakeFiles/downward.dir/task_utils/task_properties.cc.o.d"
+  "CMakeFiles/downward.dir/tasks/cost_adapted_task.cc.o"
+  "CMakeFiles/downward.dir/tasks/cost_adapted_task.cc.o.d"
+  "CMakeFiles/downward.dir/tasks/delegating_task.cc.o"
+  "CMakeFiles/downward.dir/tasks/delegating_task.cc.o.d"
+  "CMakeFiles/downward.dir/tasks/root_task.cc.o"
+  "CMakeFiles/downward.dir/tasks/root_task.cc.o.d"
+  "CMakeFiles/downward.dir/utils/component_errors.cc.o"
+  "CMakeFiles/downward.dir/utils/component_errors.cc.o.d"
+  "CMakeFiles/downward.dir/utils/countdown_timer.cc.o"
+  "CMakeFiles/downward.dir/utils/countdown_timer.cc.o.d"
+  "CMakeFiles/downward.dir/utils/exceptions.cc.o"
+  "CMakeFiles/downward.dir/utils/exceptions.cc.o.d"
+  "CMakeFiles/downward.dir/utils/logging.cc.o"
+  "CMakeFiles/downward.dir/utils/logging.cc.o.d"
+  "CMakeFiles/downward.dir/utils/markup.cc.o"
+  "CMakeFiles/downward.dir/utils/markup.cc.o.d"
+  "CMakeFiles/downward.dir/utils/math.cc.o"
+  "CMakeFiles/downward.dir/utils/math.cc.o.d"
+  "CMakeFiles/downward.dir/utils/memory.cc.o"
+  "CMakeFiles/downward.dir/utils/memory.cc.o.d"
+  "CMakeFiles/downward.dir/utils/rng.cc.o"
+  "CMakeFiles/downward.dir/utils/rng.cc.o.d"
+  "CMakeFiles/downward.dir/utils/rng_options.cc.o"
+  "CMakeFiles/downward.dir/utils/rng_options.cc.o.d"
+  "CMakeFiles/downward.dir/utils/strings.cc.o"
+  "CMakeFiles/downward.dir/utils/strings.cc.o.d"
+  "CMakeFiles/downward.dir/utils/system.cc.o"
+  "CMakeFiles/downward.dir/utils/system.cc.o.d"
+  "CMakeFiles/downward.dir/utils/system_unix.cc.o"
+  "CMakeFiles/downward.dir/utils/system_unix.cc.o.d"
+  "CMakeFiles/downward.dir/utils/system_windows.cc.o"
+  "CMakeFiles/downward.dir/utils/system_windows.cc.o.d"
+  "CMakeFiles/downward.dir/utils/timer.cc.o"
+  "CMakeFiles/downward.dir/utils/timer.cc.o.d"
+)
+
+# Per-language clean rules from dependency scanning.
+foreach(lang CXX)
+  include(CMakeFiles/downward.dir/cmake_clean_${lang}.cmake OPTIONAL)
+endforeach()
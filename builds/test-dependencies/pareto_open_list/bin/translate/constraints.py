@@ -0,0 +1,308 @@
+import itertools
+from typing import Iterable, List, Tuple
+
+class InequalityDisjunction:
+    def __init__(self, parts: List[Tuple[str, str]]):
+        self.parts = parts
+        assert len(parts)
+
+    def __str__(self):
+        disj = " or ".join([f"({v1} != {v2})" for (v1, v2) in self.parts])
+        return f"({disj})"
+
+
+class EqualityConjunction:
+    def __init__(self, equalities: List[Tuple[str, str]]):
+        self.equalities = equalities
+        # A conjunction of expressions x = y, where x,y are either strings
+        # that denote objects or variables, or ints that denote invariant
+        # parameters.
+
+        self._consistent = None
+        self._representative = None # dictionary
+        self._eq_classes = None
+
+    def __str__(self):
+        conj = " and ".join([f"({v1} = {v2})" for (v1, v2) in self.equalities])
+        return f"({conj})"
+
+    def _compute_equivalence_classes(self):
+        eq_classes = {}
+        for (v1, v2) in self.equalities:
+            c1 = eq_classes.setdefault(v1, {v1})
+            c2 = eq_classes.setdefault(v2, {v2})
+            if c1 is not c2:
+                if len(c2) > len(c1):
+                    v1, c1, v2, c2 = v2, c2, v1, c1
+                c1.update(c2)
+                for elem in c2:
+                    eq_classes[elem] = c1
+        self._eq_classes = eq_classes
+
+    def _compute_representatives(self):
+        if not self._eq_classes:
+            self._compute_equivalence_classes()
+
+        # Choose a representative for each equivalence class. Objects are
+        # prioritized over variables and ints, but at most one object per
+        # equivalence class is allowed (otherwise the conjunction is
+        # inconsistent).
+        representative = {}
+        for eq_class in self._eq_classes.values():
+            if next(iter(eq_class)) in representative:
+                continue # we already processed this equivalence class
+            variables = [item for item in eq_class if isinstance(item, int) or
+                         item.startswith("?")]
+            objects = [item for item in eq_class if not isinstance(item, int)
+                       and not item.startswith("?")]
+
+            if len(objects) >= 2:
+                self._consistent = False
+                self._representative = None
+                return
+            if objects:
+                set_val = objects[0]
+            else:
+                set_val = variables[0]
+            for entry in eq_class:
+                representative[entry] = set_val
+        self._consistent = True
+        self._representative = representative
+
+    def is_consistent(self):
+        if self._consistent is None:
+            self._compute_representatives()
+        return self._consistent
+
+    def get_representative(self):
+        if self._consistent is None:
+            self._compute_representatives()
+        return self._representative
+
+
+class ConstraintSystem:
+    """A ConstraintSystem stores two parts, both talking about the equality or
+       inequality of strings and ints (strings representing objects or
+       variables, ints representing invariant parameters):
+        - equality_DNFs is a list containing lists of EqualityConjunctions.
+          Each EqualityConjunction represents an expression of the form
+          (x1 = y1 and ... and xn = yn). A list of EqualityConjunctions can be
+          interpreted as a disjunction of such expressions. So
+          self.equality_DNFs represents a formula of the form "⋀ ⋁ ⋀ (x = y)"
+          as a list of lists of EqualityConjunctions.
+        - ineq_disjunctions is a list of InequalityDisjunctions. Each of them
+          represents a expression of the form (u1 != v1 or ... or um !=i vm).
+        - not_constant is a list of strings.
+
+        We say that the system is solvable if we can pick from each list of
+        EqualityConjunctions in equality_DNFs one EquivalenceConjunction such
+        that the finest equivalence relation induced by all the equivalences in
+        the conjunctions is
+        - consistent, i.e. no equivalence class contains more than one object,
+        - for every disjunction in ineq_disjunctions there is at least one
+          inequality such that the two terms are in different equivalence
+          classes.
+        - every element of not_constant is not in the same equivalence class
+          as a constant.
+        We refer to the equivalence relation as the solution of the system."""
+
+    def __init__(self):
+        self.equality_DNFs = []
+        self.ineq_disjunctions = []
+        self.not_constant = []
+
+    def __str__(self):
+        equality_DNFs = []
+        for eq_DNF in self.equality_DNFs:
+            disj = " or ".join([str(eq_conjunction)
+                                for eq_conjunction in eq_DNF])
+            disj = "(%s)" % disj
+            equality_DNFs.append(disj)
+        eq_part = " and\n".join(equality_DNFs)
+
+        ineq_disjunctions = [str(clause) for clause in self.ineq_disjunctions]
+        ineq_part = " and ".join(ineq_disjunctions)
+        return f"{eq_part} ({ineq_part}) (not constant {self.not_constant}"
+
+    def _combine_equality_conjunctions(self, eq_conjunctions:
+                                       Iterable[EqualityConjunction]) -> None:
+        all_eq = itertools.chain.from_iterable(c.equalities
+                                               for c in eq_conjunctions)
+        return EqualityConjunction(list(all_eq))
+
+    def add_equality_conjunction(self, eq_conjunction: EqualityConjunction):
+        self.add_equality_DNF([eq_conjunction])
+
+    def add_equality_DNF(self, equality_DNF: List[EqualityConjunction]) -> None:
+        self.equality_DNFs.append(equality_DNF)
+
+    def add_inequality_disjunction(self, ineq_disj: InequalityDisjunction):
+        self.ineq_disjunctions.append(ineq_disj)
+
+    def add_not_constant(self, not_constant: str) -> None:
+        self.not_constant.append(not_constant)
+
+    def extend(self, other: "ConstraintSystem") -> None:
+        self.equality_DNFs.extend(other.equality_DNFs)
+        self.ineq_disjunctions.extend(other.ineq_disjunctions)
+        self.not_constant.extend(other.not_constant)
+
+    def is_solvable(self):
+        # cf. top of class for explanation
+        return _BacktrackingSolver(self).solve()
+
+    def is_solvable_by_enumeration(self):
+        """Reference implementation of is_solvable that checks every
+        combination of equality conjunctions from scratch. It takes time
+        exponential in the number of equality DNFs and is only kept for
+        testing and benchmarking the backtracking solver."""
+        def inequality_disjunction_ok(ineq_disj, representative):
+            for inequality in ineq_disj.parts:
+                a, b = inequality
+                if representative.get(a, a) != representative.get(b, b):
+                    return True
+            return False
+
+        for eq_conjunction in itertools.product(*self.equality_DNFs):
+            combined = self._combine_equality_conjunctions(eq_conjunction)
+            if not combined.is_consistent():
+                continue
+            # check whether with the finest equivalence relation induced by the
+            # combined equality conjunction there is no element of not_constant
+            # in the same equivalence class as a constant and that in each
+            # inequality disjunction there is an inequality where the two terms
+            # are in different equivalence classes.
+            representative = combined.get_representative()
+            if any(not isinstance(representative.get(s, s), int) and
+                   representative.get(s, s)[0] != "?"
+                   for s in self.not_constant):
+                continue
+            if any(not inequality_disjunction_ok(d, representative)
+                   for d in self.ineq_disjunctions):
+                continue
+            return True
+        return False
+
+
+def _is_object(term):
+    return not isinstance(term, int) and term[0] != "?"
+
+
+class _BacktrackingSolver:
+    """Decides whether a ConstraintSystem is solvable by picking one
+       EqualityConjunction per equality DNF at a time and backtracking as
+       soon as the partial choice is inconsistent, puts an element of
+       not_constant into the same equivalence class as an object, or
+       falsifies all inequalities of an inequality disjunction. All three
+       conditions are monotonic (merging equivalence classes can only
+       make them worse), so pruning partial choices is safe.
+
+       The equivalence relation is maintained as a union-find structure
+       with union by size and without path compression, so that unions
+       can be undone in reverse order when backtracking."""
+
+    def __init__(self, system):
+        # Equality DNFs with a single conjunction leave no choice and are
+        # applied up front. The others are tried in order of increasing
+        # size, so that failures are detected as early as possible.
+        self.forced_conjunctions = [
+            equality_DNF[0] for equality_DNF in system.equality_DNFs
+            if len(equality_DNF) == 1]
+        self.equality_DNFs = sorted(
+            (equality_DNF for equality_DNF in system.equality_DNFs
+             if len(equality_DNF) != 1), key=len)
+        self.ineq_disjunctions = system.ineq_disjunctions
+        self.not_constant = set(system.not_constant)
+        self.parent = {}
+        self.size = {}
+        # For each root, the object in its class (or None) and whether
+        # its class contains an element of not_constant.
+        self.object = {}
+        self.has_not_constant = {}
+        self.trail = []
+
+    def _add_term(self, term):
+        self.parent[term] = term
+        self.size[term] = 1
+        self.object[term] = term if _is_object(term) else None
+        self.has_not_constant[term] = term in self.not_constant
+
+    def _find(self, term):
+        parent = self.parent
+        next_term = parent.get(term, term)
+        while next_term != term:
+            term = next_term
+            next_term = parent[term]
+        return term
+
+    def _union(self, term1, term2):
+        """Merge the classes of the two terms. Return False (without
+           merging) if this would make the relation inconsistent or put
+           an element of not_constant into the class of an object."""
+        if term1 not in self.parent:
+            self._add_term(term1)
+        if term2 not in self.parent:
+            self._add_term(term2)
+        root1 = self._find(term1)
+        root2 = self._find(term2)
+        if root1 == root2:
+            return True
+        object1 = self.object[root1]
+        object2 = self.object[root2]
+        if object1 is not None and object2 is not None:
+            return False
+        new_object = object1 if object1 is not None else object2
+        new_not_constant = (self.has_not_constant[root1] or
+                            self.has_not_constant[root2])
+        if new_object is not None and new_not_constant:
+            return False
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+        self.trail.append((root2, root1, self.object[root1],
+                           self.has_not_constant[root1]))
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+        self.object[root1] = new_object
+        self.has_not_constant[root1] = new_not_constant
+        return True
+
+    def _undo(self, trail_length):
+        while len(self.trail) > trail_length:
+            child, root, old_object, old_not_constant = self.trail.pop()
+            self.parent[child] = child
+            self.size[root] -= self.size[child]
+            self.object[root] = old_object
+            self.has_not_constant[root] = old_not_constant
+
+    def _inequalities_satisfiable(self):
+        for ineq_disj in self.ineq_disjunctions:
+            for a, b in ineq_disj.parts:
+                if self._find(a) != self._find(b):
+                    break
+            else:
+                return False
+        return True
+
+    def _choose(self, dnf_no):
+        if dnf_no == len(self.equality_DNFs):
+            return True
+        trail_length = len(self.trail)
+        for eq_conjunction in self.equality_DNFs[dnf_no]:
+            if (all(self._union(v1, v2)
+                    for v1, v2 in eq_conjunction.equalities) and
+                    self._inequalities_satisfiable() and
+                    self._choose(dnf_no + 1)):
+                return True
+            self._undo(trail_length)
+        return False
+
+    def solve(self):
+        if any(_is_object(term) for term in self.not_constant):
+            return False
+        for eq_conjunction in self.forced_conjunctions:
+            for v1, v2 in eq_conjunction.equalities:
+                if not self._union(v1, v2):
+                    return False
+        if not self._inequalities_satisfiable():
+            return False
+        return self._choose(0)
@@ -0,0 +1,222 @@
+"""Fast path for tasks that are already grounded.
+
+Some generators produce PDDL tasks whose actions and axioms have no
+parameters and only mention constant atoms. After normalizing such a
+task, all exploration rules (see normalize.build_exploration_rules) are
+ground, so we compute the relaxed reachable atoms directly with a
+counter for the unreached conditions of each rule instead of generating
+and evaluating a Datalog program. The resulting model contains the same
+atoms as the one of build_model, but in a different order.
+
+The lifted invariant synthesis treats every ground atom of such a task
+as an instance of its predicate, which rarely leads to useful invariants
+and can produce huge numbers of candidates. Instead, we synthesize
+invariants over ground atoms with the same scheme: starting from single
+atoms, a candidate set of atoms is an invariant (at most one of its atoms
+is true in every state) if every action that adds an atom of the set
+either requires this atom or requires and deletes another atom of the
+set, and no action adds two atoms of the set. A candidate that violates
+the first condition for some action is refined by adding each
+precondition of the action that it deletes. If there is only one such
+precondition, we add it right away, which finds invariants like "each
+satellite points to one direction" without enumerating their subsets."""
+
+from collections import defaultdict, deque
+import time
+
+import normalize
+import options
+import pddl
+import pddl_to_prolog
+import timers
+
+
+def is_grounded(task):
+    for action in task.actions:
+        if action.parameters:
+            return False
+        for effect in action.effects:
+            if effect.parameters:
+                return False
+    return not any(axiom.parameters for axiom in task.axioms)
+
+
+def compute_model(task, statistics=None):
+    """Return the atoms that build_model.compute_model computes for the
+    Datalog program of the task, which must be grounded."""
+    with timers.timing("Preparing model"):
+        prog = pddl_to_prolog.PrologProgram()
+        pddl_to_prolog.translate_facts(prog, task)
+        rules = normalize.build_exploration_rules(task)
+        num_unreached = []
+        rules_by_condition = defaultdict(list)
+        queue = deque(fact.atom for fact in prog.facts)
+        for rule_no, (conditions, effect) in enumerate(rules):
+            conditions = set(conditions)
+            num_unreached.append(len(conditions))
+            for condition in conditions:
+                rules_by_condition[condition].append(rule_no)
+            if not conditions:
+                queue.append(effect)
+    print("Generated %d ground rules." % len(rules))
+    with timers.timing("Computing model"):
+        model = []
+        reached = set()
+        while queue:
+            atom = queue.popleft()
+            if atom in reached:
+                continue
+            reached.add(atom)
+            model.append(atom)
+            for rule_no in rules_by_condition.get(atom, ()):
+                num_unreached[rule_no] -= 1
+                if not num_unreached[rule_no]:
+                    queue.append(rules[rule_no][1])
+    print("%d relevant atoms" % len(model))
+    if statistics is not None:
+        statistics.count_model(model)
+    return model
+
+
+def _get_literals(condition):
+    if isinstance(condition, pddl.Literal):
+        return [condition]
+    return [part for part in condition.parts
+            if isinstance(part, pddl.Literal)]
+
+
+class GroundAction:
+    """An action whose atoms are given by numbers. For each atom that
+    the action adds without requiring it, unbalanced_add_effects lists,
+    per add effect, the preconditions that the effect deletes."""
+
+    def __init__(self, action, get_atom_no):
+        precondition = {get_atom_no(literal) for literal
+                        in _get_literals(action.precondition)
+                        if not literal.negated}
+        add_effects = []
+        del_effects = []
+        for effect in action.effects:
+            condition = frozenset(_get_literals(effect.condition))
+            if effect.literal.negated:
+                del_effects.append(
+                    (condition, get_atom_no(effect.literal.negate())))
+            else:
+                add_effects.append((condition, get_atom_no(effect.literal)))
+        self.added_atoms = sorted({atom for _, atom in add_effects})
+        self.unbalanced_add_effects = defaultdict(list)
+        for condition, atom in add_effects:
+            if atom not in precondition:
+                self.unbalanced_add_effects[atom].append(
+                    [del_atom for del_condition, del_atom in del_effects
+                     if del_atom in precondition and
+                     del_condition <= condition])
+
+
+class InvariantFinder:
+    def __init__(self, actions):
+        self.atoms = []
+        atom_numbers = {}
+
+        def get_atom_no(atom):
+            atom_no = atom_numbers.get(atom)
+            if atom_no is None:
+                atom_no = len(self.atoms)
+                self.atoms.append(atom)
+                atom_numbers[atom] = atom_no
+            return atom_no
+
+        self.actions = [GroundAction(action, get_atom_no)
+                        for action in actions]
+        self.actions_by_add_effect = defaultdict(list)
+        for action_no, action in enumerate(self.actions):
+            for atom in action.added_atoms:
+                self.actions_by_add_effect[atom].append(action_no)
+
+    def get_initial_candidates(self):
+        return [frozenset([atom]) for atom in self.actions_by_add_effect]
+
+    def get_atoms(self, candidate):
+        return frozenset(self.atoms[atom] for atom in candidate)
+
+    def check_balance(self, candidate, enqueue_func):
+        """Return the closure of the candidate if it is an invariant and
+        None otherwise. If an action that adds an atom of the candidate
+        requires and deletes exactly one atom, every invariant that
+        contains the candidate also contains this atom, so we add it to
+        the candidate directly instead of refining it."""
+        candidate = set(candidate)
+        unchecked_atoms = deque(sorted(candidate))
+        unbalanced = []
+        while unchecked_atoms:
+            atom = unchecked_atoms.popleft()
+            for action_no in self.actions_by_add_effect[atom]:
+                action = self.actions[action_no]
+                num_added = 0
+                for add_atom in action.added_atoms:
+                    if add_atom in candidate:
+                        num_added += 1
+                if num_added > 1:
+                    return None
+                for deleted in action.unbalanced_add_effects.get(atom, ()):
+                    if any(del_atom in candidate for del_atom in deleted):
+                        continue
+                    if not deleted:
+                        return None
+                    if len(deleted) == 1:
+                        candidate.add(deleted[0])
+                        unchecked_atoms.append(deleted[0])
+                    else:
+                        unbalanced.append(deleted)
+        for deleted in unbalanced:
+            if not any(del_atom in candidate for del_atom in deleted):
+                for del_atom in deleted:
+                    enqueue_func(frozenset(candidate | {del_atom}))
+                return None
+        return frozenset(candidate)
+
+
+def find_invariants(task, reachable_action_params=None):
+    """Generate the invariants of the grounded task as frozensets of
+    atoms with more than one atom."""
+    actions = [action for action in task.actions
+               if reachable_action_params is None or
+               action in reachable_action_params]
+    finder = InvariantFinder(actions)
+    limit = options.invariant_generation_max_candidates
+    candidates = deque(finder.get_initial_candidates()[:limit])
+    print(len(candidates), "initial candidates")
+    seen_candidates = set(candidates)
+
+    def enqueue_func(candidate):
+        if len(seen_candidates) < limit and candidate not in seen_candidates:
+            candidates.append(candidate)
+            seen_candidates.add(candidate)
+
+    # Starting from an atom of an invariant that we already found mostly
+    # leads to the same invariant again, so we skip such atoms.
+    found_invariants = set()
+    covered_atoms = set()
+    start_time = time.process_time()
+    while candidates:
+        candidate = candidates.popleft()
+        if time.process_time() - start_time > options.invariant_generation_max_time:
+            print("Time limit reached, aborting invariant generation")
+            return
+        if len(candidate) == 1 and candidate <= covered_atoms:
+            continue
+        invariant = finder.check_balance(candidate, enqueue_func)
+        if (invariant is not None and len(invariant) > 1 and
+                invariant not in found_invariants):
+            found_invariants.add(invariant)
+            covered_atoms |= invariant
+            yield finder.get_atoms(invariant)
+
+
+def useful_groups(invariants, initial_facts):
+    """Like invariant_finder.useful_groups for ground invariants: we keep
+    the invariants with exactly one atom in the initial state."""
+    initial_facts = set(initial_facts)
+    for invariant in invariants:
+        if len(invariant & initial_facts) == 1:
+            yield sorted(invariant)
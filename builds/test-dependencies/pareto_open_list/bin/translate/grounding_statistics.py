@@ -0,0 +1,111 @@
+"""Statistics that explain where the grounding effort of a task goes.
+
+The statistics are collected by build_model.compute_model (atoms per
+predicate and firings and matches per rule of the Datalog program) and
+by instantiate.instantiate (ground actions and axioms per schema before
+and after instantiating them, which discards instantiations whose
+preconditions are statically false)."""
+
+from collections import Counter
+import json
+
+import pddl
+
+# Number of rows in each table of the summary.
+NUM_TOP_ENTRIES = 20
+
+
+class RuleStatistics:
+    def __init__(self, rule_type, description):
+        self.rule_type = rule_type
+        self.description = description
+        # Number of times the rule was fired with an atom taken from the
+        # queue, number of effect atoms generated (also when indexing
+        # static atoms), and number of those that were new.
+        self.firings = 0
+        self.matches = 0
+        self.new_atoms = 0
+
+
+class GroundingStatistics:
+    def __init__(self):
+        self.rules = []
+        self.atoms_by_predicate = Counter()
+        self.schema_names = {}
+        self.num_schemas_by_name = Counter()
+        self.reachable_by_schema = Counter()
+        self.instantiated_by_schema = Counter()
+
+    def get_predicate_name(self, predicate):
+        if isinstance(predicate, (pddl.Action, pddl.Axiom)):
+            return self.get_schema_name(predicate)
+        return predicate
+
+    def get_schema_name(self, schema):
+        """Return a unique name for the action or axiom schema. Splitting
+        disjunctions can create several schemas with the same name,
+        which are numbered in the order we see them."""
+        name = self.schema_names.get(schema)
+        if name is None:
+            kind = "action" if isinstance(schema, pddl.Action) else "axiom"
+            name = "%s %s" % (kind, schema.name)
+            self.num_schemas_by_name[name] += 1
+            num_same_name = self.num_schemas_by_name[name]
+            if num_same_name > 1:
+                name = "%s#%d" % (name, num_same_name)
+            self.schema_names[schema] = name
+        return name
+
+    def add_rule(self, rule):
+        def atom_to_str(atom):
+            args = ["?v%d" % arg if isinstance(arg, int) else arg
+                    for arg in atom.args]
+            return "%s(%s)" % (self.get_predicate_name(atom.predicate),
+                               ", ".join(args))
+        description = "%s :- %s" % (
+            atom_to_str(rule.effect),
+            ", ".join(atom_to_str(cond) for cond in rule.conditions))
+        statistics = RuleStatistics(rule.type, description)
+        self.rules.append(statistics)
+        return statistics
+
+    def count_model(self, model):
+        for atom in model:
+            self.atoms_by_predicate[
+                self.get_predicate_name(atom.predicate)] += 1
+
+    def count_reachable(self, schema):
+        self.reachable_by_schema[self.get_schema_name(schema)] += 1
+
+    def count_instantiated(self, schema):
+        self.instantiated_by_schema[self.get_schema_name(schema)] += 1
+
+    def dump(self):
+        print("Grounding statistics:")
+        print("%-60s %10s" % ("predicate", "atoms"))
+        for name, num in self.atoms_by_predicate.most_common(NUM_TOP_ENTRIES):
+            print("%-60s %10d" % (name, num))
+        print("%-7s %10s %10s %10s  %s" % (
+            "type", "firings", "matches", "new atoms", "rule"))
+        rules = sorted(self.rules, key=lambda rule: -rule.matches)
+        for rule in rules[:NUM_TOP_ENTRIES]:
+            print("%-7s %10d %10d %10d  %s" % (
+                rule.rule_type, rule.firings, rule.matches, rule.new_atoms,
+                rule.description))
+        print("%-60s %10s %12s" % ("schema", "reachable", "instantiated"))
+        for name, num in self.reachable_by_schema.most_common(NUM_TOP_ENTRIES):
+            print("%-60s %10d %12d" % (
+                name, num, self.instantiated_by_schema[name]))
+
+    def write_json(self, filename):
+        data = {
+            "atoms_by_predicate": dict(self.atoms_by_predicate.most_common()),
+            "rules": [vars(rule) for rule in self.rules],
+            "schemas": [
+                {"name": name, "reachable": num,
+                 "instantiated": self.instantiated_by_schema[name]}
+                for name, num in self.reachable_by_schema.most_common()],
+        }
+        with open(filename, "w") as json_file:
+            json.dump(data, json_file, indent=1)
+            json_file.write("\n")
@@ -499,6 +499,10 @@ def parse_args():
 
     if not args.version and not args.show_aliases and not args.cleanup:
         _set_components_and_inputs(parser, args)
+        if "--estimate-only" in args.translate_options and "search" in args.components:
+            print_usage_and_exit_with_driver_input_error(
+                parser, "The translator does not write a task for the search with "
+                        "\"--estimate-only\". Use \"--translate\" to only run the translator.")
         if "translate" not in args.components or "search" not in args.components:
             args.keep_sas_file = True
 
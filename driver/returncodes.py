@@ -20,6 +20,7 @@ TRANSLATE_OUT_OF_TIME = 21
 SEARCH_OUT_OF_MEMORY = 22
 SEARCH_OUT_OF_TIME = 23
 SEARCH_OUT_OF_MEMORY_AND_TIME = 24
+TRANSLATE_TASK_TOO_LARGE = 25
 
 TRANSLATE_CRITICAL_ERROR = 30
 TRANSLATE_INPUT_ERROR = 31
@@ -90,6 +90,10 @@ def run_translate(args):
 
     if returncode == 0:
         return (0, True)
+    elif returncode == returncodes.TRANSLATE_TASK_TOO_LARGE:
+        logging.info("Translator refused the task because its estimated "
+                     "size exceeds --max-estimated-operators.")
+        return (returncode, False)
     elif returncode == 1:
         # Unlikely case that the translator crashed without raising an
         # exception.
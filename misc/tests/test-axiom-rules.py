@@ -0,0 +1,84 @@
+from collections import defaultdict
+import os
+import random
+import sys
+
+import pytest
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_BASE = os.path.dirname(os.path.dirname(DIR))
+
+# The translator parses the command line when the options module is
+# imported.
+sys.argv = [sys.argv[0], "domain.pddl", "task.pddl"]
+sys.path.insert(0, os.path.join(REPO_BASE, "src", "translate"))
+import axiom_rules
+import pddl
+
+
+def get_random_set(rng, max_size):
+    return sorted(rng.sample(range(10), rng.randint(0, max_size)))
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_subsumption_index(seed):
+    rng = random.Random(seed)
+    index = axiom_rules.SubsumptionIndex()
+    added = []
+    for _ in range(rng.randint(0, 12)):
+        literals = get_random_set(rng, 5)
+        index.add(literals)
+        added.append(set(literals))
+    for _ in range(50):
+        literals = get_random_set(rng, 10)
+        assert index.contains_subset_of(literals) == any(
+            added_set <= set(literals) for added_set in added)
+
+
+def compute_simplified_axioms_by_intersection(axioms):
+    # Reference implementation: intersect the sets of axioms containing
+    # each literal of an axiom, as before the subsumption index was used.
+    for axiom in axioms:
+        axiom.condition = sorted(set(axiom.condition))
+    axioms_to_skip = set()
+    axioms_by_literal = defaultdict(set)
+    for axiom in axioms:
+        if axiom.effect in axiom.condition:
+            axioms_to_skip.add(id(axiom))
+        else:
+            for literal in axiom.condition:
+                axioms_by_literal[literal].add(id(axiom))
+    for axiom in axioms:
+        if id(axiom) in axioms_to_skip:
+            continue
+        if not axiom.condition:
+            return [axiom]
+        literals = iter(axiom.condition)
+        dominated_axioms = axioms_by_literal[next(literals)].copy()
+        for literal in literals:
+            dominated_axioms &= axioms_by_literal[literal]
+        for dominated_axiom in dominated_axioms:
+            if dominated_axiom != id(axiom):
+                axioms_to_skip.add(dominated_axiom)
+    return [axiom for axiom in axioms if id(axiom) not in axioms_to_skip]
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_compute_simplified_axioms(seed):
+    rng = random.Random(seed)
+    effect = pddl.Atom("derived", ["a"])
+    atoms = [effect] + [pddl.Atom("p", [str(i)]) for i in range(5)]
+    literals = atoms + [atom.negate() for atom in atoms]
+    axioms = [
+        pddl.PropositionalAxiom(
+            "derived", [rng.choice(literals)
+                        for _ in range(rng.choice([0, 1, 2, 2, 3, 3, 4]))],
+            effect)
+        for _ in range(rng.randint(1, 10))]
+    reference_axioms = [axiom.clone() for axiom in axioms]
+    result = axiom_rules.compute_simplified_axioms(axioms)
+    reference = compute_simplified_axioms_by_intersection(reference_axioms)
+    assert [axioms.index(axiom) for axiom in result] == [
+        reference_axioms.index(axiom) for axiom in reference]
+    for axiom, reference_axiom in zip(axioms, reference_axioms):
+        assert axiom.condition == reference_axiom.condition
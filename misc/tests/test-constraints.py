@@ -0,0 +1,50 @@
+import os
+import random
+import sys
+
+import pytest
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_BASE = os.path.dirname(os.path.dirname(DIR))
+
+sys.path.insert(0, os.path.join(REPO_BASE, "src", "translate"))
+from constraints import (ConstraintSystem, EqualityConjunction,
+                         InequalityDisjunction)
+
+OBJECTS = ["a", "b", "c"]
+VARIABLES = ["?x", "?y", "?z", "?w"]
+PARAMETERS = [0, 1]
+TERMS = OBJECTS + VARIABLES + PARAMETERS
+
+
+def get_random_pairs(rng, max_pairs):
+    return [tuple(rng.sample(TERMS, 2))
+            for _ in range(rng.randint(0, max_pairs))]
+
+
+def get_random_system(rng):
+    system = ConstraintSystem()
+    for _ in range(rng.randint(0, 4)):
+        system.add_equality_DNF([
+            EqualityConjunction(get_random_pairs(rng, 3))
+            for _ in range(rng.choice([0, 1, 1, 2, 2, 3]))])
+    for _ in range(rng.randint(0, 3)):
+        system.add_inequality_disjunction(InequalityDisjunction(
+            [tuple(rng.sample(TERMS, 2)) for _ in range(rng.randint(1, 2))]))
+    for _ in range(rng.randint(0, 2)):
+        system.add_not_constant(rng.choice(VARIABLES + PARAMETERS + ["a"]))
+    return system
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_backtracking_solver_agrees_with_enumeration(seed):
+    rng = random.Random(seed)
+    results = set()
+    for _ in range(200):
+        system = get_random_system(rng)
+        result = system.is_solvable()
+        assert result == system.is_solvable_by_enumeration(), str(system)
+        results.add(result)
+    # Make sure that the systems are neither all solvable nor all
+    # unsolvable.
+    assert results == {False, True}
@@ -0,0 +1,97 @@
+import json
+import os
+import subprocess
+import sys
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_BASE = os.path.dirname(os.path.dirname(DIR))
+TRANSLATOR = os.path.join(REPO_BASE, "src", "translate", "translate.py")
+
+# The robot parameter of move only occurs in the static atoms of
+# can-move, so the copies of move for both robots become identical
+# operators. finish-tired is dominated by finish, which has a subset of
+# its preconditions and a lower cost.
+DOMAIN = """
+(define (domain pruning)
+  (:requirements :typing :action-costs)
+  (:types robot room)
+  (:predicates (at ?r - room) (connected ?a ?b - room)
+               (can-move ?x - robot) (tired) (done))
+  (:functions (total-cost) - number)
+  (:action move
+    :parameters (?x - robot ?from ?to - room)
+    :precondition (and (can-move ?x) (at ?from) (connected ?from ?to))
+    :effect (and (not (at ?from)) (at ?to) (increase (total-cost) 1)))
+  (:action rest
+    :parameters ()
+    :precondition (at b)
+    :effect (and (tired) (increase (total-cost) 1)))
+  (:action finish-tired
+    :parameters ()
+    :precondition (and (tired) (at b))
+    :effect (and (done) (increase (total-cost) 2)))
+  (:action finish
+    :parameters ()
+    :precondition (at b)
+    :effect (and (done) (increase (total-cost) 1))))
+"""
+
+PROBLEM = """
+(define (problem pruning-1)
+  (:domain pruning)
+  (:objects r1 r2 - robot a b - room)
+  (:init (at a) (connected a b) (connected b a) (can-move r1) (can-move r2)
+         (= (total-cost) 0))
+  (:goal (done))
+  (:metric minimize (total-cost)))
+"""
+
+
+def translate(tmp_path, *options):
+    domain_file = tmp_path / "domain.pddl"
+    problem_file = tmp_path / "problem.pddl"
+    domain_file.write_text(DOMAIN)
+    problem_file.write_text(PROBLEM)
+    return subprocess.run(
+        [sys.executable, TRANSLATOR, str(domain_file), str(problem_file),
+         "--sas-file", str(tmp_path / "output.sas")] + list(options),
+        cwd=tmp_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+
+
+def get_operator_names(sas_file):
+    lines = sas_file.read_text().splitlines()
+    return [lines[index + 1] for index, line in enumerate(lines)
+            if line == "begin_operator"]
+
+
+def test_prune_dominated_operators(tmp_path):
+    assert translate(tmp_path).returncode == 0
+    operators = get_operator_names(tmp_path / "output.sas")
+    assert len(operators) == 7
+
+    pruned_operators_file = tmp_path / "pruned.json"
+    assert translate(tmp_path, "--prune-dominated-operators",
+                     "--pruned-operators-file",
+                     str(pruned_operators_file)).returncode == 0
+    pruned_operators = get_operator_names(tmp_path / "output.sas")
+    with open(pruned_operators_file) as input_file:
+        removed = json.load(input_file)
+    assert removed == [
+        {"name": "(finish-tired )", "replaced_by": "(finish )",
+         "reason": "dominated"},
+        {"name": "(move r2 a b)", "replaced_by": "(move r1 a b)",
+         "reason": "duplicate"},
+        {"name": "(move r2 b a)", "replaced_by": "(move r1 b a)",
+         "reason": "duplicate"},
+    ]
+    assert pruned_operators == [
+        name for name in operators
+        if "(%s)" % name not in [entry["name"] for entry in removed]]
+
+
+def test_pruned_operators_file_is_required(tmp_path):
+    result = translate(tmp_path, "--prune-dominated-operators")
+    assert result.returncode != 0
+    assert "--pruned-operators-file" in result.stderr
+    assert not (tmp_path / "output.sas").exists()
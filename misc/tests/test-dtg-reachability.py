@@ -0,0 +1,106 @@
+import os
+import random
+import sys
+
+import pytest
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_BASE = os.path.dirname(os.path.dirname(DIR))
+
+sys.path.insert(0, os.path.join(REPO_BASE, "src", "translate"))
+import simplify
+
+
+def get_reachable(init, size, arcs):
+    # Reference implementation: search on the arcs with the arcs from
+    # every other value (pre == -1) expanded as before the DTGs stored
+    # them symbolically.
+    successors = {value: set() for value in range(size)}
+    for pre, post in arcs:
+        if pre == -1:
+            for value in range(size):
+                if value != post:
+                    successors[value].add(post)
+        else:
+            successors[pre].add(post)
+    queue = [init]
+    reachable = {init}
+    while queue:
+        new_neighbors = successors[queue.pop()] - reachable
+        reachable |= new_neighbors
+        queue.extend(new_neighbors)
+    return reachable
+
+
+def get_random_arc(rng, size):
+    return rng.randrange(-1, size), rng.randrange(size)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_reachable_values(seed):
+    rng = random.Random(seed)
+    size = rng.randint(1, 12)
+    init = rng.randrange(size)
+    arcs = [get_random_arc(rng, size) for _ in range(rng.randint(0, 15))]
+    dtg = simplify.DomainTransitionGraph(init, size)
+    for pre, post in arcs:
+        dtg.add_arc(pre, post)
+    assert dtg.reachable() == get_reachable(init, size, arcs)
+    # Arcs can be added several times and are only gone after removing
+    # all copies.
+    for _ in range(rng.randint(0, len(arcs))):
+        pre, post = arcs.pop(rng.randrange(len(arcs)))
+        dtg.remove_arc(pre, post)
+        assert dtg.reachable() == get_reachable(init, size, arcs)
+
+
+def get_reachable_values_by_fixpoint(inits, sizes, arcs, transitions):
+    # Reference implementation of compute_reachable_values: recompute
+    # the reachable values of all variables from scratch, using only the
+    # transitions whose conditions are reachable, until nothing changes.
+    active = transitions
+    while True:
+        var_arcs = [list(var_arcs) for var_arcs in arcs]
+        for var_no, pre, post, _ in active:
+            var_arcs[var_no].append((pre, post))
+        reachable = [get_reachable(init, size, arcs)
+                     for init, size, arcs in zip(inits, sizes, var_arcs)]
+        new_active = [
+            transition for transition in active
+            if all(val in reachable[var_no] for var_no, val in transition[3])]
+        if len(new_active) == len(active):
+            return reachable
+        active = new_active
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_compute_reachable_values(seed):
+    rng = random.Random(seed)
+    num_vars = rng.randint(1, 5)
+    sizes = [rng.randint(1, 5) for _ in range(num_vars)]
+    inits = [rng.randrange(size) for size in sizes]
+    # Arcs that are not induced by transitions, e.g., those of axioms.
+    arcs = [[get_random_arc(rng, size) for _ in range(rng.randint(0, 1))]
+            for size in sizes]
+    transitions = []
+    for _ in range(rng.randint(0, 12)):
+        var_no = rng.randrange(num_vars)
+        pre, post = get_random_arc(rng, sizes[var_no])
+        conditions = []
+        for cond_var_no in rng.sample(range(num_vars),
+                                      rng.randint(0, num_vars)):
+            if cond_var_no != var_no:
+                conditions.append(
+                    (cond_var_no, rng.randrange(sizes[cond_var_no])))
+        transitions.append((var_no, pre, post, conditions))
+
+    dtgs = [simplify.DomainTransitionGraph(init, size)
+            for init, size in zip(inits, sizes)]
+    for dtg, var_arcs in zip(dtgs, arcs):
+        for pre, post in var_arcs:
+            dtg.add_arc(pre, post)
+    for var_no, pre, post, _ in transitions:
+        dtgs[var_no].add_arc(pre, post)
+    reachable = simplify.compute_reachable_values(dtgs, transitions)
+    assert [set(simplify.get_values(bits)) for bits in reachable] == (
+        get_reachable_values_by_fixpoint(inits, sizes, arcs, transitions))
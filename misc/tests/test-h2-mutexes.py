@@ -0,0 +1,162 @@
+from collections import defaultdict
+import itertools
+import os
+import sys
+
+import pytest
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_BASE = os.path.dirname(os.path.dirname(DIR))
+BENCHMARKS_DIR = os.path.join(REPO_BASE, "misc", "tests", "benchmarks")
+
+# The translator parses the command line when the options module is
+# imported.
+sys.argv = [sys.argv[0], "domain.pddl", "task.pddl"]
+sys.path.insert(0, os.path.join(REPO_BASE, "src", "translate"))
+import h2_mutexes
+import normalize
+import pddl_parser
+import sas_tasks
+import simplify
+import translate
+
+TASKS = [
+    "gripper/prob01.pddl",
+    "miconic/s1-0.pddl",
+    "miconic-simpleadl/s1-0.pddl",
+    "philosophers/p01-phil2.pddl",
+]
+
+# Tasks whose state spaces are small enough to explore exhaustively.
+SMALL_TASKS = [
+    "gripper/prob01.pddl",
+    "miconic/s1-0.pddl",
+    "philosophers/p01-phil2.pddl",
+]
+
+
+def get_sas_task(task):
+    task_file = os.path.join(BENCHMARKS_DIR, task)
+    domain_file = os.path.join(os.path.dirname(task_file), "domain.pddl")
+    pddl_task = pddl_parser.open(domain_file, task_file)
+    normalize.normalize(pddl_task)
+    return translate.pddl_to_sas(pddl_task)
+
+
+@pytest.mark.parametrize("task", TASKS)
+def test_mutex_groups_cover_all_mutexes(task):
+    sas_task = get_sas_task(task)
+    analysis = h2_mutexes.H2Analysis(sas_task)
+    assert analysis.run(max_time=60)
+    groups = sas_task.mutexes + analysis.get_mutex_groups(sas_task.mutexes)
+    covered_pairs = set()
+    for group in groups:
+        facts = analysis.get_facts(group.facts)
+        covered_pairs.update(itertools.permutations(facts, 2))
+    for fact, fact_mutexes in analysis.get_mutexes().items():
+        for other_fact in h2_mutexes._get_bits(fact_mutexes):
+            assert (fact, other_fact) in covered_pairs
+
+
+def get_reachable_states(sas_task):
+    """Return all states reachable from the initial state, including
+    the values of the derived variables."""
+    axiom_layers = sas_task.variables.axiom_layers
+    axioms_by_layer = defaultdict(list)
+    for axiom in sas_task.axioms:
+        axioms_by_layer[axiom_layers[axiom.effect[0]]].append(axiom)
+    derived_vars = [var for var, layer in enumerate(axiom_layers)
+                    if layer != -1]
+
+    def evaluate_axioms(values):
+        for var in derived_vars:
+            values[var] = sas_task.init.values[var]
+        for layer in sorted(axioms_by_layer):
+            changed = True
+            while changed:
+                changed = False
+                for axiom in axioms_by_layer[layer]:
+                    var, val = axiom.effect
+                    if values[var] != val and all(
+                            values[cvar] == cval
+                            for cvar, cval in axiom.condition):
+                        values[var] = val
+                        changed = True
+        return tuple(values)
+
+    def holds(values, condition):
+        return all(values[var] == val for var, val in condition)
+
+    init = evaluate_axioms(list(sas_task.init.values))
+    states = {init}
+    queue = [init]
+    while queue:
+        state = queue.pop()
+        for op in sas_task.operators:
+            preconditions = op.prevail + [
+                (var, pre) for var, pre, _, _ in op.pre_post if pre != -1]
+            if not holds(state, preconditions):
+                continue
+            values = list(state)
+            for var, _, post, cond in op.pre_post:
+                if holds(state, cond):
+                    values[var] = post
+            successor = evaluate_axioms(values)
+            if successor not in states:
+                states.add(successor)
+                queue.append(successor)
+    return states
+
+
+@pytest.mark.parametrize("task", SMALL_TASKS)
+def test_mutex_groups_are_sound(task):
+    sas_task = get_sas_task(task)
+    analysis = h2_mutexes.H2Analysis(sas_task)
+    assert analysis.run(max_time=60)
+    mutexes = analysis.get_mutexes()
+    groups = analysis.get_mutex_groups(sas_task.mutexes)
+    for state in get_reachable_states(sas_task):
+        facts = analysis.get_facts(enumerate(state))
+        state_mask = sum(1 << fact for fact in facts)
+        for fact in facts:
+            assert not mutexes[fact] & state_mask
+        for group in groups:
+            assert sum(state[var] == val for var, val in group.facts) <= 1
+
+
+def get_task_with_unreachable_operator(goal):
+    # Variable 0 goes from value 0 over 1 to 2, and the first step makes
+    # variable 1 true, the second step false again. Variable 1 is never
+    # true together with variable 0 having value 2, so the operator
+    # cheat can never be applied, although each of its preconditions
+    # is reachable.
+    variables = sas_tasks.SASVariables(
+        [3, 2, 2, 2], [-1] * 4,
+        [["Atom s%d()" % val for val in range(3)]] +
+        [["NegatedAtom %s()" % name, "Atom %s()" % name]
+         for name in ["t", "won", "fair"]])
+    operators = [
+        sas_tasks.SASOperator("(a1)", [], [(0, 0, 1, []), (1, -1, 1, [])], 1),
+        sas_tasks.SASOperator("(a2)", [], [(0, 1, 2, []), (1, -1, 0, [])], 1),
+        sas_tasks.SASOperator("(cheat)", [(0, 2), (1, 1)],
+                              [(2, -1, 1, [])], 1),
+        sas_tasks.SASOperator("(finish)", [(0, 2)], [(3, -1, 1, [])], 1),
+    ]
+    return sas_tasks.SASTask(
+        variables, [], sas_tasks.SASInit([0, 0, 0, 0]),
+        sas_tasks.SASGoal([goal]), operators, [], True)
+
+
+def test_operator_with_unreachable_preconditions_is_removed():
+    sas_task = get_task_with_unreachable_operator((3, 1))
+    h2_mutexes.prune_with_h2_mutexes(sas_task, max_time=60)
+    assert [op.name for op in sas_task.operators] == [
+        "(a1)", "(a2)", "(finish)"]
+    assert any({(0, 2), (1, 1)} <= set(group.facts)
+               for group in sas_task.mutexes)
+
+
+def test_unreachable_goal_is_detected():
+    sas_task = get_task_with_unreachable_operator((2, 1))
+    with pytest.raises(simplify.Impossible):
+        h2_mutexes.prune_with_h2_mutexes(sas_task, max_time=60)
@@ -0,0 +1,32 @@
+import copy
+import os
+import pickle
+import sys
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_BASE = os.path.dirname(os.path.dirname(DIR))
+
+sys.path.insert(0, os.path.join(REPO_BASE, "src", "translate"))
+import pddl
+from pddl import conditions
+
+
+def test_ground_literals_are_interned_on_unpickling():
+    pddl.clear_interned_literals()
+    atom = conditions.intern_literal(pddl.Atom("at", ["a", "b"]))
+    negated_atom = pddl.NegatedAtom("at", ["a", "b"])
+    assert pickle.loads(pickle.dumps(atom)) is atom
+    unpickled = pickle.loads(pickle.dumps(negated_atom))
+    assert unpickled == negated_atom
+    assert conditions.intern_literal(negated_atom) is unpickled
+    pddl.clear_interned_literals()
+
+
+def test_lifted_literals_are_not_interned():
+    pddl.clear_interned_literals()
+    atom = pddl.Atom("at", ["?x", "b"])
+    for copied in [pickle.loads(pickle.dumps(atom)),
+                   copy.copy(atom), copy.deepcopy(atom)]:
+        assert copied == atom and copied is not atom
+        assert type(copied) is pddl.Atom
+    assert not conditions._interned_literals
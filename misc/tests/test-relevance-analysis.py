@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_BASE = os.path.dirname(os.path.dirname(DIR))
+TRANSLATOR = os.path.join(REPO_BASE, "src", "translate", "translate.py")
+
+# paint cannot contribute to the goal, so with --relevance-analysis the
+# whole schema is removed before grounding instead of removing its
+# operators after translation. Of the ground pick actions, only the one
+# for o1 is relevant, and the other ones are reachable but not
+# instantiated.
+DOMAIN = """
+(define (domain relevance)
+  (:predicates (free) (holding ?o) (painted ?o))
+  (:action pick
+    :parameters (?o)
+    :precondition (free)
+    :effect (and (holding ?o) (not (free))))
+  (:action paint
+    :parameters (?o)
+    :precondition (holding ?o)
+    :effect (painted ?o)))
+"""
+
+PROBLEM = """
+(define (problem relevance-1)
+  (:domain relevance)
+  (:objects o1 o2 o3)
+  (:init (free))
+  (:goal (holding o1)))
+"""
+
+
+def translate(tmp_path, *options):
+    domain_file = tmp_path / "domain.pddl"
+    problem_file = tmp_path / "problem.pddl"
+    domain_file.write_text(DOMAIN)
+    problem_file.write_text(PROBLEM)
+    return subprocess.run(
+        [sys.executable, TRANSLATOR, str(domain_file), str(problem_file),
+         "--sas-file", str(tmp_path / "output.sas")] + list(options),
+        cwd=tmp_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True)
+
+
+def get_operator_names(sas_file):
+    lines = sas_file.read_text().splitlines()
+    return [lines[index + 1] for index, line in enumerate(lines)
+            if line == "begin_operator"]
+
+
+def test_relevance_analysis(tmp_path):
+    output = translate(tmp_path).stdout
+    assert "schemas relevant" not in output
+    assert get_operator_names(tmp_path / "output.sas") == [
+        "pick o1", "pick o2", "pick o3"]
+
+    output = translate(tmp_path, "--relevance-analysis").stdout
+    assert "1 of 2 action schemas relevant" in output
+    assert "1 of 3 ground actions relevant (2 not instantiated)" in output
+    assert get_operator_names(tmp_path / "output.sas") == ["pick o1"]
@@ -0,0 +1,110 @@
+import os
+import random
+import sys
+
+import pytest
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_BASE = os.path.dirname(os.path.dirname(DIR))
+
+sys.path.insert(0, os.path.join(REPO_BASE, "src", "translate"))
+from sas_tasks import SASOperator, SASOperatorTable
+
+NUM_VARIABLES = 8
+VARIABLE_RANGE = 4
+
+
+def get_random_operator(rng, op_no):
+    variables = rng.sample(range(NUM_VARIABLES), rng.randint(1, 5))
+    num_prevail = rng.randint(0, len(variables) - 1)
+    prevail = [(var, rng.randrange(VARIABLE_RANGE))
+               for var in variables[:num_prevail]]
+    effect_vars = variables[num_prevail:]
+    pre_post = []
+    for var in effect_vars:
+        pre = rng.randrange(-1, VARIABLE_RANGE)
+        for _ in range(rng.randint(1, 2)):
+            cond_vars = [cvar for cvar in range(NUM_VARIABLES)
+                         if cvar not in variables and rng.random() < 0.2]
+            cond = [(cvar, rng.randrange(VARIABLE_RANGE))
+                    for cvar in cond_vars]
+            pre_post.append((var, pre, rng.randrange(VARIABLE_RANGE), cond))
+    return SASOperator("(op%d)" % op_no, prevail, pre_post,
+                       rng.randint(0, 10))
+
+
+def get_random_operators(seed):
+    rng = random.Random(seed)
+    return [get_random_operator(rng, op_no)
+            for op_no in range(rng.randint(0, 20))]
+
+
+def rename_variables(operators, new_var_nos):
+    # Reference implementation of SASOperatorTable.rename_variables for
+    # lists of SASOperator objects.
+    new_ops = []
+    for op in operators:
+        pre_post = []
+        for eff_var, pre, post, cond in op.pre_post:
+            if new_var_nos[eff_var] is not None:
+                new_cond = [(new_var_nos[var], val) for var, val in cond
+                            if new_var_nos[var] is not None]
+                pre_post.append((new_var_nos[eff_var], pre, post, new_cond))
+        if pre_post:
+            new_op = SASOperator.__new__(SASOperator)
+            new_op.name = op.name
+            new_op.prevail = [(new_var_nos[var], val)
+                              for var, val in op.prevail
+                              if new_var_nos[var] is not None]
+            new_op.pre_post = pre_post
+            new_op.cost = op.cost
+            new_ops.append(new_op)
+    return new_ops
+
+
+def assert_same_operators(table, operators):
+    assert len(table) == len(operators)
+    for table_op, op in zip(table, operators):
+        assert table_op.name == op.name
+        assert table_op.prevail == op.prevail
+        assert [tuple(entry) for entry in table_op.pre_post] == [
+            tuple(entry) for entry in op.pre_post]
+        assert table_op.cost == op.cost
+    assert table.get_output(0, len(table)) == "".join(
+        op.get_output() for op in operators)
+    assert table.get_encoding_size() == sum(
+        op.get_encoding_size() for op in operators)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_append_and_get_operators(seed):
+    operators = get_random_operators(seed)
+    table = SASOperatorTable()
+    for op in operators:
+        table.append(op.name, op.prevail, op.pre_post, op.cost)
+    assert_same_operators(table, operators)
+    for op_no in range(len(operators)):
+        assert table[op_no - len(operators)].name == operators[op_no].name
+        assert table[op_no - len(operators)].prevail == operators[op_no].prevail
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_rename_variables(seed):
+    operators = get_random_operators(seed)
+    rng = random.Random(seed)
+    new_order = list(range(NUM_VARIABLES))
+    rng.shuffle(new_order)
+    new_var_nos = [None] * NUM_VARIABLES
+    for new_var, var in enumerate(new_order[:rng.randint(0, NUM_VARIABLES)]):
+        new_var_nos[var] = new_var
+    table = SASOperatorTable(operators).rename_variables(new_var_nos)
+    assert_same_operators(table, rename_variables(operators, new_var_nos))
+
+
+def test_index_out_of_range():
+    table = SASOperatorTable(get_random_operators(0)[:3])
+    assert table[-1].name == table[2].name
+    assert table[-3].name == table[0].name
+    for op_no in [3, -4]:
+        with pytest.raises(IndexError):
+            table[op_no]
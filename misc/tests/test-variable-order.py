@@ -0,0 +1,211 @@
+from collections import defaultdict, deque
+import heapq
+import os
+import random
+import sys
+
+import pytest
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_BASE = os.path.dirname(os.path.dirname(DIR))
+
+sys.path.insert(0, os.path.join(REPO_BASE, "src", "translate"))
+import sas_tasks
+import sccs
+import variable_order
+
+
+def get_sccs_recursively(adjacency_list):
+    # Reference implementation: recursive version of Tarjan's algorithm.
+    indices = {}
+    lowlinks = {}
+    stack = []
+    on_stack = set()
+    result = []
+
+    def visit(v):
+        indices[v] = lowlinks[v] = len(indices) + 1
+        stack.append(v)
+        on_stack.add(v)
+        for w in adjacency_list[v]:
+            if w not in indices:
+                visit(w)
+                lowlinks[v] = min(lowlinks[v], lowlinks[w])
+            elif w in on_stack:
+                lowlinks[v] = min(lowlinks[v], indices[w])
+        if lowlinks[v] == indices[v]:
+            scc = stack[stack.index(v):]
+            del stack[stack.index(v):]
+            on_stack.difference_update(scc)
+            result.append(scc)
+
+    for v in range(len(adjacency_list)):
+        if v not in indices:
+            visit(v)
+    result.reverse()
+    return result
+
+
+def get_random_graph(rng):
+    num_nodes = rng.randint(0, 15)
+    density = rng.random() * 0.3
+    return [[w for w in range(num_nodes) if rng.random() < density]
+            for _ in range(num_nodes)]
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_sccs(seed):
+    graph = get_random_graph(random.Random(seed))
+    expected = get_sccs_recursively(graph)
+    assert sccs.get_sccs_adjacency_list(graph) == expected
+    named_graph = {"v%d" % v: ["v%d" % w for w in successors]
+                   for v, successors in enumerate(graph)}
+    assert sccs.get_sccs_adjacency_dict(named_graph) == [
+        ["v%d" % v for v in scc] for scc in expected]
+
+
+def test_sccs_of_long_path():
+    # The recursive version exceeds the maximal recursion depth here.
+    num_nodes = 3 * sys.getrecursionlimit()
+    graph = [[v + 1] for v in range(num_nodes - 1)] + [[0]]
+    assert sccs.get_sccs_adjacency_list(graph) == [list(range(num_nodes))]
+    graph[-1] = []
+    assert sccs.get_sccs_adjacency_list(graph) == [
+        [v] for v in range(num_nodes)]
+
+
+class ReferenceCausalGraph:
+    # Reference implementation: the causal graph as a dict of dicts,
+    # as before it was stored in edge arrays.
+    def __init__(self, sas_task):
+        self.weighted_graph = defaultdict(lambda: defaultdict(int))
+        self.predecessor_graph = defaultdict(set)
+        self.num_variables = len(sas_task.variables.ranges)
+        self.goal_map = dict(sas_task.goal.pairs)
+        for op in sas_task.operators:
+            source_vars = [var for var, _ in op.prevail]
+            source_vars += [var for var, pre, _, _ in op.pre_post
+                            if pre != -1]
+            for target, _, _, cond in op.pre_post:
+                for source in source_vars + [var for var, _ in cond]:
+                    self.add_edge(source, target)
+        for axiom in sas_task.axioms:
+            for source, _ in axiom.condition:
+                self.add_edge(source, axiom.effect[0])
+
+    def add_edge(self, source, target):
+        if source != target:
+            self.weighted_graph[source][target] += 1
+            self.predecessor_graph[target].add(source)
+
+    def get_ordering(self):
+        graph = [sorted(self.weighted_graph[var])
+                 for var in range(self.num_variables)]
+        ordering = []
+        for scc in get_sccs_recursively(graph):
+            if len(scc) == 1:
+                ordering.append(scc[0])
+                continue
+            subgraph = defaultdict(list)
+            for var in scc:
+                for target, cost in sorted(self.weighted_graph[var].items()):
+                    if target in scc:
+                        if target in self.goal_map:
+                            subgraph[var].append((target, 100000 + cost))
+                        subgraph[var].append((target, cost))
+            ordering.extend(get_max_dag_order(subgraph, scc))
+        return ordering
+
+    def get_important_vars(self):
+        necessary = set()
+        stack = list(self.goal_map)
+        while stack:
+            var = stack.pop()
+            if var not in necessary:
+                necessary.add(var)
+                stack.extend(self.predecessor_graph[var])
+        return necessary
+
+
+def get_max_dag_order(graph, input_order):
+    # Reference implementation of MaxDAG on the dict-based subgraph.
+    incoming_weights = defaultdict(int)
+    for weighted_edges in graph.values():
+        for target, weight in weighted_edges:
+            incoming_weights[target] += weight
+    weight_to_nodes = defaultdict(deque)
+    for node in input_order:
+        weight_to_nodes[incoming_weights[node]].append(node)
+    weights = list(weight_to_nodes.keys())
+    heapq.heapify(weights)
+    done = set()
+    result = []
+    while weights:
+        min_key = weights[0]
+        min_elem = None
+        entries = weight_to_nodes[min_key]
+        while entries and (min_elem is None or min_elem in done or
+                           min_key > incoming_weights[min_elem]):
+            min_elem = entries.popleft()
+        if not entries:
+            del weight_to_nodes[min_key]
+            heapq.heappop(weights)
+        if min_elem is None or min_elem in done:
+            continue
+        done.add(min_elem)
+        result.append(min_elem)
+        for target, weight in graph[min_elem]:
+            if target not in done:
+                weight = weight % 100000
+                if weight == 0:
+                    continue
+                new_in_weight = incoming_weights[target] - weight
+                incoming_weights[target] = new_in_weight
+                if new_in_weight not in weight_to_nodes:
+                    heapq.heappush(weights, new_in_weight)
+                weight_to_nodes[new_in_weight].append(target)
+    return result
+
+
+def get_random_task(rng):
+    num_vars = rng.randint(1, 10)
+    ranges = [2] * num_vars
+    variables = sas_tasks.SASVariables(
+        ranges, [-1] * num_vars,
+        [["Atom v%d(%d)" % (var, val) for val in range(2)]
+         for var in range(num_vars)])
+    operators = []
+    for op_no in range(rng.randint(0, 12)):
+        op_vars = rng.sample(range(num_vars), rng.randint(1, min(4, num_vars)))
+        num_prevail = rng.randint(0, len(op_vars) - 1)
+        prevail = [(var, rng.randrange(2)) for var in op_vars[:num_prevail]]
+        pre_post = []
+        for var in op_vars[num_prevail:]:
+            cond = [(cvar, rng.randrange(2)) for cvar in range(num_vars)
+                    if cvar not in op_vars and rng.random() < 0.1]
+            pre_post.append((var, rng.randrange(-1, 2), rng.randrange(2), cond))
+        operators.append(sas_tasks.SASOperator(
+            "(op%d)" % op_no, prevail, pre_post, 1))
+    axioms = []
+    for _ in range(rng.randint(0, 3)):
+        condition_vars = rng.sample(range(num_vars),
+                                    rng.randint(0, min(3, num_vars)))
+        axioms.append(sas_tasks.SASAxiom(
+            [(var, rng.randrange(2)) for var in condition_vars],
+            (rng.randrange(num_vars), 1)))
+    goal_vars = rng.sample(range(num_vars), rng.randint(1, num_vars))
+    return sas_tasks.SASTask(
+        variables, [], sas_tasks.SASInit([0] * num_vars),
+        sas_tasks.SASGoal([(var, 1) for var in goal_vars]),
+        operators, axioms, False)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_causal_graph(seed):
+    task = get_random_task(random.Random(seed))
+    causal_graph = variable_order.CausalGraph(task)
+    reference = ReferenceCausalGraph(task)
+    assert causal_graph.get_ordering() == reference.get_ordering()
+    necessary = causal_graph.calculate_important_vars(task.goal)
+    assert {var for var in range(len(necessary)) if necessary[var]} == (
+        reference.get_important_vars())
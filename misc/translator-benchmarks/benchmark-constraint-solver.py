@@ -0,0 +1,109 @@
+#! /usr/bin/env python3
+
+HELP = """\
+Compare the backtracking solver for constraint systems with the reference
+implementation that enumerates all combinations of equality conjunctions.
+The constraint systems are recorded while synthesizing invariants for the
+given tasks. Both solvers must agree on every system.
+"""
+
+import argparse
+import contextlib
+import io
+from pathlib import Path
+import sys
+import time
+
+
+DIR = Path(__file__).resolve().parent
+REPO = DIR.parents[1]
+BENCHMARKS_DIR = REPO / "misc" / "tests" / "benchmarks"
+
+sys.path.insert(0, str(REPO / "src" / "translate"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=HELP)
+    parser.add_argument(
+        "tasks", nargs="*",
+        help="paths to task files, each of which must have a domain.pddl "
+             "file in the same directory (default: the first task of each "
+             "domain in misc/tests/benchmarks)")
+    parser.add_argument(
+        "--repetitions", type=int, default=3,
+        help="solve each system this many times per solver (default: %(default)d)")
+    return parser.parse_args()
+
+
+def get_default_tasks():
+    tasks = []
+    for domain_dir in sorted(BENCHMARKS_DIR.iterdir()):
+        problems = sorted(path for path in domain_dir.glob("*.pddl")
+                          if path.name != "domain.pddl")
+        if problems:
+            tasks.append(problems[0])
+    return tasks
+
+
+def record_constraint_systems(task_file):
+    import constraints
+    import instantiate
+    import invariant_finder
+    import normalize
+    import pddl_parser
+
+    task = pddl_parser.open(
+        domain_filename=str(task_file.parent / "domain.pddl"),
+        task_filename=str(task_file))
+    normalize.normalize(task)
+    _, _, _, _, _, reachable_action_params = instantiate.explore(task)
+
+    systems = []
+    is_solvable = constraints.ConstraintSystem.is_solvable
+    def recording_is_solvable(system):
+        systems.append(system)
+        return is_solvable(system)
+    constraints.ConstraintSystem.is_solvable = recording_is_solvable
+    try:
+        list(invariant_finder.find_invariants(task, reachable_action_params))
+    finally:
+        constraints.ConstraintSystem.is_solvable = is_solvable
+    return systems
+
+
+def time_solver(systems, solve, repetitions):
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        results = [solve(system) for system in systems]
+    return results, (time.perf_counter() - start) / repetitions
+
+
+def main():
+    args = parse_args()
+    tasks = [Path(task).resolve() for task in args.tasks] or get_default_tasks()
+    # Importing the translator options parses the command line, which
+    # expects a domain and a task file.
+    sys.argv = [sys.argv[0], "domain.pddl", "task.pddl"]
+
+    import constraints
+    print(f"{'task':<45} {'systems':>8} {'enumeration':>12} "
+          f"{'backtracking':>12} {'speedup':>8}")
+    for task_file in tasks:
+        with contextlib.redirect_stdout(io.StringIO()):
+            systems = record_constraint_systems(task_file)
+        expected, enumeration_time = time_solver(
+            systems, constraints.ConstraintSystem.is_solvable_by_enumeration,
+            args.repetitions)
+        results, backtracking_time = time_solver(
+            systems, constraints.ConstraintSystem.is_solvable,
+            args.repetitions)
+        if results != expected:
+            sys.exit(f"Error: solvers disagree on systems of {task_file}")
+        name = "/".join(task_file.parts[-2:])
+        speedup = enumeration_time / backtracking_time if backtracking_time else 0
+        print(f"{name:<45} {len(systems):>8} {enumeration_time:>11.4f}s "
+              f"{backtracking_time:>11.4f}s {speedup:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
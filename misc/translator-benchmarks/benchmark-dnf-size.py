@@ -0,0 +1,95 @@
+#! /usr/bin/env python3
+
+HELP = """\
+Compare translating disjunctive conditions with and without derived
+predicates for large disjunctions (see the --max-dnf-disjuncts option of
+the translator). For each task and limit, report the number of action and
+axiom schemas after splitting disjunctions, the number of auxiliary axioms,
+the size of the output and the times for instantiating and translating the
+task.
+"""
+
+import argparse
+from pathlib import Path
+import re
+import subprocess
+import sys
+import tempfile
+
+
+DIR = Path(__file__).resolve().parent
+REPO = DIR.parents[1]
+BENCHMARKS_DIR = REPO / "misc" / "tests" / "benchmarks"
+TRANSLATOR = REPO / "src" / "translate" / "translate.py"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=HELP)
+    parser.add_argument(
+        "tasks", nargs="*",
+        help="paths to task files, each of which must have a domain.pddl "
+             "file in the same directory (default: the first task of each "
+             "domain in misc/tests/benchmarks)")
+    parser.add_argument(
+        "--limits", nargs="+", type=int, default=[1, 4, 16],
+        help="values of --max-dnf-disjuncts to compare with the unlimited "
+             "translation (default: %(default)s)")
+    return parser.parse_args()
+
+
+def get_default_tasks():
+    tasks = []
+    for domain_dir in sorted(BENCHMARKS_DIR.iterdir()):
+        problems = sorted(path for path in domain_dir.glob("*.pddl")
+                          if path.name != "domain.pddl")
+        if problems:
+            tasks.append(problems[0])
+    return tasks
+
+
+def get_value(pattern, output, default=None):
+    match = re.search(pattern, output, re.MULTILINE)
+    if not match:
+        if default is not None:
+            return default
+        sys.exit(f"Error: could not find {pattern!r} in translator output")
+    return match.group(1)
+
+
+def translate(task_file, limit, sas_file):
+    cmd = [sys.executable, str(TRANSLATOR), str(task_file.parent / "domain.pddl"),
+           str(task_file), "--sas-file", sas_file]
+    if limit is not None:
+        cmd += ["--max-dnf-disjuncts", str(limit)]
+    output = subprocess.run(
+        cmd, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return (int(get_value(r"^(\d+) action schemas and", output)),
+            int(get_value(r"and (\d+) axiom schemas after", output)),
+            int(get_value(r"^(\d+) auxiliary axioms for", output, default="0")),
+            int(get_value(r"^Translator operators: (\d+)$", output)),
+            int(get_value(r"^Translator axioms: (\d+)$", output)),
+            float(get_value(r"^Instantiating: \[(\S+)s CPU", output)),
+            float(get_value(r"^Done! \[(\S+)s CPU", output)))
+
+
+def main():
+    args = parse_args()
+    tasks = [Path(task).resolve() for task in args.tasks] or get_default_tasks()
+    print(f"{'task':<45} {'limit':>5} {'actions':>7} {'axioms':>6} "
+          f"{'aux':>4} {'operators':>9} {'rules':>6} {'instantiating':>13} "
+          f"{'total':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sas_file = str(Path(tmp_dir) / "output.sas")
+        for task_file in tasks:
+            name = "/".join(task_file.parts[-2:])
+            for limit in [None] + args.limits:
+                (actions, axioms, aux, operators, rules, instantiate_time,
+                 total_time) = translate(task_file, limit, sas_file)
+                limit_name = "-" if limit is None else str(limit)
+                print(f"{name:<45} {limit_name:>5} {actions:>7} {axioms:>6} "
+                      f"{aux:>4} {operators:>9} {rules:>6} "
+                      f"{instantiate_time:>12.3f}s {total_time:>7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#! /usr/bin/env python3
+
+HELP = """\
+Compare translating grounded PDDL tasks with and without the fast path for
+grounded input (see the --skip-grounded-fast-path option of the
+translator). Each task is first grounded with the translator and written
+as a PDDL task whose actions have no parameters and whose derived
+predicates have no arguments. For each grounded task and mode, report the
+numbers of variables, mutex groups and operators of the output and the
+times for instantiating, computing the fact groups and translating the
+whole task.
+"""
+
+import argparse
+import contextlib
+import io
+from pathlib import Path
+import re
+import subprocess
+import sys
+import tempfile
+
+
+DIR = Path(__file__).resolve().parent
+REPO = DIR.parents[1]
+BENCHMARKS_DIR = REPO / "misc" / "tests" / "benchmarks"
+TRANSLATOR = REPO / "src" / "translate" / "translate.py"
+
+sys.path.insert(0, str(REPO / "src" / "translate"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=HELP)
+    parser.add_argument(
+        "tasks", nargs="*",
+        help="paths to task files, each of which must have a domain.pddl "
+             "file in the same directory (default: the first task of each "
+             "domain in misc/tests/benchmarks)")
+    return parser.parse_args()
+
+
+def get_default_tasks():
+    tasks = []
+    for domain_dir in sorted(BENCHMARKS_DIR.iterdir()):
+        problems = sorted(path for path in domain_dir.glob("*.pddl")
+                          if path.name != "domain.pddl")
+        if problems:
+            tasks.append(problems[0])
+    return tasks
+
+
+def get_name(name):
+    return re.sub(r"[^A-Za-z0-9_-]", "-", name)
+
+
+def write_grounded_task(task_file, domain_file, problem_file):
+    import instantiate
+    import normalize
+    import pddl
+    import pddl_parser
+
+    task = pddl_parser.open(
+        domain_filename=str(task_file.parent / "domain.pddl"),
+        task_filename=str(task_file))
+    normalize.normalize(task)
+    (relaxed_reachable, fluent_facts, actions, goal, axioms,
+     _) = instantiate.explore(task)
+    if not relaxed_reachable or goal is None:
+        sys.exit(f"Error: {task_file} is unsolvable")
+    derived_predicates = {axiom.name for axiom in task.axioms}
+
+    def atom_to_pddl(atom):
+        if atom.predicate in derived_predicates:
+            # Derived predicates must have variables as arguments.
+            return "(%s)" % get_name("-".join((atom.predicate,) + atom.args))
+        return "(%s)" % " ".join((atom.predicate,) + atom.args)
+
+    def literal_to_pddl(literal):
+        if literal.negated:
+            return "(not %s)" % atom_to_pddl(literal.positive())
+        return atom_to_pddl(literal)
+
+    def conjunction_to_pddl(literals):
+        return "(and %s)" % " ".join(map(literal_to_pddl, literals))
+
+    def effect_to_pddl(condition, literal):
+        if condition:
+            return "(when %s %s)" % (conjunction_to_pddl(condition),
+                                     literal_to_pddl(literal))
+        return literal_to_pddl(literal)
+
+    objects = sorted({arg for atom in fluent_facts for arg in atom.args})
+    predicates = sorted({(atom.predicate, len(atom.args))
+                         for atom in fluent_facts
+                         if atom.predicate not in derived_predicates})
+    derived_atoms = sorted({axiom.effect for axiom in axioms})
+    metric = task.use_min_cost_metric
+
+    with open(domain_file, "w") as f:
+        print("(define (domain grounded)", file=f)
+        print("(:requirements :adl :derived-predicates :action-costs)", file=f)
+        print("(:constants %s)" % " ".join(objects), file=f)
+        print("(:predicates", file=f)
+        for predicate, arity in predicates:
+            args = " ".join("?x%d" % pos for pos in range(arity))
+            print("  (%s %s)" % (predicate, args), file=f)
+        for atom in derived_atoms:
+            print("  %s" % atom_to_pddl(atom), file=f)
+        print(")", file=f)
+        if metric:
+            print("(:functions (total-cost) - number)", file=f)
+        action_names = set()
+        for action in actions:
+            name = get_name(action.name.strip("()").replace(" ", "_"))
+            while name in action_names:
+                name += "-"
+            action_names.add(name)
+            effects = [effect_to_pddl(condition, atom)
+                       for condition, atom in action.add_effects]
+            effects += [effect_to_pddl(condition, atom.negate())
+                        for condition, atom in action.del_effects]
+            if metric:
+                effects.append("(increase (total-cost) %d)" % action.cost)
+            print("(:action %s" % name, file=f)
+            print(" :parameters ()", file=f)
+            print(" :precondition %s" % conjunction_to_pddl(
+                action.precondition), file=f)
+            print(" :effect (and %s))" % " ".join(effects), file=f)
+        for axiom in axioms:
+            print("(:derived %s %s)" % (
+                atom_to_pddl(axiom.effect),
+                conjunction_to_pddl(axiom.condition)), file=f)
+        print(")", file=f)
+
+    init = [fact for fact in task.init
+            if isinstance(fact, pddl.Atom) and fact in fluent_facts]
+    with open(problem_file, "w") as f:
+        print("(define (problem grounded) (:domain grounded)", file=f)
+        print("(:init", file=f)
+        for fact in init:
+            print("  %s" % atom_to_pddl(fact), file=f)
+        if metric:
+            print("  (= (total-cost) 0)", file=f)
+        print(")", file=f)
+        print("(:goal %s)" % conjunction_to_pddl(goal), file=f)
+        if metric:
+            print("(:metric minimize (total-cost))", file=f)
+        print(")", file=f)
+
+
+def get_value(pattern, output):
+    match = re.search(pattern, output, re.MULTILINE)
+    if not match:
+        sys.exit(f"Error: could not find {pattern!r} in translator output")
+    return match.group(1)
+
+
+def translate(domain_file, problem_file, fast_path, sas_file):
+    cmd = [sys.executable, str(TRANSLATOR), domain_file, problem_file,
+           "--sas-file", sas_file]
+    if not fast_path:
+        cmd.append("--skip-grounded-fast-path")
+    output = subprocess.run(
+        cmd, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return (int(get_value(r"^Translator variables: (\d+)$", output)),
+            int(get_value(r"^Translator mutex groups: (\d+)$", output)),
+            int(get_value(r"^Translator operators: (\d+)$", output)),
+            float(get_value(r"^Instantiating: \[(\S+)s CPU", output)),
+            float(get_value(r"^Computing fact groups: \[(\S+)s CPU", output)),
+            float(get_value(r"^Done! \[(\S+)s CPU", output)))
+
+
+def main():
+    args = parse_args()
+    tasks = [Path(task).resolve() for task in args.tasks] or get_default_tasks()
+    # Importing the translator options parses the command line, which
+    # expects a domain and a task file.
+    sys.argv = [sys.argv[0], "domain.pddl", "task.pddl"]
+
+    print(f"{'task':<45} {'mode':<6} {'vars':>6} {'mutexes':>7} "
+          f"{'operators':>9} {'instantiating':>13} {'groups':>8} "
+          f"{'total':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        domain_file = str(Path(tmp_dir) / "domain.pddl")
+        problem_file = str(Path(tmp_dir) / "problem.pddl")
+        sas_file = str(Path(tmp_dir) / "output.sas")
+        for task_file in tasks:
+            with contextlib.redirect_stdout(io.StringIO()):
+                write_grounded_task(task_file, domain_file, problem_file)
+            name = "/".join(task_file.parts[-2:])
+            for mode, fast_path in [("fast", True), ("lifted", False)]:
+                (variables, mutexes, operators, instantiate_time,
+                 groups_time, total_time) = translate(
+                     domain_file, problem_file, fast_path, sas_file)
+                print(f"{name:<45} {mode:<6} {variables:>6} {mutexes:>7} "
+                      f"{operators:>9} {instantiate_time:>12.3f}s "
+                      f"{groups_time:>7.3f}s {total_time:>7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
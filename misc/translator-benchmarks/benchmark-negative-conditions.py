@@ -0,0 +1,87 @@
+#! /usr/bin/env python3
+
+HELP = """\
+Compare the strategies for translating negative preconditions on variables
+with more than two values (see the --negative-conditions option of the
+translator). For each task and strategy, report the number of operators,
+derived variables and axioms of the output and the time for translating
+the task.
+"""
+
+import argparse
+from pathlib import Path
+import re
+import subprocess
+import sys
+import tempfile
+
+
+DIR = Path(__file__).resolve().parent
+REPO = DIR.parents[1]
+BENCHMARKS_DIR = REPO / "misc" / "tests" / "benchmarks"
+TRANSLATOR = REPO / "src" / "translate" / "translate.py"
+STRATEGIES = ["multiply-out", "derived", "auto"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=HELP)
+    parser.add_argument(
+        "tasks", nargs="*",
+        help="paths to task files, each of which must have a domain.pddl "
+             "file in the same directory (default: the first task of each "
+             "domain in misc/tests/benchmarks)")
+    parser.add_argument(
+        "--strategies", nargs="+", choices=STRATEGIES, default=STRATEGIES,
+        help="strategies to compare (default: all)")
+    return parser.parse_args()
+
+
+def get_default_tasks():
+    tasks = []
+    for domain_dir in sorted(BENCHMARKS_DIR.iterdir()):
+        problems = sorted(path for path in domain_dir.glob("*.pddl")
+                          if path.name != "domain.pddl")
+        if problems:
+            tasks.append(problems[0])
+    return tasks
+
+
+def get_value(pattern, output):
+    match = re.search(pattern, output, re.MULTILINE)
+    if not match:
+        sys.exit(f"Error: could not find {pattern!r} in translator output")
+    return match.group(1)
+
+
+def translate(task_file, strategy, sas_file):
+    output = subprocess.run(
+        [sys.executable, str(TRANSLATOR), str(task_file.parent / "domain.pddl"),
+         str(task_file), "--sas-file", sas_file,
+         "--negative-conditions", strategy],
+        check=True, stdout=subprocess.PIPE, text=True).stdout
+    return (int(get_value(r"^Translator operators: (\d+)$", output)),
+            int(get_value(r"^Translator derived variables: (\d+)$", output)),
+            int(get_value(r"^Translator axioms: (\d+)$", output)),
+            float(get_value(r"^Translating task: \[(\S+)s CPU", output)),
+            float(get_value(r"^Done! \[(\S+)s CPU", output)))
+
+
+def main():
+    args = parse_args()
+    tasks = [Path(task).resolve() for task in args.tasks] or get_default_tasks()
+    print(f"{'task':<45} {'strategy':<13} {'operators':>9} {'derived':>7} "
+          f"{'axioms':>7} {'translating':>11} {'total':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sas_file = str(Path(tmp_dir) / "output.sas")
+        for task_file in tasks:
+            name = "/".join(task_file.parts[-2:])
+            for strategy in args.strategies:
+                (operators, derived, axioms, translate_time,
+                 total_time) = translate(task_file, strategy, sas_file)
+                print(f"{name:<45} {strategy:<13} {operators:>9} {derived:>7} "
+                      f"{axioms:>7} {translate_time:>10.3f}s "
+                      f"{total_time:>7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#! /usr/bin/env python3
+
+HELP = """\
+Compare the time for writing translated tasks with SASTask.output and with
+a reference writer that prints every line separately, as the translator
+used to do. Both writers must produce identical output.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+
+DIR = Path(__file__).resolve().parent
+REPO = DIR.parents[1]
+BENCHMARKS_DIR = REPO / "misc" / "tests" / "benchmarks"
+
+sys.path.insert(0, str(REPO / "src" / "translate"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=HELP)
+    parser.add_argument(
+        "tasks", nargs="*",
+        help="paths to task files, each of which must have a domain.pddl "
+             "file in the same directory (default: the first task of each "
+             "domain in misc/tests/benchmarks)")
+    parser.add_argument(
+        "--repetitions", type=int, default=3,
+        help="write each task this many times per writer (default: %(default)d)")
+    return parser.parse_args()
+
+
+def get_default_tasks():
+    tasks = []
+    for domain_dir in sorted(BENCHMARKS_DIR.iterdir()):
+        problems = sorted(path for path in domain_dir.glob("*.pddl")
+                          if path.name != "domain.pddl")
+        if problems:
+            tasks.append(problems[0])
+    return tasks
+
+
+def translate_task(task_file):
+    import normalize
+    import pddl_parser
+    import translate
+
+    task = pddl_parser.open(
+        domain_filename=str(task_file.parent / "domain.pddl"),
+        task_filename=str(task_file))
+    normalize.normalize(task)
+    return translate.pddl_to_sas(task)
+
+
+def output_reference(sas_task, stream):
+    import sas_tasks
+
+    print("begin_version", file=stream)
+    print(sas_tasks.SAS_FILE_VERSION, file=stream)
+    print("end_version", file=stream)
+    print("begin_metric", file=stream)
+    print(int(sas_task.metric), file=stream)
+    print("end_metric", file=stream)
+    variables = sas_task.variables
+    print(len(variables.ranges), file=stream)
+    for var, (rang, axiom_layer, values) in enumerate(zip(
+            variables.ranges, variables.axiom_layers, variables.value_names)):
+        print("begin_variable", file=stream)
+        print("var%d" % var, file=stream)
+        print(axiom_layer, file=stream)
+        print(rang, file=stream)
+        for value in values:
+            print(value, file=stream)
+        print("end_variable", file=stream)
+    print(len(sas_task.mutexes), file=stream)
+    for mutex in sas_task.mutexes:
+        print("begin_mutex_group", file=stream)
+        print(len(mutex.facts), file=stream)
+        for var, val in mutex.facts:
+            print(var, val, file=stream)
+        print("end_mutex_group", file=stream)
+    print("begin_state", file=stream)
+    for val in sas_task.init.values:
+        print(val, file=stream)
+    print("end_state", file=stream)
+    print("begin_goal", file=stream)
+    print(len(sas_task.goal.pairs), file=stream)
+    for var, val in sas_task.goal.pairs:
+        print(var, val, file=stream)
+    print("end_goal", file=stream)
+    print(len(sas_task.operators), file=stream)
+    for op in sas_task.operators:
+        print("begin_operator", file=stream)
+        print(op.name[1:-1], file=stream)
+        print(len(op.prevail), file=stream)
+        for var, val in op.prevail:
+            print(var, val, file=stream)
+        print(len(op.pre_post), file=stream)
+        for var, pre, post, cond in op.pre_post:
+            print(len(cond), end=' ', file=stream)
+            for cvar, cval in cond:
+                print(cvar, cval, end=' ', file=stream)
+            print(var, pre, post, file=stream)
+        print(op.cost, file=stream)
+        print("end_operator", file=stream)
+    print(len(sas_task.axioms), file=stream)
+    for axiom in sas_task.axioms:
+        print("begin_rule", file=stream)
+        print(len(axiom.condition), file=stream)
+        for var, val in axiom.condition:
+            print(var, val, file=stream)
+        var, val = axiom.effect
+        print(var, 1 - val, val, file=stream)
+        print("end_rule", file=stream)
+
+
+def time_writer(sas_task, write, filename, repetitions):
+    best_time = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        with open(filename, "w") as output_file:
+            write(sas_task, output_file)
+        elapsed = time.perf_counter() - start
+        if best_time is None or elapsed < best_time:
+            best_time = elapsed
+    with open(filename) as output_file:
+        return output_file.read(), best_time
+
+
+def main():
+    args = parse_args()
+    tasks = [Path(task).resolve() for task in args.tasks] or get_default_tasks()
+    # Importing the translator options parses the command line, which
+    # expects a domain and a task file.
+    sys.argv = [sys.argv[0], "domain.pddl", "task.pddl"]
+
+    import sas_tasks
+    print(f"{'task':<45} {'size':>10} {'reference':>10} {'output':>10} "
+          f"{'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "output.sas")
+        for task_file in tasks:
+            with contextlib.redirect_stdout(io.StringIO()):
+                sas_task = translate_task(task_file)
+            expected, reference_time = time_writer(
+                sas_task, output_reference, filename, args.repetitions)
+            result, output_time = time_writer(
+                sas_task, sas_tasks.SASTask.output, filename, args.repetitions)
+            if result != expected:
+                sys.exit(f"Error: writers disagree on output for {task_file}")
+            name = "/".join(task_file.parts[-2:])
+            speedup = reference_time / output_time if output_time else 0
+            print(f"{name:<45} {len(result):>10} {reference_time:>9.4f}s "
+                  f"{output_time:>9.4f}s {speedup:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import pddl
 import sccs
 import timers
 
+from bisect import bisect_left
 from collections import defaultdict
 from itertools import chain
 
@@ -51,8 +52,20 @@ class AxiomCluster(object):
         self.layer = 0
 
 
-def handle_axioms(operators, axioms, goals, layer_strategy):
-    clusters = compute_clusters(axioms, goals, operators)
+def get_operator_condition_atoms(operators):
+    for op in operators:
+        for literal in op.precondition:
+            yield literal.positive()
+        for condition, effect in chain(op.add_effects, op.del_effects):
+            for literal in condition:
+                yield literal.positive()
+
+
+# operator_condition_atoms are the atoms occurring in the preconditions
+# and effect conditions of the operators (see get_operator_condition_atoms),
+# of which only the derived ones matter.
+def handle_axioms(operator_condition_atoms, axioms, goals, layer_strategy):
+    clusters = compute_clusters(axioms, goals, operator_condition_atoms)
     axiom_layers = compute_axiom_layers(clusters, layer_strategy)
     axioms = get_axioms(clusters)
     if DEBUG:
@@ -60,7 +73,7 @@ def handle_axioms(operators, axioms, goals, layer_strategy):
     return axioms, axiom_layers
 
 
-def compute_necessary_atoms(dependencies, goals, operators):
+def compute_necessary_atoms(dependencies, goals, operator_condition_atoms):
     necessary_atoms = set()
 
     for g in goals:
@@ -68,16 +81,9 @@ def compute_necessary_atoms(dependencies, goals, operators):
         if g in dependencies.derived_variables:
             necessary_atoms.add(g)
 
-    for op in operators:
-        derived_preconditions = (l.positive() for l in op.precondition if l.positive()
-                                 in dependencies.derived_variables)
-        necessary_atoms.update(derived_preconditions)
-
-        for condition, effect in chain(op.add_effects, op.del_effects):
-            for c in condition:
-                c_atom = c.positive()
-                if c_atom in dependencies.derived_variables:
-                    necessary_atoms.add(c_atom)
+    for atom in operator_condition_atoms:
+        if atom in dependencies.derived_variables:
+            necessary_atoms.add(atom)
 
     atoms_to_process = list(necessary_atoms)
     while atoms_to_process:
@@ -108,6 +114,61 @@ def get_strongly_connected_components(dependencies):
     groups = [[sorted_vars[i] for i in g] for g in index_groups]
     return groups
 
+class SubsumptionIndex(object):
+    """Trie over sorted literal sequences that answers whether a set of
+    literals contains one of the sets added so far.
+
+    Nodes are dicts mapping literals to child nodes; the key None marks
+    the end of an added set. A query only follows the literals of the
+    queried set, so its cost depends on the part of the trie that is
+    compatible with the query rather than on the number of sets.
+
+    The literals must be totally ordered. This does not hold for
+    pddl.Literal, which orders an atom and its negation the same way,
+    so compute_simplified_axioms uses the keys of _get_literal_key."""
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, literals):
+        """Add a sorted sequence of literals."""
+        node = self.root
+        for literal in literals:
+            node = node.setdefault(literal, {})
+        node[None] = True
+
+    def contains_subset_of(self, literals):
+        """Test whether some added set is a subset of the sorted
+        sequence of literals."""
+        stack = [(self.root, 0)]
+        while stack:
+            node, pos = stack.pop()
+            if None in node:
+                return True
+            if len(node) < len(literals) - pos:
+                for literal, child in node.items():
+                    next_pos = _find(literals, literal, pos)
+                    if next_pos is not None:
+                        stack.append((child, next_pos + 1))
+            else:
+                for next_pos in range(pos, len(literals)):
+                    child = node.get(literals[next_pos])
+                    if child is not None:
+                        stack.append((child, next_pos + 1))
+        return False
+
+
+def _find(literals, literal, pos):
+    index = bisect_left(literals, literal, pos)
+    if index < len(literals) and literals[index] == literal:
+        return index
+    return None
+
+
+def _get_literal_key(literal):
+    return literal.key, literal.negated
+
+
 # Expects a list of axioms *with the same head* and returns a subset consisting
 # of all non-dominated axioms whose conditions have been cleaned up
 # (duplicate elimination).
@@ -121,36 +182,35 @@ def compute_simplified_axioms(axioms):
     for axiom in axioms:
         axiom.condition = sorted(set(axiom.condition))
 
-    # Remove dominated axioms.
-    axioms_to_skip = set()
-    axioms_by_literal = defaultdict(set)
-    for axiom in axioms:
-        if axiom.effect in axiom.condition:
-            axioms_to_skip.add(id(axiom))
-        else:
-            for literal in axiom.condition:
-                axioms_by_literal[literal].add(id(axiom))
-
-    for axiom in axioms:
-        if id(axiom) in axioms_to_skip:
-            continue   # Required to keep one of multiple identical axioms.
-        if not axiom.condition:  # empty condition: dominates everything
-            return [axiom]
-        literals = iter(axiom.condition)
-        dominated_axioms = axioms_by_literal[next(literals)].copy()
-        for literal in literals:
-            dominated_axioms &= axioms_by_literal[literal]
-        for dominated_axiom in dominated_axioms:
-            if dominated_axiom != id(axiom):
-                axioms_to_skip.add(dominated_axiom)
-    return [axiom for axiom in axioms if id(axiom) not in axioms_to_skip]
-
-
-def compute_clusters(axioms, goals, operators):
+    # Remove dominated axioms. Axioms are considered by increasing
+    # condition size, so all axioms that can dominate an axiom are
+    # considered before it. Of several axioms with the same condition,
+    # we keep the first one. Only axioms with the same head can dominate
+    # each other, so each call builds its own index.
+    candidates = [(len(axiom.condition), axiom_no)
+                  for axiom_no, axiom in enumerate(axioms)
+                  if axiom.effect not in axiom.condition]
+    candidates.sort()
+    if candidates and candidates[0][0] == 0:
+        # empty condition: dominates everything
+        return [axioms[candidates[0][1]]]
+    index = SubsumptionIndex()
+    kept = []
+    for _, axiom_no in candidates:
+        condition = sorted(map(_get_literal_key, axioms[axiom_no].condition))
+        if not index.contains_subset_of(condition):
+            index.add(condition)
+            kept.append(axiom_no)
+    kept.sort()
+    return [axioms[axiom_no] for axiom_no in kept]
+
+
+def compute_clusters(axioms, goals, operator_condition_atoms):
     dependencies = AxiomDependencies(axioms)
 
     # Compute necessary literals and prune unnecessary vars from dependencies.
-    necessary_atoms = compute_necessary_atoms(dependencies, goals, operators)
+    necessary_atoms = compute_necessary_atoms(dependencies, goals,
+                                              operator_condition_atoms)
     dependencies.remove_unnecessary_variables(necessary_atoms)
 
     groups = get_strongly_connected_components(dependencies)
@@ -8,7 +8,7 @@ import pddl
 import timers
 from functools import reduce
 
-def convert_rules(prog):
+def convert_rules(prog, store=None):
     RULE_TYPES = {
         "join": JoinRule,
         "product": ProductRule,
@@ -19,7 +19,10 @@ def convert_rules(prog):
         RuleType = RULE_TYPES[rule.type]
         new_effect, new_conditions = variables_to_numbers(
             rule.effect, rule.conditions)
-        rule = RuleType(new_effect, new_conditions)
+        if store is not None and RuleType is JoinRule:
+            rule = DiskJoinRule(new_effect, new_conditions, store)
+        else:
+            rule = RuleType(new_effect, new_conditions)
         rule.validate()
         result.append(rule)
     return result
@@ -64,6 +67,7 @@ class BuildRule:
         return "<%s %s>" % (self.__class__.__name__, self)
 
 class JoinRule(BuildRule):
+    type = "join"
     def __init__(self, effect, conditions):
         self.effect = effect
         self.conditions = conditions
@@ -109,11 +113,27 @@ class JoinRule(BuildRule):
                     effect_args[var_no] = obj
             enqueue_func(self.effect.predicate, effect_args)
 
+class DiskJoinRule(JoinRule):
+    """Join rule that keeps its indexes in a relation_store.RelationStore
+    instead of in memory."""
+    def __init__(self, effect, conditions, store):
+        JoinRule.__init__(self, effect, conditions)
+        self.atoms_by_key = tuple(store.create_join_index(cond.predicate)
+                                  for cond in conditions)
+    def update_index(self, new_atom, cond_index):
+        key = tuple(new_atom.args[position]
+                    for position in self.common_var_positions[cond_index])
+        self.atoms_by_key[cond_index].add(key, new_atom)
+
 class ProductRule(BuildRule):
+    type = "product"
     def __init__(self, effect, conditions):
         self.effect = effect
         self.conditions = conditions
-        self.atoms_by_index = [[] for c in self.conditions]
+        # For each condition, the list of bindings of all atoms seen so
+        # far for that condition. The bindings are computed once, when
+        # the atom arrives, rather than every time the rule fires.
+        self.bindings_by_index = [[] for c in self.conditions]
         self.empty_atom_list_no = len(self.conditions)
     def validate(self):
         assert len(self.conditions) >= 2, self
@@ -126,10 +146,11 @@ class ProductRule(BuildRule):
         assert len(all_cond_vars) == len(eff_vars), self
         assert len(all_cond_vars) == sum([len(c) for c in cond_vars])
     def update_index(self, new_atom, cond_index):
-        atom_list = self.atoms_by_index[cond_index]
-        if not atom_list:
+        bindings_list = self.bindings_by_index[cond_index]
+        if not bindings_list:
             self.empty_atom_list_no -= 1
-        atom_list.append(new_atom)
+        bindings_list.append(
+            self._get_bindings(new_atom, self.conditions[cond_index]))
 
     def _get_bindings(self, atom, cond):
         return [(var_no, obj) for var_no, obj in zip(cond.args, atom.args)
@@ -143,25 +164,25 @@ class ProductRule(BuildRule):
         # Bindings: List-of(Binding)
         # BindingsFactor: List-of(Bindings)
         # BindingsFactors: List-of(BindingsFactor)
-        bindings_factors = []
-        for pos, cond in enumerate(self.conditions):
-            if pos == cond_index:
-                continue
-            atoms = self.atoms_by_index[pos]
-            assert atoms, "if we have no atoms, this should never be called"
-            factor = [self._get_bindings(atom, cond) for atom in atoms]
-            bindings_factors.append(factor)
+        # The factors are the incrementally maintained binding lists of
+        # the other conditions, so only the combinations involving the
+        # new atom are enumerated.
+        bindings_factors = [
+            bindings_list
+            for pos, bindings_list in enumerate(self.bindings_by_index)
+            if pos != cond_index]
 
         eff_args = self.prepare_effect(new_atom, cond_index)
 
         for bindings_list in itertools.product(*bindings_factors):
-            bindings = itertools.chain(*bindings_list)
-            for var_no, obj in bindings:
-                eff_args[var_no] = obj
+            for bindings in bindings_list:
+                for var_no, obj in bindings:
+                    eff_args[var_no] = obj
             enqueue_func(self.effect.predicate, eff_args)
 
 
 class ProjectRule(BuildRule):
+    type = "project"
     def __init__(self, effect, conditions):
         self.effect = effect
         self.conditions = conditions
@@ -296,15 +317,69 @@ class Queue:
         self.queue_pos += 1
         return result
 
-def compute_model(prog):
+def get_static_predicates(prog, rules):
+    """Return the predicates that only occur in facts of the program,
+    i.e., never in the effect of a rule."""
+    derived_predicates = {rule.effect.predicate for rule in rules}
+    return {fact.atom.predicate for fact in prog.facts} - derived_predicates
+
+def index_static_atoms(static_atoms, rules, unifier, enqueue_funcs):
+    # Static atoms are not unified when popped from the queue.
+    # Instead, they are added to the indexes of all rules they match up
+    # front, so that rules only fire when a non-static atom arrives and
+    # join it with the static atoms by index lookup. Rules all of whose
+    # conditions are static never see a non-static atom, so they are
+    # fired directly here.
+    static_predicates = {atom.predicate for atom in static_atoms}
+    static_rules = {
+        rule for rule in rules
+        if all(cond.predicate in static_predicates
+               for cond in rule.conditions)}
+    for atom in static_atoms:
+        for rule, cond_index in unifier.unify(atom):
+            rule.update_index(atom, cond_index)
+            if rule in static_rules:
+                rule.fire(atom, cond_index, enqueue_funcs[rule])
+
+def get_counting_enqueue_funcs(queue, rule_statistics):
+    """Return a dict mapping each rule to a function that pushes atoms
+    to the queue and counts the matches and new atoms of the rule."""
+    enqueue_funcs = {}
+    for rule, statistics in rule_statistics.items():
+        def push(predicate, args, statistics=statistics):
+            statistics.matches += 1
+            queue_length = len(queue.queue)
+            queue.push(predicate, args)
+            statistics.new_atoms += len(queue.queue) - queue_length
+        enqueue_funcs[rule] = push
+    return enqueue_funcs
+
+def compute_model(prog, statistics=None, store=None):
     with timers.timing("Preparing model"):
-        rules = convert_rules(prog)
+        rules = convert_rules(prog, store)
         unifier = Unifier(rules)
         # unifier.dump()
+        static_predicates = get_static_predicates(prog, rules)
         fact_atoms = sorted(fact.atom for fact in prog.facts)
-        queue = Queue(fact_atoms)
+        static_atoms = [atom for atom in fact_atoms
+                        if atom.predicate in static_predicates]
+        # The static atoms are part of the model (action and axiom atoms
+        # of rules without conditions are static, too), but they are
+        # skipped when popped because they are already indexed.
+        if store is None:
+            queue = Queue(fact_atoms)
+        else:
+            queue = store.create_queue(fact_atoms)
+        if statistics is None:
+            enqueue_funcs = {rule: queue.push for rule in rules}
+        else:
+            rule_statistics = {rule: statistics.add_rule(rule)
+                               for rule in rules}
+            enqueue_funcs = get_counting_enqueue_funcs(queue, rule_statistics)
+        index_static_atoms(static_atoms, rules, unifier, enqueue_funcs)
 
     print("Generated %d rules." % len(rules))
+    print("%d static atoms" % len(static_atoms))
     with timers.timing("Computing model"):
         relevant_atoms = 0
         auxiliary_atoms = 0
@@ -315,14 +390,21 @@ def compute_model(prog):
                 auxiliary_atoms += 1
             else:
                 relevant_atoms += 1
+            if pred in static_predicates:
+                continue
             matches = unifier.unify(next_atom)
+            if statistics is not None:
+                for rule, _ in matches:
+                    rule_statistics[rule].firings += 1
             for rule, cond_index in matches:
                 rule.update_index(next_atom, cond_index)
-                rule.fire(next_atom, cond_index, queue.push)
+                rule.fire(next_atom, cond_index, enqueue_funcs[rule])
     print("%d relevant atoms" % relevant_atoms)
     print("%d auxiliary atoms" % auxiliary_atoms)
     print("%d final queue length" % len(queue.queue))
     print("%d total queue pushes" % queue.num_pushes)
+    if statistics is not None:
+        statistics.count_model(queue.queue)
     return queue.queue
 
 if __name__ == "__main__":
@@ -149,6 +149,13 @@ class ConstraintSystem:
 
     def is_solvable(self):
         # cf. top of class for explanation
+        return _BacktrackingSolver(self).solve()
+
+    def is_solvable_by_enumeration(self):
+        """Reference implementation of is_solvable that checks every
+        combination of equality conjunctions from scratch. It takes time
+        exponential in the number of equality DNFs and is only kept for
+        testing and benchmarking the backtracking solver."""
         def inequality_disjunction_ok(ineq_disj, representative):
             for inequality in ineq_disj.parts:
                 a, b = inequality
@@ -175,3 +182,127 @@ class ConstraintSystem:
                 continue
             return True
         return False
+
+
+def _is_object(term):
+    return not isinstance(term, int) and term[0] != "?"
+
+
+class _BacktrackingSolver:
+    """Decides whether a ConstraintSystem is solvable by picking one
+       EqualityConjunction per equality DNF at a time and backtracking as
+       soon as the partial choice is inconsistent, puts an element of
+       not_constant into the same equivalence class as an object, or
+       falsifies all inequalities of an inequality disjunction. All three
+       conditions are monotonic (merging equivalence classes can only
+       make them worse), so pruning partial choices is safe.
+
+       The equivalence relation is maintained as a union-find structure
+       with union by size and without path compression, so that unions
+       can be undone in reverse order when backtracking."""
+
+    def __init__(self, system):
+        # Equality DNFs with a single conjunction leave no choice and are
+        # applied up front. The others are tried in order of increasing
+        # size, so that failures are detected as early as possible.
+        self.forced_conjunctions = [
+            equality_DNF[0] for equality_DNF in system.equality_DNFs
+            if len(equality_DNF) == 1]
+        self.equality_DNFs = sorted(
+            (equality_DNF for equality_DNF in system.equality_DNFs
+             if len(equality_DNF) != 1), key=len)
+        self.ineq_disjunctions = system.ineq_disjunctions
+        self.not_constant = set(system.not_constant)
+        self.parent = {}
+        self.size = {}
+        # For each root, the object in its class (or None) and whether
+        # its class contains an element of not_constant.
+        self.object = {}
+        self.has_not_constant = {}
+        self.trail = []
+
+    def _add_term(self, term):
+        self.parent[term] = term
+        self.size[term] = 1
+        self.object[term] = term if _is_object(term) else None
+        self.has_not_constant[term] = term in self.not_constant
+
+    def _find(self, term):
+        parent = self.parent
+        next_term = parent.get(term, term)
+        while next_term != term:
+            term = next_term
+            next_term = parent[term]
+        return term
+
+    def _union(self, term1, term2):
+        """Merge the classes of the two terms. Return False (without
+           merging) if this would make the relation inconsistent or put
+           an element of not_constant into the class of an object."""
+        if term1 not in self.parent:
+            self._add_term(term1)
+        if term2 not in self.parent:
+            self._add_term(term2)
+        root1 = self._find(term1)
+        root2 = self._find(term2)
+        if root1 == root2:
+            return True
+        object1 = self.object[root1]
+        object2 = self.object[root2]
+        if object1 is not None and object2 is not None:
+            return False
+        new_object = object1 if object1 is not None else object2
+        new_not_constant = (self.has_not_constant[root1] or
+                            self.has_not_constant[root2])
+        if new_object is not None and new_not_constant:
+            return False
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+        self.trail.append((root2, root1, self.object[root1],
+                           self.has_not_constant[root1]))
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+        self.object[root1] = new_object
+        self.has_not_constant[root1] = new_not_constant
+        return True
+
+    def _undo(self, trail_length):
+        while len(self.trail) > trail_length:
+            child, root, old_object, old_not_constant = self.trail.pop()
+            self.parent[child] = child
+            self.size[root] -= self.size[child]
+            self.object[root] = old_object
+            self.has_not_constant[root] = old_not_constant
+
+    def _inequalities_satisfiable(self):
+        for ineq_disj in self.ineq_disjunctions:
+            for a, b in ineq_disj.parts:
+                if self._find(a) != self._find(b):
+                    break
+            else:
+                return False
+        return True
+
+    def _choose(self, dnf_no):
+        if dnf_no == len(self.equality_DNFs):
+            return True
+        trail_length = len(self.trail)
+        for eq_conjunction in self.equality_DNFs[dnf_no]:
+            if (all(self._union(v1, v2)
+                    for v1, v2 in eq_conjunction.equalities) and
+                    self._inequalities_satisfiable() and
+                    self._choose(dnf_no + 1)):
+                return True
+            self._undo(trail_length)
+        return False
+
+    def solve(self):
+        if any(_is_object(term) for term in self.not_constant):
+            return False
+        for eq_conjunction in self.forced_conjunctions:
+            for v1, v2 in eq_conjunction.equalities:
+                if not self._union(v1, v2):
+                    return False
+        if not self._inequalities_satisfiable():
+            return False
+        return self._choose(0)
@@ -0,0 +1,103 @@
+"""This module contains a function for removing operators of a task in
+finite-domain representation (SASTask) that are not needed for optimal
+planning. Usage:
+
+    removed = dominated_operators.prune_dominated_operators(sas_task)
+
+An operator o is dominated by another operator o' if both have the same
+effects (with the same effect conditions), every precondition of o' is
+also a precondition of o and o' costs at most as much as o. Then o' is
+applicable in every state in which o is applicable and leads to the same
+successor state, so replacing o by o' in a plan gives a plan that is at
+least as cheap. Operators that are identical except for their names are
+a special case, of which we keep the first one.
+
+Such operators are common when actions have parameters that no
+variable depends on after the translation, e.g., because the atoms
+mentioning them are static or have been filtered as unimportant.
+
+The function modifies `sas_task` in-place and returns a list of
+(name, replacement name, reason) triples for the removed operators,
+where the reason is "duplicate" or "dominated". The remaining operators
+keep their order."""
+
+from collections import defaultdict
+
+import sas_tasks
+
+
+def _get_preconditions(op):
+    preconditions = list(op.prevail)
+    preconditions += {(var, pre) for var, pre, _, _ in op.pre_post
+                      if pre != -1}
+    return frozenset(preconditions)
+
+
+def _get_effects(op):
+    # The pre_post entries are sorted, so the effects are, too.
+    return tuple((var, post, tuple(cond)) for var, _, post, cond in op.pre_post)
+
+
+def _find_dominating_operator(preconditions, cost, index):
+    """Return the number of an operator in the index that has a subset
+    of the given preconditions and at most the given cost, or None.
+    The index maps each precondition to the operators whose smallest
+    precondition it is, and None to the operators without
+    preconditions."""
+    for key in [None] + sorted(preconditions):
+        for op_no, op_preconditions, op_cost in index.get(key, ()):
+            if op_cost <= cost and op_preconditions <= preconditions:
+                return op_no
+    return None
+
+
+def prune_dominated_operators(task):
+    operators = list(task.operators)
+    ops_by_effects = defaultdict(list)
+    for op_no, op in enumerate(operators):
+        ops_by_effects[_get_effects(op)].append(
+            (op_no, _get_preconditions(op)))
+
+    replaced_by = {}
+    for group in ops_by_effects.values():
+        if len(group) == 1:
+            continue
+        # A dominating operator has at most as many preconditions and,
+        # if it has the same preconditions, at most the same cost, so
+        # it comes before the operators it dominates in this order.
+        # Dominance is transitive, so it suffices to compare with the
+        # operators we keep.
+        group.sort(key=lambda entry: (
+            len(entry[1]), operators[entry[0]].cost, entry[0]))
+        index = {}
+        for op_no, preconditions in group:
+            cost = operators[op_no].cost
+            dominating_op_no = _find_dominating_operator(
+                preconditions, cost, index)
+            if dominating_op_no is None:
+                key = min(preconditions) if preconditions else None
+                index.setdefault(key, []).append((op_no, preconditions, cost))
+            else:
+                replaced_by[op_no] = dominating_op_no
+
+    removed = []
+    new_operators = sas_tasks.SASOperatorTable()
+    num_duplicates = 0
+    for op_no, op in enumerate(operators):
+        dominating_op_no = replaced_by.get(op_no)
+        if dominating_op_no is None:
+            new_operators.append(op.name, op.prevail, op.pre_post, op.cost)
+            continue
+        dominating_op = operators[dominating_op_no]
+        if (op.cost == dominating_op.cost and
+                op.prevail == dominating_op.prevail and
+                op.pre_post == dominating_op.pre_post):
+            reason = "duplicate"
+            num_duplicates += 1
+        else:
+            reason = "dominated"
+        removed.append((op.name, dominating_op.name, reason))
+    task.operators = new_operators
+    print("%d duplicate operators removed" % num_duplicates)
+    print("%d dominated operators removed" % (len(removed) - num_duplicates))
+    return removed
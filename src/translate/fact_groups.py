@@ -1,14 +1,41 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
 import invariant_finder
+import invariants
 import options
 import pddl
 import timers
-from typing import Dict, List, Set, Tuple
 
 
 DEBUG = False
 
 
-def expand_group(group, task, reachable_facts):
+def get_counted_key(fact, pos):
+    return (fact.predicate, pos, fact.args[:pos] + fact.args[pos + 1:])
+
+def build_counted_fact_index(groups, reachable_facts):
+    """Map each (predicate, position, other arguments) triple that occurs
+    for a counted variable ?X in the groups to the list of reachable facts
+    that match it, i.e., the facts that result from filling in ?X with an
+    object that actually appears at this position."""
+    counted_positions = set()
+    for group in groups:
+        for fact in group:
+            if "?X" in fact.args:
+                counted_positions.add(
+                    (fact.predicate, list(fact.args).index("?X")))
+    positions_by_predicate = defaultdict(list)
+    for predicate, pos in counted_positions:
+        positions_by_predicate[predicate].append(pos)
+
+    index = defaultdict(list)
+    for fact in sorted(reachable_facts):
+        for pos in positions_by_predicate.get(fact.predicate, ()):
+            index[get_counted_key(fact, pos)].append(fact)
+    return index
+
+def expand_group(group, reachable_facts, counted_fact_index):
     result = []
     for fact in group:
         try:
@@ -17,20 +44,13 @@ def expand_group(group, task, reachable_facts):
             if fact in reachable_facts:
                 result.append(fact)
         else:
-            # NOTE: This could be optimized by only trying objects of the correct
-            #       type, or by using a unifier which directly generates the
-            #       applicable objects. It is not worth optimizing this at this stage,
-            #       though.
-            for obj in task.objects:
-                newargs = list(fact.args)
-                newargs[pos] = obj.name
-                atom = pddl.Atom(fact.predicate, newargs)
-                if atom in reachable_facts:
-                    result.append(atom)
+            result += counted_fact_index.get(get_counted_key(fact, pos), [])
     return result
 
-def instantiate_groups(groups, task, reachable_facts):
-    return [expand_group(group, task, reachable_facts) for group in groups]
+def instantiate_groups(groups, reachable_facts):
+    counted_fact_index = build_counted_fact_index(groups, reachable_facts)
+    return [expand_group(group, reachable_facts, counted_fact_index)
+            for group in groups]
 
 class GroupCoverQueue:
     def __init__(self, groups):
@@ -112,7 +132,8 @@ def sort_groups(groups):
 
 def compute_groups(task: pddl.Task, atoms: Set[pddl.Literal],
     reachable_action_params: Dict[pddl.Action, List[str]],
-    negative_in_goal: Set[pddl.Atom]) -> Tuple[
+    negative_in_goal: Set[pddl.Atom],
+    invariants: Optional[List[invariants.Invariant]] = None) -> Tuple[
         List[List[pddl.Atom]], # groups
         # -> all selected mutex groups plus singleton groups for uncovered facts
         List[List[pddl.Atom]], # mutex_groups
@@ -120,10 +141,11 @@ def compute_groups(task: pddl.Task, atoms: Set[pddl.Literal],
         List[List[str]], # translation_key
         # -> string representations of group atoms (plus one for "other value")
         ]:
-    groups = invariant_finder.get_groups(task, reachable_action_params)
+    groups = invariant_finder.get_groups(task, reachable_action_params,
+                                         invariants)
 
     with timers.timing("Instantiating groups"):
-        groups = instantiate_groups(groups, task, atoms)
+        groups = instantiate_groups(groups, atoms)
 
     # Sort here already to get deterministic mutex groups.
     groups = sort_groups(groups)
@@ -0,0 +1,188 @@
+"""Cheap estimate of the size of the grounded task.
+
+We estimate the number of atoms of each predicate of the Datalog
+program that is used for grounding (see pddl_to_prolog) without
+computing its model. For every predicate we keep an estimated number
+of atoms and, for every argument position, an estimated number of
+distinct values. The facts of the program define these numbers exactly
+for the static relations and the types. The rules propagate them with
+the textbook estimates for selections, projections, products and
+joins, which assume that values are distributed uniformly and
+independently. Since rules can be recursive, we iterate until the
+estimates do not grow any further or the iteration limit is reached.
+Estimates never shrink in the iteration and are bounded by the number
+of objects to the power of the arity of the predicate.
+
+The estimates are meant to tell small from huge tasks quickly; they
+can be off by orders of magnitude in both directions."""
+
+from collections import defaultdict
+
+import pddl
+
+# Maximal number of passes over the rules and the relative growth of
+# the estimates below which we consider them converged.
+MAX_ITERATIONS = 100
+CONVERGENCE_THRESHOLD = 0.001
+
+
+class RelationEstimate:
+    def __init__(self, arity):
+        self.size = 0.0
+        self.distinct_values = [0.0] * arity
+
+
+def _is_variable(arg):
+    return arg[0] == "?"
+
+
+def _estimate_condition(estimate, condition):
+    """Return the estimated size of the relation defined by the condition
+    atom and a dict mapping its variables to estimated numbers of
+    distinct values. Constant arguments select the atoms with this
+    value."""
+    size = estimate.size
+    for pos, arg in enumerate(condition.args):
+        if not _is_variable(arg):
+            size /= max(estimate.distinct_values[pos], 1.0)
+    distinct_values = {}
+    for pos, arg in enumerate(condition.args):
+        if _is_variable(arg):
+            values = min(estimate.distinct_values[pos], size)
+            distinct_values[arg] = min(
+                distinct_values.get(arg, values), values)
+    return size, distinct_values
+
+
+def _estimate_rule(rule, estimates):
+    """Return the estimated number of effect atoms produced by the rule
+    and the estimated numbers of distinct values of the effect
+    arguments."""
+    sizes = []
+    var_values = {}
+    for condition in rule.conditions:
+        size, distinct_values = _estimate_condition(
+            estimates[condition.predicate], condition)
+        sizes.append(size)
+        for var, values in distinct_values.items():
+            if var in var_values:
+                # Join variable: each pair of atoms matches with
+                # probability 1 / max(values).
+                old_values = var_values[var]
+                sizes.append(1.0 / max(old_values, values, 1.0))
+                var_values[var] = min(old_values, values)
+            else:
+                var_values[var] = values
+    size = 1.0
+    for factor in sizes:
+        size *= factor
+    effect_values = [var_values[arg] if _is_variable(arg) else 1.0
+                     for arg in rule.effect.args]
+    bound = 1.0
+    for values in effect_values:
+        bound *= values
+    return min(size, bound), effect_values
+
+
+class GroundingEstimate:
+    def __init__(self, prog):
+        self.num_objects = max(len(prog.objects), 1)
+        arities = {}
+        for fact in prog.facts:
+            arities[fact.atom.predicate] = len(fact.atom.args)
+        for rule in prog.rules:
+            for atom in rule.conditions + [rule.effect]:
+                arities[atom.predicate] = len(atom.args)
+        self.estimates = {predicate: RelationEstimate(arity)
+                          for predicate, arity in arities.items()}
+        self.derived_predicates = {rule.effect.predicate
+                                   for rule in prog.rules}
+
+        fact_args = defaultdict(set)
+        for fact in prog.facts:
+            fact_args[fact.atom.predicate].add(tuple(fact.atom.args))
+        self.fact_estimates = {}
+        for predicate, args in fact_args.items():
+            estimate = RelationEstimate(arities[predicate])
+            estimate.size = float(len(args))
+            estimate.distinct_values = [float(len(set(values)))
+                                        for values in zip(*args)]
+            self.fact_estimates[predicate] = estimate
+            self.estimates[predicate] = estimate
+        self.num_iterations = self._propagate(prog.rules)
+
+    def _propagate(self, rules):
+        rules_by_effect = defaultdict(list)
+        for rule in rules:
+            rules_by_effect[rule.effect.predicate].append(rule)
+        for iteration in range(1, MAX_ITERATIONS + 1):
+            grown = False
+            for predicate, effect_rules in rules_by_effect.items():
+                old = self.estimates[predicate]
+                new = self._estimate_predicate(predicate, effect_rules)
+                if new.size > old.size * (1 + CONVERGENCE_THRESHOLD):
+                    grown = True
+                new.size = max(new.size, old.size)
+                new.distinct_values = [
+                    max(new_values, old_values) for new_values, old_values
+                    in zip(new.distinct_values, old.distinct_values)]
+                self.estimates[predicate] = new
+            if not grown:
+                return iteration
+        return MAX_ITERATIONS
+
+    def _estimate_predicate(self, predicate, rules):
+        arity = len(rules[0].effect.args)
+        result = RelationEstimate(arity)
+        facts = self.fact_estimates.get(predicate)
+        if facts is not None:
+            result.size = facts.size
+            result.distinct_values = list(facts.distinct_values)
+        for rule in rules:
+            size, effect_values = _estimate_rule(rule, self.estimates)
+            result.size += size
+            result.distinct_values = [
+                old_values + values for old_values, values
+                in zip(result.distinct_values, effect_values)]
+        result.distinct_values = [min(values, self.num_objects)
+                                  for values in result.distinct_values]
+        bound = 1.0
+        for values in result.distinct_values:
+            bound *= values
+        result.size = min(result.size, bound)
+        return result
+
+    def get_size(self, predicate):
+        return self.estimates[predicate].size
+
+    def get_schema_sizes(self, schema_type):
+        """Return pairs of action or axiom schemas (depending on
+        schema_type) and their estimated numbers of ground instances,
+        in the order of the program."""
+        return [(predicate, estimate.size)
+                for predicate, estimate in self.estimates.items()
+                if isinstance(predicate, schema_type)]
+
+    def get_num_operators(self):
+        return sum(size for _, size in self.get_schema_sizes(pddl.Action))
+
+    def get_num_atoms(self):
+        """Estimated number of ground atoms of the predicates derived
+        in the program, not counting actions, axiom applications and
+        auxiliary predicates."""
+        return sum(self.get_size(predicate)
+                   for predicate in self.derived_predicates
+                   if isinstance(predicate, str) and "$" not in predicate)
+
+    def dump(self):
+        print("Estimate computed in %d iterations." % self.num_iterations)
+        action_sizes = self.get_schema_sizes(pddl.Action)
+        axiom_sizes = self.get_schema_sizes(pddl.Axiom)
+        for kind, schema_sizes in [("action", action_sizes),
+                                   ("axiom", axiom_sizes)]:
+            for schema, size in sorted(schema_sizes, key=lambda x: -x[1]):
+                print("Estimated %s %s: %.0f" % (kind, schema.name, size))
+        print("Estimated ground atoms: %.0f" % self.get_num_atoms())
+        print("Estimated operators: %.0f" % self.get_num_operators())
+        print("Estimated axioms: %.0f" %
+              sum(size for _, size in axiom_sizes))
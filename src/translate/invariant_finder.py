@@ -7,11 +7,17 @@ import random
 import time
 from typing import List
 
+import grounded_input
 import invariants
 import options
+import parallel
 import pddl
 import timers
 
+# Number of candidates per worker process that are checked in one batch
+# of the parallel invariant search.
+INVARIANT_CANDIDATES_PER_JOB = 256
+
 class BalanceChecker:
     def __init__(self, task, reachable_action_params):
         self.predicates_to_add_actions = defaultdict(list)
@@ -41,6 +47,14 @@ class BalanceChecker:
             # to all quantified variables (implicitly in constructor)
             self.action_to_heavy_action[action] = heavy_act
 
+    def seed_random(self, candidate_no):
+        # With --parallel-invariant-synthesis, the random choices made
+        # for a candidate only depend on its position in the sequence
+        # of candidates, not on the candidates checked before, so that
+        # candidates can be checked in any order. The serial search
+        # uses a single random stream instead.
+        self.random.seed(314159 + candidate_no)
+
     def get_threats(self, predicate):
         return self.predicates_to_add_actions.get(predicate, list())
 
@@ -93,26 +107,105 @@ def get_initial_invariants(task):
 
 def find_invariants(task, reachable_action_params):
     limit = options.invariant_generation_max_candidates
-    candidates = deque(itertools.islice(get_initial_invariants(task), 0, limit))
+    candidates = deque(enumerate(
+        itertools.islice(get_initial_invariants(task), 0, limit)))
     print(len(candidates), "initial candidates")
-    seen_candidates = set(candidates)
+    seen_candidates = {candidate for _, candidate in candidates}
 
     balance_checker = BalanceChecker(task, reachable_action_params)
 
     def enqueue_func(invariant):
         if len(seen_candidates) < limit and invariant not in seen_candidates:
-            candidates.append(invariant)
+            candidates.append((len(seen_candidates), invariant))
             seen_candidates.add(invariant)
 
+    if (options.parallel_invariant_synthesis and
+            parallel.can_fork(options.jobs)):
+        yield from _find_invariants_in_parallel(
+            candidates, seen_candidates, limit, balance_checker,
+            enqueue_func)
+        return
+
     start_time = time.process_time()
     while candidates:
-        candidate = candidates.popleft()
+        _, candidate = candidates.popleft()
         if time.process_time() - start_time > options.invariant_generation_max_time:
             print("Time limit reached, aborting invariant generation")
             return
         if candidate.check_balance(balance_checker, enqueue_func):
             yield candidate
 
+def _find_invariants_in_parallel(candidates, seen_candidates, limit,
+                                 balance_checker, enqueue_func):
+    # Candidates are checked in batches taken from the front of the
+    # queue. The refinements generated for the candidates of a batch
+    # are enqueued in the order of the candidates after the whole batch
+    # has been checked. As in the serial search, this appends them
+    # behind all candidates that are already queued, so the order in
+    # which candidates are considered does not change. The random
+    # number generator is reseeded for every candidate, so the result
+    # does not depend on the number of jobs or the size of the batches.
+    # It can differ from the result of the serial search, which draws
+    # all random choices from one stream, if the order in which actions
+    # are checked matters.
+    #
+    # The workers are forked once, so they see the set of candidates
+    # seen at the start of the search and skip refinements that are
+    # known to be duplicates. The other duplicates are removed when
+    # enqueueing.
+    #
+    # The workers measure the CPU time spent on each candidate. We check
+    # the time limit before each candidate against the CPU time of this
+    # process plus the time spent on all candidates before it, as if the
+    # candidates were checked serially. A worker skips the rest of its
+    # chunk once its own time exceeds the time left for the batch,
+    # since the limit is reached before these candidates then.
+    def check_chunk(chunk):
+        result = []
+        time_used = 0
+        for candidate_no, candidate, time_left in chunk:
+            if time_used > time_left:
+                result.append(None)
+                continue
+            candidate_start_time = time.process_time()
+            refinements = []
+            def collect_refinement(invariant):
+                if (len(seen_candidates) < limit and
+                        invariant not in seen_candidates):
+                    refinements.append(invariant)
+            balance_checker.seed_random(candidate_no)
+            balanced = candidate.check_balance(balance_checker,
+                                               collect_refinement)
+            candidate_time = time.process_time() - candidate_start_time
+            time_used += candidate_time
+            result.append((balanced, refinements, candidate_time))
+        return result
+
+    batch_size = options.jobs * INVARIANT_CANDIDATES_PER_JOB
+    max_time = options.invariant_generation_max_time
+    start_time = time.process_time()
+    worker_time = 0
+    with parallel.WorkerPool(check_chunk, options.jobs) as pool:
+        while candidates:
+            batch = [candidates.popleft()
+                     for _ in range(min(batch_size, len(candidates)))]
+            time_left = (max_time - worker_time -
+                         (time.process_time() - start_time))
+            results = itertools.chain.from_iterable(pool.map_chunks(
+                [(candidate_no, candidate, time_left)
+                 for candidate_no, candidate in batch]))
+            for (_, candidate), result in zip(batch, results):
+                if (result is None or time.process_time() - start_time +
+                        worker_time > max_time):
+                    print("Time limit reached, aborting invariant generation")
+                    return
+                balanced, refinements, candidate_time = result
+                worker_time += candidate_time
+                for invariant in refinements:
+                    enqueue_func(invariant)
+                if balanced:
+                    yield candidate
+
 def useful_groups(invariants, initial_facts):
     predicate_to_invariants = defaultdict(list)
     for invariant in invariants:
@@ -141,12 +234,24 @@ def useful_groups(invariants, initial_facts):
     for (invariant, parameters) in useful_groups:
         yield [part.instantiate(parameters) for part in sorted(invariant.parts)]
 
-# returns a list of mutex groups (parameters instantiated, counted variables not)
-def get_groups(task, reachable_action_params=None) -> List[List[pddl.Atom]]:
+def get_invariants(task, reachable_action_params=None):
     with timers.timing("Finding invariants", block=True):
-        invariants = list(find_invariants(task, reachable_action_params))
+        if options.grounded_fast_path and grounded_input.is_grounded(task):
+            return list(grounded_input.find_invariants(
+                task, reachable_action_params))
+        return list(find_invariants(task, reachable_action_params))
+
+# returns a list of mutex groups (parameters instantiated, counted variables not)
+# The invariants can be passed in if they are already known.
+def get_groups(task, reachable_action_params=None,
+               invariants=None) -> List[List[pddl.Atom]]:
+    if invariants is None:
+        invariants = get_invariants(task, reachable_action_params)
     with timers.timing("Checking invariant weight"):
-        result = list(useful_groups(invariants, task.init))
+        if options.grounded_fast_path and grounded_input.is_grounded(task):
+            result = list(grounded_input.useful_groups(invariants, task.init))
+        else:
+            result = list(useful_groups(invariants, task.init))
     return result
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@
 import copy
 from typing import Sequence
 
+import options
 import pddl
 
 class ConditionProxy:
@@ -183,6 +184,13 @@ def remove_universal_quantifiers(task):
 # (1) or(phi, or(psi, psi'))      ==  or(phi, psi, psi')
 # (2) exists(vars, or(phi, psi))  ==  or(exists(vars, phi), exists(vars, psi))
 # (3) and(phi, or(psi, psi'))     ==  or(and(phi, psi), and(phi, psi'))
+#
+# Rule (3) multiplies the numbers of disjuncts, and each disjunct later
+# becomes a separate action, effect or axiom. If the result would have
+# more than options.max_dnf_disjuncts disjuncts, we replace the largest
+# disjunctions of the conjunction by <aux>, where <aux> is a new axiom
+# defined as the disjunction, until the product is small enough. The
+# parameters of the new axiom are the free variables of the disjunction.
 def build_DNF(task):
     def recurse(condition):
         disjunctive_parts = []
@@ -212,6 +220,10 @@ def build_DNF(task):
 
         # Rule (3): Distributivity disjunction/conjunction.
         assert isinstance(condition, pddl.Conjunction)
+        if max_disjuncts is not None:
+            replace_large_disjunctions(disjunctive_parts, other_parts)
+            if not disjunctive_parts:
+                return pddl.Conjunction(other_parts)
         result_parts = [pddl.Conjunction(other_parts)]
         while disjunctive_parts:
             previous_result_parts = result_parts
@@ -222,9 +234,47 @@ def build_DNF(task):
                     result_parts.append(pddl.Conjunction((part1, part2)))
         return pddl.Disjunction(result_parts)
 
-    for proxy in all_conditions(task):
+    def replace_large_disjunctions(disjunctive_parts, other_parts):
+        # Uses new_axioms_by_condition and type_map from surrounding scope.
+        num_disjuncts = 1
+        for part in disjunctive_parts:
+            num_disjuncts *= len(part.parts)
+        if num_disjuncts <= max_disjuncts:
+            return
+        by_size = sorted(range(len(disjunctive_parts)),
+                         key=lambda index: -len(disjunctive_parts[index].parts))
+        replaced = set()
+        for index in by_size:
+            if num_disjuncts <= max_disjuncts:
+                break
+            replaced.add(index)
+            disjunction = disjunctive_parts[index]
+            num_disjuncts //= len(disjunction.parts)
+            parameters = sorted(disjunction.free_variables())
+            typed_parameters = tuple(pddl.TypedObject(v, type_map[v])
+                                     for v in parameters)
+            key = (disjunction, typed_parameters)
+            axiom = new_axioms_by_condition.get(key)
+            if not axiom:
+                axiom = task.add_axiom(list(typed_parameters),
+                                       disjunction.simplified())
+                new_axioms_by_condition[key] = axiom
+            other_parts.append(pddl.Atom(axiom.name, parameters))
+        disjunctive_parts[:] = [part for index, part in
+                                enumerate(disjunctive_parts)
+                                if index not in replaced]
+
+    max_disjuncts = options.max_dnf_disjuncts
+    new_axioms_by_condition = {}
+    num_axioms = len(task.axioms)
+    for proxy in tuple(all_conditions(task)):
+        # Cannot use generator because we add new axioms on the fly.
         if proxy.condition.has_disjunction():
+            type_map = proxy.get_type_map()
             proxy.set(recurse(proxy.condition).simplified())
+    if max_disjuncts is not None:
+        print("%d auxiliary axioms for disjunctive conditions" % (
+            len(task.axioms) - num_axioms))
 
 # [3] Split conditions at the outermost disjunction.
 def split_disjunctions(task):
@@ -345,6 +395,8 @@ def normalize(task):
     substitute_complicated_goal(task)
     build_DNF(task)
     split_disjunctions(task)
+    print("%d action schemas and %d axiom schemas after splitting "
+          "disjunctions" % (len(task.actions), len(task.axioms)))
     move_existential_quantifiers(task)
     eliminate_existential_quantifiers_from_axioms(task)
     eliminate_existential_quantifiers_from_preconditions(task)
@@ -0,0 +1,99 @@
+# Simple data parallelism based on forked worker processes.
+#
+# Workers are created with the "fork" start method, so they inherit
+# all data of the parent process (e.g., the model, the initial state
+# and the fact sets) copy-on-write and only the results of their work
+# are sent back. On platforms without fork, callers fall back to
+# serial processing.
+
+import multiprocessing
+
+# Number of chunks per worker process. Using several smaller chunks
+# per worker balances the load when chunks differ in cost.
+CHUNKS_PER_JOB = 4
+
+_function = None
+_items = None
+_chunk_bounds = None
+
+
+def can_fork(jobs):
+    return jobs > 1 and "fork" in multiprocessing.get_all_start_methods()
+
+
+def _run_chunk(chunk_no):
+    start, end = _chunk_bounds[chunk_no]
+    return _function(_items[start:end])
+
+
+def _get_chunk_bounds(num_items, jobs):
+    num_chunks = min(num_items, jobs * CHUNKS_PER_JOB)
+    return [
+        (num_items * chunk_no // num_chunks,
+         num_items * (chunk_no + 1) // num_chunks)
+        for chunk_no in range(num_chunks)]
+
+
+def map_chunks(function, items, jobs):
+    """Split items into contiguous chunks, apply function to each chunk
+    in a pool of jobs worker processes, and return the list of results
+    in the order of the chunks. Since the chunks are contiguous, the
+    concatenation of per-item results is the same as for the serial
+    computation function(items).
+
+    function does not need to be picklable, but its results must be.
+    Must only be called if can_fork(jobs) holds."""
+    global _function, _items, _chunk_bounds
+    if not items:
+        return []
+    _chunk_bounds = _get_chunk_bounds(len(items), jobs)
+    _function = function
+    _items = items
+    try:
+        with multiprocessing.get_context("fork").Pool(jobs) as pool:
+            return pool.map(_run_chunk, range(len(_chunk_bounds)),
+                            chunksize=1)
+    finally:
+        _function = _items = _chunk_bounds = None
+
+
+def _run_function(chunk):
+    return _function(chunk)
+
+
+class WorkerPool:
+    """A pool of jobs worker processes for applying the same function to
+    several lists of items without forking new workers for each list.
+    Use it as a context manager.
+
+    The workers are forked when the pool is created, so they inherit
+    function and the data of the parent process at that time. Unlike
+    with map_chunks, the items are sent to the workers, so they must be
+    picklable, too. Only one pool can exist at a time, and map_chunks
+    must not be called while it exists. Must only be used if
+    can_fork(jobs) holds."""
+    def __init__(self, function, jobs):
+        global _function
+        self.jobs = jobs
+        _function = function
+        try:
+            self.pool = multiprocessing.get_context("fork").Pool(jobs)
+        except BaseException:
+            _function = None
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        global _function
+        self.pool.terminate()
+        self.pool.join()
+        _function = None
+
+    def map_chunks(self, items):
+        """Like map_chunks(function, items, jobs), using the workers of
+        this pool."""
+        chunks = [items[start:end] for start, end in
+                  _get_chunk_bounds(len(items), self.jobs)]
+        return self.pool.map(_run_function, chunks, chunksize=1)
@@ -23,6 +23,7 @@ from .conditions import Conjunction
 from .conditions import Disjunction
 from .conditions import UniversalCondition
 from .conditions import ExistentialCondition
+from .conditions import clear_interned_literals
 
 from .effects import ConditionalEffect
 from .effects import ConjunctiveEffect
@@ -71,22 +71,26 @@ class Action:
         return result
 
     def instantiate(self, var_mapping, init_facts, init_assignments,
-                    fluent_facts, objects_by_type, metric):
+                    fluent_facts, objects_by_type, metric,
+                    precondition=None):
         """Return a PropositionalAction which corresponds to the instantiation of
         this action with the arguments in var_mapping. Only fluent parts of the
         conditions (those in fluent_facts) are included. init_facts are evaluated
         while instantiating.
         Precondition and effect conditions must be normalized for this to work.
+        If given, precondition is evaluated instead of self.precondition. It
+        must be equivalent to it for all instantiations that are considered.
         Returns None if var_mapping does not correspond to a valid instantiation
         (because it has impossible preconditions or an empty effect list.)"""
         arg_list = [var_mapping[par.name]
                     for par in self.parameters[:self.num_external_parameters]]
-        name = "(%s %s)" % (self.name, " ".join(arg_list))
 
-        precondition = []
+        if precondition is None:
+            precondition = self.precondition
+        inst_precondition = []
         try:
-            self.precondition.instantiate(var_mapping, init_facts,
-                                          fluent_facts, precondition)
+            precondition.instantiate(var_mapping, init_facts,
+                                     fluent_facts, inst_precondition)
         except conditions.Impossible:
             return None
         effects = []
@@ -102,30 +106,45 @@ class Action:
                         var_mapping, init_assignments).expression.value)
             else:
                 cost = 1
-            return PropositionalAction(name, precondition, effects, cost)
+            return PropositionalAction(self.name, inst_precondition, effects,
+                                       cost, arg_list)
         else:
             return None
 
 
 class PropositionalAction:
+    __slots__ = ["_name", "_args", "precondition", "add_effects",
+                 "del_effects", "cost"]
+
     def __init__(self, name: str, precondition: List[Literal], effects:
-            List[Tuple[List[Literal], Literal]], cost: int):
-        self.name = name
+            List[Tuple[List[Literal], Literal]], cost: int,
+            args: Optional[List[str]] = None):
+        # If args is given, name is the name of the action schema, and
+        # the name of the ground action is only built when it is needed.
+        self._name = name
+        self._args = args
         self.precondition = precondition
         self.add_effects = []
         self.del_effects = []
+        add_effects = set()
         for condition, effect in effects:
             if not effect.negated:
                 self.add_effects.append((condition, effect))
-        # Warning: This is O(N^2), could be turned into O(N).
-        # But that might actually harm performance, since there are
-        # usually few effects.
-        # TODO: Measure this in critical domains, then use sets if acceptable.
+                add_effects.add((tuple(condition), effect))
         for condition, effect in effects:
-            if effect.negated and (condition, effect.negate()) not in self.add_effects:
-                self.del_effects.append((condition, effect.negate()))
+            if effect.negated:
+                atom = conditions.intern_literal(effect.negate())
+                if (tuple(condition), atom) not in add_effects:
+                    self.del_effects.append((condition, atom))
         self.cost = cost
 
+    @property
+    def name(self):
+        if self._args is not None:
+            self._name = "(%s %s)" % (self._name, " ".join(self._args))
+            self._args = None
+        return self._name
+
     def __repr__(self):
         return "<PropositionalAction %r at %#x>" % (self.name, id(self))
 
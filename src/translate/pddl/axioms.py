@@ -42,7 +42,8 @@ class Axiom:
 
         effect_args = [var_mapping.get(arg.name, arg.name)
                        for arg in self.parameters[:self.num_external_parameters]]
-        effect = conditions.Atom(self.name, effect_args)
+        effect = conditions.intern_literal(
+            conditions.Atom(self.name, effect_args))
         return PropositionalAxiom(name, condition, effect)
 
 
@@ -9,6 +9,8 @@ from .pddl_types import TypedObject
 # Careful: Most other classes (e.g. Effects, Axioms, Actions) are not!
 
 class Condition:
+    # Subclasses without __slots__ still get an instance dictionary.
+    __slots__ = ()
     def __init__(self, parts: List["Condition"]):
         self.parts = tuple(parts)
         self.hash = hash((self.__class__, self.parts))
@@ -230,6 +232,12 @@ class Literal(Condition):
         self.predicate = predicate
         self.args = tuple(args)
         self.hash = hash((self.__class__, self.predicate, self.args))
+    def __reduce_ex__(self, protocol):
+        # Ground literals that are sent between processes are interned
+        # again. Lifted literals are pickled and copied as usual.
+        if any(arg[0] == "?" for arg in self.args):
+            return super().__reduce_ex__(protocol)
+        return _unpickle_literal, (self.__class__, self.predicate, self.args)
     def __eq__(self, other):
         # Compare hash first for speed reasons.
         return (self.hash == other.hash and
@@ -267,6 +275,7 @@ class Literal(Condition):
         return {arg for arg in self.args if arg[0] == "?"}
 
 class Atom(Literal):
+    __slots__ = ()
     negated = False
     def to_untyped_strips(self):
         return [self]
@@ -274,7 +283,7 @@ class Atom(Literal):
         args = [var_mapping.get(arg, arg) for arg in self.args]
         atom = Atom(self.predicate, args)
         if atom in fluent_facts:
-            result.append(atom)
+            result.append(intern_literal(atom))
         elif atom not in init_facts:
             raise Impossible()
     def negate(self):
@@ -283,6 +292,7 @@ class Atom(Literal):
         return self
 
 class NegatedAtom(Literal):
+    __slots__ = ()
     negated = True
     def _relaxed(self, parts):
         return Truth()
@@ -290,9 +300,24 @@ class NegatedAtom(Literal):
         args = [var_mapping.get(arg, arg) for arg in self.args]
         atom = Atom(self.predicate, args)
         if atom in fluent_facts:
-            result.append(NegatedAtom(self.predicate, args))
+            result.append(intern_literal(NegatedAtom(self.predicate, args)))
         elif atom in init_facts:
             raise Impossible()
     def negate(self):
         return Atom(self.predicate, self.args)
     positive = negate
+
+# Ground literals are interned when instantiating conditions and effects,
+# so that all ground actions and axioms share one object per distinct
+# literal. The table must be cleared after translating a task, since it
+# keeps all literals alive.
+_interned_literals = {}
+
+def intern_literal(literal):
+    return _interned_literals.setdefault(literal, literal)
+
+def clear_interned_literals():
+    _interned_literals.clear()
+
+def _unpickle_literal(cls, predicate, args):
+    return intern_literal(cls(predicate, args))
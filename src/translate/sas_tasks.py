@@ -1,7 +1,13 @@
-from typing import List, Tuple
+from array import array
+from itertools import compress, repeat
+from typing import Iterable, List, Tuple
 
 SAS_FILE_VERSION = 3
 
+# Number of operators or axioms that are serialized into one string
+# before it is written to the output stream.
+OUTPUT_CHUNK_SIZE = 10000
+
 DEBUG = False
 
 VarValPair = Tuple[int, int]
@@ -19,15 +25,15 @@ class SASTask:
                  mutexes: List["SASMutexGroup"],
                  init: "SASInit",
                  goal: "SASGoal",
-                 operators: List["SASOperator"],
+                 operators: Iterable["SASOperator"],
                  axioms: List["SASAxiom"],
                  metric: bool) -> None:
         self.variables = variables
         self.mutexes = mutexes
         self.init = init
         self.goal = goal
-        self.operators = sorted(operators, key=lambda op: (
-            op.name, op.prevail, op.pre_post))
+        self.operators = SASOperatorTable(sorted(operators, key=lambda op: (
+            op.name, op.prevail, op.pre_post)))
         self.axioms = sorted(axioms, key=lambda axiom: (
             axiom.condition, axiom.effect))
         self.metric = metric
@@ -59,8 +65,7 @@ class SASTask:
             mutex.validate(self.variables)
         self.init.validate(self.variables)
         self.goal.validate(self.variables)
-        for op in self.operators:
-            op.validate(self.variables)
+        self.operators.validate(self.variables)
         for axiom in self.axioms:
             axiom.validate(self.variables, self.init)
         assert self.metric is False or self.metric is True, self.metric
@@ -85,24 +90,30 @@ class SASTask:
         print("metric: %s" % self.metric)
 
     def output(self, stream):
-        print("begin_version", file=stream)
-        print(SAS_FILE_VERSION, file=stream)
-        print("end_version", file=stream)
-        print("begin_metric", file=stream)
-        print(int(self.metric), file=stream)
-        print("end_metric", file=stream)
+        # Each part of the task is serialized into a string with
+        # str.join, and the strings for the operators and axioms are
+        # written in chunks, so the output is streamed without holding
+        # the whole file in memory.
+        stream.write("begin_version\n%d\nend_version\n"
+                     "begin_metric\n%d\nend_metric\n" % (
+                         SAS_FILE_VERSION, int(self.metric)))
         self.variables.output(stream)
-        print(len(self.mutexes), file=stream)
-        for mutex in self.mutexes:
-            mutex.output(stream)
+        self._output_chunked(stream, self.mutexes)
         self.init.output(stream)
         self.goal.output(stream)
-        print(len(self.operators), file=stream)
-        for op in self.operators:
-            op.output(stream)
-        print(len(self.axioms), file=stream)
-        for axiom in self.axioms:
-            axiom.output(stream)
+        stream.write("%d\n" % len(self.operators))
+        for start in range(0, len(self.operators), OUTPUT_CHUNK_SIZE):
+            stream.write(self.operators.get_output(
+                start, min(start + OUTPUT_CHUNK_SIZE, len(self.operators))))
+        self._output_chunked(stream, self.axioms)
+
+    @staticmethod
+    def _output_chunked(stream, parts):
+        stream.write("%d\n" % len(parts))
+        for start in range(0, len(parts), OUTPUT_CHUNK_SIZE):
+            stream.write("".join([
+                part.get_output()
+                for part in parts[start:start + OUTPUT_CHUNK_SIZE]]))
 
     def get_encoding_size(self):
         task_size = 0
@@ -110,8 +121,7 @@ class SASTask:
         for mutex in self.mutexes:
             task_size += mutex.get_encoding_size()
         task_size += self.goal.get_encoding_size()
-        for op in self.operators:
-            task_size += op.get_encoding_size()
+        task_size += self.operators.get_encoding_size()
         for axiom in self.axioms:
             task_size += axiom.get_encoding_size()
         return task_size
@@ -166,17 +176,16 @@ class SASVariables:
             print("v%d in {%s}%s" % (var, list(range(rang)), axiom_str))
 
     def output(self, stream):
-        print(len(self.ranges), file=stream)
+        lines = [str(len(self.ranges))]
         for var, (rang, axiom_layer, values) in enumerate(zip(
                 self.ranges, self.axiom_layers, self.value_names)):
-            print("begin_variable", file=stream)
-            print("var%d" % var, file=stream)
-            print(axiom_layer, file=stream)
-            print(rang, file=stream)
             assert rang == len(values), (rang, values)
-            for value in values:
-                print(value, file=stream)
-            print("end_variable", file=stream)
+            lines.append("begin_variable\nvar%d\n%d\n%d" % (
+                var, axiom_layer, rang))
+            lines.extend(values)
+            lines.append("end_variable")
+        lines.append("")
+        stream.write("\n".join(lines))
 
     def get_encoding_size(self):
         # A variable with range k has encoding size k + 1 to also give the
@@ -200,11 +209,12 @@ class SASMutexGroup:
             print("v%d: %d" % (var, val))
 
     def output(self, stream):
-        print("begin_mutex_group", file=stream)
-        print(len(self.facts), file=stream)
-        for var, val in self.facts:
-            print(var, val, file=stream)
-        print("end_mutex_group", file=stream)
+        stream.write(self.get_output())
+
+    def get_output(self):
+        return "begin_mutex_group\n%d\n%send_mutex_group\n" % (
+            len(self.facts),
+            "".join(["%d %d\n" % (var, val) for var, val in self.facts]))
 
     def get_encoding_size(self):
         return len(self.facts)
@@ -230,10 +240,8 @@ class SASInit:
             print("v%d: %d" % (var, val))
 
     def output(self, stream):
-        print("begin_state", file=stream)
-        for val in self.values:
-            print(val, file=stream)
-        print("end_state", file=stream)
+        stream.write("begin_state\n%send_state\n" % "".join(
+            ["%d\n" % val for val in self.values]))
 
 
 class SASGoal:
@@ -250,11 +258,9 @@ class SASGoal:
             print("v%d: %d" % (var, val))
 
     def output(self, stream):
-        print("begin_goal", file=stream)
-        print(len(self.pairs), file=stream)
-        for var, val in self.pairs:
-            print(var, val, file=stream)
-        print("end_goal", file=stream)
+        stream.write("begin_goal\n%d\n%send_goal\n" % (
+            len(self.pairs),
+            "".join(["%d %d\n" % (var, val) for var, val in self.pairs])))
 
     def get_encoding_size(self):
         return len(self.pairs)
@@ -368,19 +374,19 @@ class SASOperator:
             print("  v%d: %d -> %d%s" % (var, pre, post, cond_str))
 
     def output(self, stream):
-        print("begin_operator", file=stream)
-        print(self.name[1:-1], file=stream)
-        print(len(self.prevail), file=stream)
-        for var, val in self.prevail:
-            print(var, val, file=stream)
-        print(len(self.pre_post), file=stream)
+        stream.write(self.get_output())
+
+    def get_output(self):
+        lines = ["begin_operator", self.name[1:-1], str(len(self.prevail))]
+        lines.extend(["%d %d" % (var, val) for var, val in self.prevail])
+        lines.append(str(len(self.pre_post)))
         for var, pre, post, cond in self.pre_post:
-            print(len(cond), end=' ', file=stream)
-            for cvar, cval in cond:
-                print(cvar, cval, end=' ', file=stream)
-            print(var, pre, post, file=stream)
-        print(self.cost, file=stream)
-        print("end_operator", file=stream)
+            lines.append("%d %s%d %d %d" % (
+                len(cond), "".join(["%d %d " % (cvar, cval) for cvar, cval in cond]),
+                var, pre, post))
+        lines.append(str(self.cost))
+        lines.append("end_operator\n")
+        return "\n".join(lines)
 
     def get_encoding_size(self):
         size = 1 + len(self.prevail)
@@ -408,6 +414,243 @@ class SASOperator:
         return sorted(conditions.items())
 
 
+class SASOperatorTable:
+    """Operators stored column-wise in flat integer arrays.
+
+    The prevail conditions of operator i are the pairs
+    (prevail_vars[j], prevail_values[j]) for j in
+    range(prevail_start[i], prevail_start[i + 1]), and likewise for
+    its pre_post entries (effect_start) and for the conditions of
+    effect j (condition_start). This is much more compact than one
+    SASOperator object per operator, whose conditions are lists of
+    tuples.
+
+    Indexing and iterating create SASOperator objects on the fly.
+    Their prevail and pre_post lists are taken over as they are
+    stored, so they are not sorted again."""
+
+    def __init__(self, operators=()):
+        self.names = []
+        self.costs = array("q")
+        self.prevail_start = array("i", [0])
+        self.prevail_vars = array("i")
+        self.prevail_values = array("i")
+        self.effect_start = array("i", [0])
+        self.effect_vars = array("i")
+        self.effect_pres = array("i")
+        self.effect_posts = array("i")
+        self.condition_start = array("i", [0])
+        self.condition_vars = array("i")
+        self.condition_values = array("i")
+        for op in operators:
+            self.append(op.name, op.prevail, op.pre_post, op.cost)
+
+    def append(self, name, prevail, pre_post, cost):
+        self.names.append(name)
+        self.costs.append(cost)
+        for var, val in prevail:
+            self.prevail_vars.append(var)
+            self.prevail_values.append(val)
+        self.prevail_start.append(len(self.prevail_vars))
+        for var, pre, post, cond in pre_post:
+            self.effect_vars.append(var)
+            self.effect_pres.append(pre)
+            self.effect_posts.append(post)
+            for cvar, cval in cond:
+                self.condition_vars.append(cvar)
+                self.condition_values.append(cval)
+            self.condition_start.append(len(self.condition_vars))
+        self.effect_start.append(len(self.effect_vars))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, op_no):
+        if op_no < 0:
+            op_no += len(self.names)
+        if not 0 <= op_no < len(self.names):
+            raise IndexError("operator index out of range")
+        prevail_vars = self.prevail_vars
+        prevail_values = self.prevail_values
+        condition_start = self.condition_start
+        condition_vars = self.condition_vars
+        condition_values = self.condition_values
+        prevail = [(prevail_vars[i], prevail_values[i]) for i in range(
+            self.prevail_start[op_no], self.prevail_start[op_no + 1])]
+        pre_post = []
+        for eff_no in range(self.effect_start[op_no],
+                            self.effect_start[op_no + 1]):
+            cond = [(condition_vars[i], condition_values[i]) for i in range(
+                condition_start[eff_no], condition_start[eff_no + 1])]
+            pre_post.append((self.effect_vars[eff_no], self.effect_pres[eff_no],
+                             self.effect_posts[eff_no], cond))
+        op = SASOperator.__new__(SASOperator)
+        op.name = self.names[op_no]
+        op.prevail = prevail
+        op.pre_post = pre_post
+        op.cost = self.costs[op_no]
+        return op
+
+    def __iter__(self):
+        for op_no in range(len(self.names)):
+            yield self[op_no]
+
+    def validate(self, variables):
+        """Validate all operators. See SASOperator.validate for the
+        conditions that are checked."""
+        ranges = variables.ranges
+        axiom_layers = variables.axiom_layers
+        assert len(self.costs) == len(self.names)
+        for values, var_nos in [
+                (self.prevail_values, self.prevail_vars),
+                (self.effect_posts, self.effect_vars),
+                (self.condition_values, self.condition_vars)]:
+            assert len(values) == len(var_nos)
+            for var, val in zip(var_nos, values):
+                assert 0 <= var < len(ranges)
+                assert 0 <= val < ranges[var]
+        for var, pre in zip(self.effect_vars, self.effect_pres):
+            assert pre == -1 or 0 <= pre < ranges[var]
+            assert axiom_layers[var] == -1
+        for op_no in range(len(self.names)):
+            prevail_vars = self.prevail_vars[
+                self.prevail_start[op_no]:self.prevail_start[op_no + 1]]
+            self._validate_condition_vars(prevail_vars)
+            effect_begin = self.effect_start[op_no]
+            effect_end = self.effect_start[op_no + 1]
+            assert effect_begin < effect_end
+            pre_values = {}
+            last_entry = None
+            for eff_no in range(effect_begin, effect_end):
+                var = self.effect_vars[eff_no]
+                pre = self.effect_pres[eff_no]
+                assert var not in prevail_vars
+                assert pre_values.setdefault(var, pre) == pre
+                cond_begin = self.condition_start[eff_no]
+                cond_end = self.condition_start[eff_no + 1]
+                self._validate_condition_vars(
+                    self.condition_vars[cond_begin:cond_end])
+                entry = (var, pre, self.effect_posts[eff_no],
+                         tuple(zip(self.condition_vars[cond_begin:cond_end],
+                                   self.condition_values[cond_begin:cond_end])))
+                assert last_entry is None or last_entry < entry
+                last_entry = entry
+            for cvar in self.condition_vars[
+                    self.condition_start[effect_begin]:
+                    self.condition_start[effect_end]]:
+                assert pre_values.get(cvar, -1) == -1
+                assert cvar not in prevail_vars
+        for cost in self.costs:
+            assert cost >= 0
+
+    @staticmethod
+    def _validate_condition_vars(var_nos):
+        for i in range(1, len(var_nos)):
+            assert var_nos[i - 1] < var_nos[i]
+
+    def get_encoding_size(self):
+        # Sum of SASOperator.get_encoding_size over all operators.
+        return (len(self.names) + len(self.prevail_vars) +
+                len(self.effect_vars) + len(self.condition_vars) +
+                len(self.effect_pres) - self.effect_pres.count(-1))
+
+    def rename_variables(self, new_var_nos):
+        """Return a new table where each variable var is renamed to
+        new_var_nos[var]. Conditions and effects on variables mapped
+        to None are removed, as are operators without effects. As in
+        VariableOrder, conditions are not sorted again."""
+        num_ops = len(self.names)
+        effect_vars = [new_var_nos[var] for var in self.effect_vars]
+        keep_effect = [var is not None for var in effect_vars]
+        keep_op = [any(keep_effect[self.effect_start[op_no]:
+                                   self.effect_start[op_no + 1]])
+                   for op_no in range(num_ops)]
+        prevail_vars = [new_var_nos[var] for var in self.prevail_vars]
+        keep_prevail = [
+            var is not None and keep
+            for var, keep in zip(prevail_vars, self._repeat(
+                keep_op, self.prevail_start))]
+        condition_vars = [new_var_nos[var] for var in self.condition_vars]
+        keep_condition = [
+            var is not None and keep
+            for var, keep in zip(condition_vars, self._repeat(
+                keep_effect, self.condition_start))]
+
+        result = SASOperatorTable()
+        result.names = list(compress(self.names, keep_op))
+        result.costs = array("q", compress(self.costs, keep_op))
+        result.prevail_vars = array("i", compress(prevail_vars, keep_prevail))
+        result.prevail_values = array(
+            "i", compress(self.prevail_values, keep_prevail))
+        result.prevail_start = self._get_new_start(
+            self.prevail_start, keep_prevail, keep_op)
+        result.effect_vars = array("i", compress(effect_vars, keep_effect))
+        result.effect_pres = array("i", compress(self.effect_pres, keep_effect))
+        result.effect_posts = array(
+            "i", compress(self.effect_posts, keep_effect))
+        result.effect_start = self._get_new_start(
+            self.effect_start, keep_effect, keep_op)
+        result.condition_vars = array(
+            "i", compress(condition_vars, keep_condition))
+        result.condition_values = array(
+            "i", compress(self.condition_values, keep_condition))
+        result.condition_start = self._get_new_start(
+            self.condition_start, keep_condition, keep_effect)
+        return result
+
+    @staticmethod
+    def _repeat(values, start):
+        # Repeat the i-th value as often as there are entries in
+        # range(start[i], start[i + 1]).
+        for value, begin, end in zip(values, start, start[1:]):
+            yield from repeat(value, end - begin)
+
+    @staticmethod
+    def _get_new_start(start, keep_entry, keep_group):
+        # Offset table after removing the entries and groups of entries
+        # that are not kept.
+        new_start = array("i", [0])
+        num_kept = 0
+        for begin, end, keep in zip(start, start[1:], keep_group):
+            if keep:
+                num_kept += sum(keep_entry[begin:end])
+                new_start.append(num_kept)
+        return new_start
+
+    def get_output(self, begin, end):
+        """Return the output of the operators with indices in
+        range(begin, end) in the format of SASOperator.get_output."""
+        lines = []
+        prevail_start = self.prevail_start
+        effect_start = self.effect_start
+        condition_start = self.condition_start
+        prevail = ["%d %d" % pair for pair in zip(
+            self.prevail_vars[prevail_start[begin]:prevail_start[end]],
+            self.prevail_values[prevail_start[begin]:prevail_start[end]])]
+        prevail_offset = prevail_start[begin]
+        for op_no in range(begin, end):
+            lines.append("begin_operator")
+            lines.append(self.names[op_no][1:-1])
+            prevail_begin = prevail_start[op_no] - prevail_offset
+            prevail_end = prevail_start[op_no + 1] - prevail_offset
+            lines.append(str(prevail_end - prevail_begin))
+            lines.extend(prevail[prevail_begin:prevail_end])
+            lines.append(str(effect_start[op_no + 1] - effect_start[op_no]))
+            for eff_no in range(effect_start[op_no], effect_start[op_no + 1]):
+                cond_begin = condition_start[eff_no]
+                cond_end = condition_start[eff_no + 1]
+                lines.append("%d %s%d %d %d" % (
+                    cond_end - cond_begin,
+                    "".join(["%d %d " % pair for pair in zip(
+                        self.condition_vars[cond_begin:cond_end],
+                        self.condition_values[cond_begin:cond_end])]),
+                    self.effect_vars[eff_no], self.effect_pres[eff_no],
+                    self.effect_posts[eff_no]))
+            lines.append(str(self.costs[op_no]))
+            lines.append("end_operator")
+        lines.append("")
+        return "\n".join(lines)
+
 class SASAxiom:
     def __init__(self, condition: List[VarValPair], effect: VarValPair) -> None:
         self.condition = sorted(condition)
@@ -476,13 +719,14 @@ class SASAxiom:
         print("  v%d: %d" % (var, val))
 
     def output(self, stream):
-        print("begin_rule", file=stream)
-        print(len(self.condition), file=stream)
-        for var, val in self.condition:
-            print(var, val, file=stream)
+        stream.write(self.get_output())
+
+    def get_output(self):
         var, val = self.effect
-        print(var, 1 - val, val, file=stream)
-        print("end_rule", file=stream)
+        return "begin_rule\n%d\n%s%d %d %d\nend_rule\n" % (
+            len(self.condition),
+            "".join(["%d %d\n" % (cvar, cval) for cvar, cval in self.condition]),
+            var, 1 - val, val)
 
     def get_encoding_size(self):
         return 1 + len(self.condition)
@@ -1,7 +1,8 @@
 """Tarjan's algorithm for maximal strongly connected components.
 
-We provide two versions of the algorithm for different graph
-representations.
+We provide three versions of the algorithm for different graph
+representations. They all use the same implementation on successor
+arrays.
 
 Since the original recursive version exceeds python's maximal
 recursion depth on some planning instances, this is an iterative
@@ -12,9 +13,11 @@ necessarily acyclic. The SCCs returned by the algorithm are in a
 topological sort order with respect to this derived DAG.
 """
 
-from collections import defaultdict
+from array import array
+from itertools import accumulate, chain
 
-__all__ = ["get_sccs_adjacency_list", "get_sccs_adjacency_dict"]
+__all__ = ["get_sccs_adjacency_list", "get_sccs_adjacency_dict",
+           "get_sccs_successor_arrays"]
 
 
 def get_sccs_adjacency_list(adjacency_list):
@@ -30,7 +33,22 @@ def get_sccs_adjacency_list(adjacency_list):
     Returns a list of lists that defines a partition of {0, ..., N-1},
     where each block in the partition is an SCC of the graph, and
     the partition is given in a topologically sort order."""
-    return StronglyConnectedComponentComputation(adjacency_list).get_result()
+    start = array("i", [0])
+    start.extend(accumulate(len(successors) for successors in adjacency_list))
+    successors = array("i", chain.from_iterable(adjacency_list))
+    return get_sccs_successor_arrays(start, successors)
+
+def get_sccs_successor_arrays(start, successors):
+    """Compute SCCs for a graph represented by successor arrays.
+
+    The graph nodes are {0, ..., N-1}, where N is `len(start) - 1`.
+    The successors of node `u` are `successors[start[u]:start[u + 1]]`.
+
+    Returns a list of lists that defines a partition of {0, ..., N-1},
+    where each block in the partition is an SCC of the graph, and
+    the partition is given in a topologically sort order."""
+    return StronglyConnectedComponentComputation(
+        start, successors).get_result()
 
 def get_sccs_adjacency_dict(adjacency_dict):
     """Compute SCCs for a graph represented as an adjacency dict.
@@ -66,58 +84,68 @@ def get_sccs_adjacency_dict(adjacency_dict):
 
 
 class StronglyConnectedComponentComputation:
-    def __init__(self, unweighted_graph):
-        self.graph = unweighted_graph
-        self.BEGIN, self.CONTINUE, self.RETURN = 0, 1, 2 # "recursion" handling
+    def __init__(self, start, successors):
+        self.start = start
+        self.successors = successors
 
     def get_result(self):
-        self.indices = dict()
-        self.lowlinks = defaultdict(lambda: -1)
-        self.stack_indices = dict()
+        num_nodes = len(self.start) - 1
+        # Node indices start at 1, so that 0 marks unvisited nodes.
+        self.indices = array("i", [0]) * num_nodes
+        self.lowlinks = array("i", [0]) * num_nodes
+        # Position of each node on the stack, or -1 if it is not on it.
+        self.stack_indices = array("i", [-1]) * num_nodes
         self.current_index = 0
         self.stack = []
         self.sccs = []
 
-        for i in range(len(self.graph)):
-            if i not in self.indices:
+        for i in range(num_nodes):
+            if not self.indices[i]:
                 self.visit(i)
         self.sccs.reverse()
         return self.sccs
 
     def visit(self, vertex):
-        iter_stack = [(vertex, None, None, self.BEGIN)]
+        # The entries of iter_stack are pairs (v, pos), where pos is the
+        # position of the next successor of v to consider in
+        # self.successors. The successor that is currently being
+        # visited is the one at pos - 1.
+        start = self.start
+        successors = self.successors
+        indices = self.indices
+        lowlinks = self.lowlinks
+        stack_indices = self.stack_indices
+        stack = self.stack
+
+        def begin(v):
+            self.current_index += 1
+            indices[v] = lowlinks[v] = self.current_index
+            stack_indices[v] = len(stack)
+            stack.append(v)
+            iter_stack.append((v, start[v]))
+
+        iter_stack = []
+        begin(vertex)
         while iter_stack:
-            v, w, succ_index, state = iter_stack.pop()
-
-            if state == self.BEGIN:
-                self.current_index += 1
-                self.indices[v] = self.current_index
-                self.lowlinks[v] = self.current_index
-                self.stack_indices[v] = len(self.stack)
-                self.stack.append(v)
-
-                iter_stack.append((v, None, 0, self.CONTINUE))
-            elif state == self.CONTINUE:
-                successors = self.graph[v]
-                if succ_index == len(successors):
-                    if self.lowlinks[v] == self.indices[v]:
-                        stack_index = self.stack_indices[v]
-                        scc = self.stack[stack_index:]
-                        del self.stack[stack_index:]
-                        for n in scc:
-                            del self.stack_indices[n]
-                        self.sccs.append(scc)
-                else:
-                    w = successors[succ_index]
-                    if w not in self.indices:
-                        iter_stack.append((v, w, succ_index, self.RETURN))
-                        iter_stack.append((w, None, None, self.BEGIN))
-                    else:
-                        if w in self.stack_indices:
-                            self.lowlinks[v] = min(self.lowlinks[v],
-                                                   self.indices[w])
-                        iter_stack.append(
-                            (v, None, succ_index + 1, self.CONTINUE))
-            elif state == self.RETURN:
-                self.lowlinks[v] = min(self.lowlinks[v], self.lowlinks[w])
-                iter_stack.append((v, None, succ_index + 1, self.CONTINUE))
+            v, pos = iter_stack.pop()
+            if pos > start[v]:
+                # Returning from the successor at pos - 1.
+                w = successors[pos - 1]
+                lowlinks[v] = min(lowlinks[v], lowlinks[w])
+            while pos < start[v + 1]:
+                w = successors[pos]
+                pos += 1
+                if not indices[w]:
+                    iter_stack.append((v, pos))
+                    begin(w)
+                    break
+                elif stack_indices[w] != -1:
+                    lowlinks[v] = min(lowlinks[v], indices[w])
+            else:
+                if lowlinks[v] == indices[v]:
+                    stack_index = stack_indices[v]
+                    scc = stack[stack_index:]
+                    del stack[stack_index:]
+                    for n in scc:
+                        stack_indices[n] = -1
+                    self.sccs.append(scc)
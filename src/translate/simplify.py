@@ -43,9 +43,15 @@ class DomainTransitionGraph:
     Attributes:
     - init (int): the initial state value of the DTG variable
     - size (int): the number of values in the domain
-    - arcs (defaultdict: int -> set(int)): the DTG arcs (unlabeled)
+    - arcs (defaultdict: int -> defaultdict(int -> int)): the DTG arcs
+      (unlabeled), mapped to the number of transitions inducing them
+    - wildcard_arcs (defaultdict: int -> int): values that can be
+      reached from every other value, mapped to the number of
+      transitions inducing such arcs
 
-    There are no transition labels or goal values.
+    There are no transition labels or goal values. Arcs are counted so
+    that they can be removed again when the transitions inducing them
+    turn out to be impossible.
 
     The intention is that nodes are represented as ints in {1, ...,
     domain_size}, but this is not enforced.
@@ -59,24 +65,52 @@ class DomainTransitionGraph:
         """Create a DTG with no arcs."""
         self.init = init
         self.size = size
-        self.arcs = defaultdict(set)
+        self.arcs = defaultdict(lambda: defaultdict(int))
+        self.wildcard_arcs = defaultdict(int)
 
     def add_arc(self, u, v):
-        """Add an arc from u to v."""
-        self.arcs[u].add(v)
+        """Add an arc from u to v. If u is -1, add arcs from every value
+        other than v."""
+        if u == -1:
+            self.wildcard_arcs[v] += 1
+        else:
+            self.arcs[u][v] += 1
 
-    def reachable(self):
+    def remove_arc(self, u, v):
+        """Remove an arc added with add_arc(u, v)."""
+        if u == -1:
+            arcs = self.wildcard_arcs
+        else:
+            arcs = self.arcs[u]
+        arcs[v] -= 1
+        if not arcs[v]:
+            del arcs[v]
+
+    def reachable_bits(self):
         """Return the values reachable from the initial value.
-        Represented as a set(int)."""
-        queue = [self.init]
-        reachable = set(queue)
+        Represented as an int whose bit i is set iff value i is
+        reachable."""
+        reachable = 1 << self.init
+        # The initial value differs from all other values, so every
+        # wildcard arc can be used right away.
+        for value in self.wildcard_arcs:
+            reachable |= 1 << value
+        successors = {
+            source: sum(1 << destination for destination in destinations)
+            for source, destinations in self.arcs.items() if destinations}
+        queue = get_values(reachable)
         while queue:
-            node = queue.pop()
-            new_neighbors = self.arcs.get(node, set()) - reachable
-            reachable |= new_neighbors
-            queue.extend(new_neighbors)
+            new_neighbors = successors.get(queue.pop(), 0) & ~reachable
+            if new_neighbors:
+                reachable |= new_neighbors
+                queue.extend(get_values(new_neighbors))
         return reachable
 
+    def reachable(self):
+        """Return the values reachable from the initial value.
+        Represented as a set(int)."""
+        return set(get_values(self.reachable_bits()))
+
     def dump(self):
         """Dump the DTG."""
         print("DTG size:", self.size)
@@ -85,11 +119,29 @@ class DomainTransitionGraph:
         for source, destinations in sorted(self.arcs.items()):
             for destination in sorted(destinations):
                 print("  %d => %d" % (source, destination))
+        for destination in sorted(self.wildcard_arcs):
+            print("  * => %d" % destination)
+
+
+def get_values(bits):
+    """Return the list of values whose bits are set in bits."""
+    values = []
+    while bits:
+        lowest_bit = bits & -bits
+        values.append(lowest_bit.bit_length() - 1)
+        bits ^= lowest_bit
+    return values
 
 
 def build_dtgs(task):
     """Build DTGs for all variables of the SASTask `task`.
-    Return a list(DomainTransitionGraph), one for each variable.
+    Return a list(DomainTransitionGraph), one for each variable, and
+    the list of transitions induced by operator effects. Each
+    transition is a tuple (var_no, pre, post, conditions), where pre
+    is -1 for transitions from every value other than post, and
+    conditions lists the (var_no, value) pairs that must hold for the
+    transition, i.e., the operator applicability conditions and the
+    effect conditions.
 
     For derived variables, we do not consider the axiom bodies, i.e.,
     we treat each axiom as if it were an operator with no
@@ -103,17 +155,7 @@ def build_dtgs(task):
     sizes = task.variables.ranges
     dtgs = [DomainTransitionGraph(init, size)
             for (init, size) in zip(init_vals, sizes)]
-
-    def add_arc(var_no, pre_spec, post):
-        """Add a DTG arc for var_no induced by transition pre_spec -> post.
-        pre_spec may be -1, in which case arcs from every value
-        other than post are added."""
-        if pre_spec == -1:
-            pre_values = set(range(sizes[var_no])).difference([post])
-        else:
-            pre_values = [pre_spec]
-        for pre in pre_values:
-            dtgs[var_no].add_arc(pre, post)
+    transitions = []
 
     def get_effective_pre(var_no, conditions, effect_conditions):
         """Return combined information on the conditions on `var_no`
@@ -140,17 +182,81 @@ def build_dtgs(task):
                     return None
         return result
 
-    for op in task.operators:
-        conditions = dict(op.get_applicability_conditions())
-        for var_no, _, post, cond in op.pre_post:
+    # We read the operators directly from the columns of the operator
+    # table to avoid creating SASOperator objects.
+    operators = task.operators
+    prevail_start = operators.prevail_start
+    effect_start = operators.effect_start
+    effect_vars = operators.effect_vars
+    effect_pres = operators.effect_pres
+    effect_posts = operators.effect_posts
+    condition_start = operators.condition_start
+    for op_no in range(len(operators)):
+        begin = prevail_start[op_no]
+        end = prevail_start[op_no + 1]
+        conditions = dict(zip(operators.prevail_vars[begin:end],
+                              operators.prevail_values[begin:end]))
+        effects = range(effect_start[op_no], effect_start[op_no + 1])
+        for eff_no in effects:
+            if effect_pres[eff_no] != -1:
+                conditions[effect_vars[eff_no]] = effect_pres[eff_no]
+        condition_pairs = list(conditions.items())
+        for eff_no in effects:
+            var_no = effect_vars[eff_no]
+            post = effect_posts[eff_no]
+            begin = condition_start[eff_no]
+            end = condition_start[eff_no + 1]
+            cond = list(zip(operators.condition_vars[begin:end],
+                            operators.condition_values[begin:end]))
             effective_pre = get_effective_pre(var_no, conditions, cond)
             if effective_pre is not None:
-                add_arc(var_no, effective_pre, post)
+                dtgs[var_no].add_arc(effective_pre, post)
+                transitions.append(
+                    (var_no, effective_pre, post, condition_pairs + cond))
     for axiom in task.axioms:
         var_no, val = axiom.effect
-        add_arc(var_no, -1, val)
+        dtgs[var_no].add_arc(-1, val)
 
-    return dtgs
+    return dtgs, transitions
+
+
+def compute_reachable_values(dtgs, transitions):
+    """Return the values reachable in each DTG as bitsets (see
+    DomainTransitionGraph.reachable_bits).
+
+    Transitions with a condition on a value that is unreachable in its
+    own DTG can never occur. We remove their arcs and recompute the
+    reachable values of the affected DTGs until nothing changes. In
+    each round, we only check the transitions with conditions on
+    variables whose reachable values changed in the previous round."""
+    reachable = [dtg.reachable_bits() for dtg in dtgs]
+    if all(bits == (1 << dtg.size) - 1 for bits, dtg in zip(reachable, dtgs)):
+        # All values are reachable, so no transition can be removed.
+        return reachable
+    transitions_by_var = defaultdict(list)
+    for transition_no, (_, _, _, conditions) in enumerate(transitions):
+        for var_no, _ in conditions:
+            transitions_by_var[var_no].append(transition_no)
+    removed = set()
+    candidates = range(len(transitions))
+    while candidates:
+        affected_vars = set()
+        for transition_no in candidates:
+            if transition_no in removed:
+                continue
+            var_no, pre, post, conditions = transitions[transition_no]
+            if not all(reachable[cond_var_no] >> cond_val & 1
+                       for cond_var_no, cond_val in conditions):
+                removed.add(transition_no)
+                dtgs[var_no].remove_arc(pre, post)
+                affected_vars.add(var_no)
+        candidates = set()
+        for var_no in sorted(affected_vars):
+            new_reachable = dtgs[var_no].reachable_bits()
+            if new_reachable != reachable[var_no]:
+                reachable[var_no] = new_reachable
+                candidates.update(transitions_by_var[var_no])
+    return reachable
 
 
 always_false = object()
@@ -230,7 +336,7 @@ class VarValueRenaming:
         self.apply_to_mutexes(task.mutexes)
         self.apply_to_init(task.init)
         self.apply_to_goals(task.goal.pairs)
-        self.apply_to_operators(task.operators)
+        task.operators = self.apply_to_operators(task.operators)
         self.apply_to_axioms(task.axioms)
 
     def apply_to_variables(self, variables):
@@ -296,7 +402,7 @@ class VarValueRenaming:
             raise TriviallySolvable
 
     def apply_to_operators(self, operators):
-        new_operators = []
+        new_operators = sas_tasks.SASOperatorTable()
         num_removed = 0
         for op in operators:
             new_op = self.translate_operator(op)
@@ -305,9 +411,10 @@ class VarValueRenaming:
                 if DEBUG:
                     print("Removed operator: %s" % op.name)
             else:
-                new_operators.append(new_op)
+                new_operators.append(new_op.name, new_op.prevail,
+                                     new_op.pre_post, new_op.cost)
         print("%d operators removed" % num_removed)
-        operators[:] = new_operators
+        return new_operators
 
     def apply_to_axioms(self, axioms):
         new_axioms = []
@@ -476,10 +583,12 @@ class VarValueRenaming:
                 new_pairs.append((new_var_no, new_value))
         pairs[:] = new_pairs
 
-def build_renaming(dtgs):
+def build_renaming(dtgs, transitions):
     renaming = VarValueRenaming()
-    for dtg in dtgs:
-        renaming.register_variable(dtg.size, dtg.init, dtg.reachable())
+    for dtg, reachable in zip(
+            dtgs, compute_reachable_values(dtgs, transitions)):
+        renaming.register_variable(dtg.size, dtg.init,
+                                   set(get_values(reachable)))
     return renaming
 
 
@@ -509,8 +618,8 @@ def filter_unreachable_propositions(sas_task):
 
     if DEBUG:
         sas_task.validate()
-    dtgs = build_dtgs(sas_task)
-    renaming = build_renaming(dtgs)
+    dtgs, transitions = build_dtgs(sas_task)
+    renaming = build_renaming(dtgs, transitions)
     # apply_to_task may raise Impossible if the goal is detected as
     # unreachable or TriviallySolvable if it has no goal. We let the
     # exceptions propagate to the caller.
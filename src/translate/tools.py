@@ -1,11 +1,23 @@
-def get_peak_memory_in_kb():
+def _get_status_value_in_kb(field, description):
     try:
         # This will only work on Linux systems.
         with open("/proc/self/status") as status_file:
             for line in status_file:
                 parts = line.split()
-                if parts[0] == "VmPeak:":
+                if parts[0] == field:
                     return int(parts[1])
     except OSError:
         pass
-    raise Warning("warning: could not determine peak memory")
+    raise Warning("warning: could not determine %s" % description)
+
+
+def get_peak_memory_in_kb():
+    return _get_status_value_in_kb("VmPeak:", "peak memory")
+
+
+def get_resident_memory_in_kb():
+    return _get_status_value_in_kb("VmRSS:", "resident memory")
+
+
+def get_peak_resident_memory_in_kb():
+    return _get_status_value_in_kb("VmHWM:", "peak resident memory")
@@ -4,7 +4,7 @@
 import os
 import sys
 import traceback
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 VarValPair = Tuple[int, int]
 
@@ -18,19 +18,29 @@ if not python_version_supported():
 from collections import defaultdict
 from copy import deepcopy
 from itertools import product
+import json
 
 import axiom_rules
+import dominated_operators
 import fact_groups
+import grounding_estimate
+import grounding_statistics
+import h2_mutexes
 import instantiate
 import normalize
 import options
+import parallel
 import pddl
 import pddl_parser
+import pddl_to_prolog
+import relation_store
+import relevance
 import sas_tasks
 import signal
 import simplify
 import timers
 import tools
+import translation_cache
 import variable_order
 
 # TODO: The translator may generate trivial derived variables which are always
@@ -50,6 +60,7 @@ DEBUG = False
 ## we only list codes that are used by the translator component of the planner.
 TRANSLATE_OUT_OF_MEMORY = 20
 TRANSLATE_OUT_OF_TIME = 21
+TRANSLATE_TASK_TOO_LARGE = 25
 TRANSLATE_INPUT_ERROR = 31
 
 simplified_effect_condition_counter = 0
@@ -72,10 +83,17 @@ def strips_to_sas_dictionary(groups: List[List[pddl.Atom]],
     return [len(group) + 1 for group in groups], dictionary
 
 
-def translate_strips_conditions_aux(
+def number_of_values(var_vals_pair):
+    var, vals = var_vals_pair
+    return len(vals)
+
+
+def translate_strips_conditions_to_value_sets(
         conditions: List[pddl.Literal],
         dictionary: Dict[pddl.Atom, List[VarValPair]],
-        ranges: List[int]) -> Optional[List[Dict[int, int]]]:
+        ranges: List[int]) -> Optional[Dict[int, Set[int]]]:
+    # Return a dictionary mapping each variable to the set of values
+    # it may take, or None if the conditions are contradictory.
     condition = {}
     for fact in conditions:
         if fact.negated:
@@ -90,10 +108,6 @@ def translate_strips_conditions_aux(
                 return None
             condition[var] = {val}
 
-    def number_of_values(var_vals_pair):
-        var, vals = var_vals_pair
-        return len(vals)
-
     for fact in conditions:
         if fact.negated:
             ## Note: here we use a different solution than in Sec. 10.6.4
@@ -107,8 +121,10 @@ def translate_strips_conditions_aux(
             ## However, here we avoid introducing new derived predicates
             ## by treating the negative precondition as a disjunctive
             ## precondition and expanding it by "multiplying out" the
-            ## possibilities.  This can lead to an exponential blow-up so
-            ## it would be nice to choose the behaviour as an option.
+            ## possibilities. This can lead to an exponential blow-up, so
+            ## for operator preconditions the disjunction can also be
+            ## encoded with a derived variable (see
+            ## NegativeConditionEncoder).
             done = False
             new_condition = {}
             atom = pddl.Atom(fact.predicate, fact.args)  # force positive
@@ -139,23 +155,35 @@ def translate_strips_conditions_aux(
                 var, vals = candidates[0]
                 condition[var] = vals
 
-        def multiply_out(condition):  # destroys the input
-            sorted_conds = sorted(condition.items(), key=number_of_values)
-            flat_conds = [{}]
-            for var, vals in sorted_conds:
-                if len(vals) == 1:
-                    for cond in flat_conds:
-                        cond[var] = vals.pop()  # destroys the input here
-                else:
-                    new_conds = []
-                    for cond in flat_conds:
-                        for val in vals:
-                            new_cond = deepcopy(cond)
-                            new_cond[var] = val
-                            new_conds.append(new_cond)
-                    flat_conds = new_conds
-            return flat_conds
+    return condition
+
 
+def multiply_out(condition):  # destroys the input
+    sorted_conds = sorted(condition.items(), key=number_of_values)
+    flat_conds = [{}]
+    for var, vals in sorted_conds:
+        if len(vals) == 1:
+            for cond in flat_conds:
+                cond[var] = vals.pop()  # destroys the input here
+        else:
+            new_conds = []
+            for cond in flat_conds:
+                for val in vals:
+                    new_cond = deepcopy(cond)
+                    new_cond[var] = val
+                    new_conds.append(new_cond)
+            flat_conds = new_conds
+    return flat_conds
+
+
+def translate_strips_conditions_aux(
+        conditions: List[pddl.Literal],
+        dictionary: Dict[pddl.Atom, List[VarValPair]],
+        ranges: List[int]) -> Optional[List[Dict[int, int]]]:
+    condition = translate_strips_conditions_to_value_sets(
+        conditions, dictionary, ranges)
+    if condition is None:
+        return None
     return multiply_out(condition)
 
 
@@ -169,17 +197,113 @@ def translate_strips_conditions(
         return [{}]  # Quick exit for common case.
 
     # Check if the condition violates any mutexes.
-    if translate_strips_conditions_aux(conditions, mutex_dict,
-                                       mutex_ranges) is None:
+    if translate_strips_conditions_to_value_sets(conditions, mutex_dict,
+                                                 mutex_ranges) is None:
         return None
 
     return translate_strips_conditions_aux(conditions, dictionary, ranges)
 
 
+class NegativeConditionEncoder:
+    """Encode disjunctive operator preconditions "var in vals", which
+    stem from negative conditions on multi-valued variables, with
+    binary derived variables instead of multiplying them out.
+
+    The derived variable for (var, vals) is true (value 0) iff var has
+    one of the values in vals. It has the default value 1 and one
+    axiom per value in vals. Derived variables are numbered from
+    first_var on in the order in which they are requested."""
+
+    def __init__(self, first_var, strategy):
+        self.first_var = first_var
+        self.strategy = strategy
+        self.keys = []
+        self.var_by_key = {}
+        self.encoded_operators = 0
+        self.avoided_operators = 0
+        self.multiplied_out_operators = 0
+        self.added_operators = 0
+
+    def get_variable(self, var, vals):
+        key = (var, frozenset(vals))
+        derived_var = self.var_by_key.get(key)
+        if derived_var is None:
+            derived_var = self.first_var + len(self.keys)
+            self.keys.append(key)
+            self.var_by_key[key] = derived_var
+        return derived_var
+
+    def use_derived_variables(self, operator, condition):
+        disjunctive_vals = [vals for vals in condition.values()
+                            if len(vals) > 1]
+        if not disjunctive_vals or self.strategy == "multiply-out":
+            return False
+        elif self.strategy == "derived":
+            return True
+        # Compare the encoding sizes of the two strategies, where we
+        # estimate the size of each resulting operator by the size of its
+        # condition and effects. A derived variable costs its range plus
+        # one, and each of its axioms costs two. We do not take into
+        # account that derived variables can be shared between operators
+        # to keep the choice independent of the order of the operators.
+        operator_size = (1 + len(condition) + len(operator.add_effects) +
+                         len(operator.del_effects))
+        multiplied_out_size = operator_size
+        derived_size = operator_size
+        for vals in disjunctive_vals:
+            multiplied_out_size *= len(vals)
+            derived_size += 3 + 2 * len(vals)
+        return derived_size < multiplied_out_size
+
+    def translate_precondition(self, operator, dictionary, ranges, mutex_dict,
+                               mutex_ranges):
+        conditions = operator.precondition
+        if not conditions:
+            return [{}]
+        if translate_strips_conditions_to_value_sets(
+                conditions, mutex_dict, mutex_ranges) is None:
+            return None
+        condition = translate_strips_conditions_to_value_sets(
+            conditions, dictionary, ranges)
+        if condition is None:
+            return None
+        num_operators = 1
+        for vals in condition.values():
+            num_operators *= len(vals)
+        if not self.use_derived_variables(operator, condition):
+            if num_operators > 1:
+                self.multiplied_out_operators += 1
+                self.added_operators += num_operators - 1
+            return multiply_out(condition)
+        for var, vals in list(condition.items()):
+            if len(vals) > 1:
+                del condition[var]
+                condition[self.get_variable(var, vals)] = {0}
+        self.encoded_operators += 1
+        self.avoided_operators += num_operators - 1
+        return multiply_out(condition)
+
+    def get_axioms(self):
+        axioms = []
+        for derived_var, (var, vals) in enumerate(self.keys, self.first_var):
+            for val in sorted(vals):
+                axioms.append(sas_tasks.SASAxiom([(var, val)],
+                                                 (derived_var, 0)))
+        return axioms
+
+    def get_value_names(self):
+        value_names = []
+        for derived_var_no in range(len(self.keys)):
+            name = "negated-condition@%d()" % derived_var_no
+            value_names.append(["Atom %s" % name, "NegatedAtom %s" % name])
+        return value_names
+
+
 def translate_strips_operator(operator, dictionary, ranges, mutex_dict,
-                              mutex_ranges, implied_facts):
-    conditions = translate_strips_conditions(operator.precondition, dictionary,
-                                             ranges, mutex_dict, mutex_ranges)
+                              mutex_ranges, implied_facts,
+                              negative_conditions):
+    conditions = negative_conditions.translate_precondition(
+        operator, dictionary, ranges, mutex_dict, mutex_ranges)
     if conditions is None:
         return []
     sas_operators = []
@@ -390,17 +514,127 @@ def translate_strips_axiom(axiom, dictionary, ranges, mutex_dict, mutex_ranges):
     return axioms
 
 
+# If operator_counts is a list, the number of SAS operators created for
+# each action is appended to it. This includes the actions that an
+# ActionStream with yield_failed set reports as None, which create no
+# operators.
 def translate_strips_operators(actions, strips_to_sas, ranges, mutex_dict,
-                               mutex_ranges, implied_facts):
+                               mutex_ranges, implied_facts,
+                               negative_conditions, operator_counts=None):
+    def translate_actions(actions, operator_counts):
+        result = []
+        for action in actions:
+            if action is None:
+                sas_ops = []
+            else:
+                sas_ops = translate_strips_operator(
+                    action, strips_to_sas, ranges, mutex_dict, mutex_ranges,
+                    implied_facts, negative_conditions)
+            result.extend(sas_ops)
+            if operator_counts is not None:
+                operator_counts.append(len(sas_ops))
+        return result
+
+    if not parallel.can_fork(options.jobs):
+        return translate_actions(actions, operator_counts)
+
+    streaming = isinstance(actions, instantiate.ActionStream)
+
+    def translate_actions_in_worker(chunk):
+        # Changes to the counters and to the derived variables for
+        # negative conditions are lost when the worker process exits, so
+        # we report them back to the parent process.
+        old_simplified = simplified_effect_condition_counter
+        old_added = added_implied_precondition_counter
+        if operator_counts is None:
+            counts = None
+        else:
+            counts = []
+        if streaming:
+            actions.start_chunk()
+            result = translate_actions(actions.instantiate(chunk), counts)
+            stream_results = actions.get_chunk_results()
+        else:
+            result = translate_actions(chunk, counts)
+            stream_results = None
+        return (result, counts, stream_results,
+                simplified_effect_condition_counter - old_simplified,
+                added_implied_precondition_counter - old_added,
+                negative_conditions.keys,
+                negative_conditions.encoded_operators,
+                negative_conditions.avoided_operators,
+                negative_conditions.multiplied_out_operators,
+                negative_conditions.added_operators)
+
+    global simplified_effect_condition_counter
+    global added_implied_precondition_counter
     result = []
-    for action in actions:
-        sas_ops = translate_strips_operator(action, strips_to_sas, ranges,
-                                            mutex_dict, mutex_ranges,
-                                            implied_facts)
+    if streaming:
+        items = actions.action_atoms
+    else:
+        items = actions
+    for (sas_ops, counts, stream_results, simplified, added, keys, encoded,
+         avoided, multiplied_out, added_ops) in parallel.map_chunks(
+             translate_actions_in_worker, items, options.jobs):
+        if operator_counts is not None:
+            operator_counts.extend(counts)
+        if streaming:
+            actions.add_chunk_results(stream_results)
+        # Each worker numbers its derived variables from first_var on.
+        # Renumbering them in the order of the chunks gives the same
+        # numbers as translating all actions in the parent process.
+        renaming = {}
+        for local_var, (var, vals) in enumerate(
+                keys, negative_conditions.first_var):
+            renaming[local_var] = negative_conditions.get_variable(var, vals)
+        for op in sas_ops:
+            op.prevail = sorted((renaming.get(var, var), val)
+                                for var, val in op.prevail)
         result.extend(sas_ops)
+        simplified_effect_condition_counter += simplified
+        added_implied_precondition_counter += added
+        negative_conditions.encoded_operators += encoded
+        negative_conditions.avoided_operators += avoided
+        negative_conditions.multiplied_out_operators += multiplied_out
+        negative_conditions.added_operators += added_ops
     return result
 
 
+def translate_operators_with_cache(cache, actions, strips_to_sas, ranges,
+                                   mutex_dict, mutex_ranges, implied_facts,
+                                   negative_conditions):
+    """Take the translation of the actions (an ActionStream) from the
+    cache if possible, and otherwise translate them and store the result
+    in the cache. Return the SAS operators and the derived atoms in
+    operator conditions."""
+    global simplified_effect_condition_counter
+    global added_implied_precondition_counter
+    cached = cache.get_operators(actions)
+    if cached is not None:
+        (operators, derived_condition_atoms, simplified, added,
+         negative_condition_counts) = cached
+        simplified_effect_condition_counter += simplified
+        added_implied_precondition_counter += added
+        (negative_conditions.encoded_operators,
+         negative_conditions.avoided_operators,
+         negative_conditions.multiplied_out_operators,
+         negative_conditions.added_operators) = negative_condition_counts
+        return operators, derived_condition_atoms
+
+    old_simplified = simplified_effect_condition_counter
+    old_added = added_implied_precondition_counter
+    operator_counts = []
+    actions.yield_failed = True
+    operators = translate_strips_operators(
+        actions, strips_to_sas, ranges, mutex_dict, mutex_ranges,
+        implied_facts, negative_conditions, operator_counts)
+    cache.set_operators(
+        actions, operator_counts, operators, actions.derived_condition_atoms,
+        simplified_effect_condition_counter - old_simplified,
+        added_implied_precondition_counter - old_added, negative_conditions)
+    return operators, actions.derived_condition_atoms
+
+
 def translate_strips_axioms(axioms, strips_to_sas, ranges, mutex_dict,
                             mutex_ranges):
     result = []
@@ -453,15 +687,24 @@ def translate_task(
         mutex_key: List[List[VarValPair]],
         init: List[Union[pddl.Atom, pddl.Assign]],
         goals: List[pddl.Literal],
-        actions: List[pddl.PropositionalAction],
+        actions: Union[List[pddl.PropositionalAction],
+                       instantiate.ActionStream],
         axioms: List[pddl.PropositionalAxiom],
         metric: bool,
-        implied_facts: Dict[VarValPair, List[VarValPair]]) -> sas_tasks.SASTask:
-    with timers.timing("Processing axioms", block=True):
-        axioms, axiom_layer_dict = axiom_rules.handle_axioms(actions, axioms, goals,
-                                                             options.layer_strategy)
-
-    if options.dump_task:
+        implied_facts: Dict[VarValPair, List[VarValPair]],
+        # cache for the translated operators (requires an ActionStream)
+        cache: Optional[translation_cache.TranslationCache] = None
+        ) -> sas_tasks.SASTask:
+    # With an ActionStream, the actions are only instantiated while they
+    # are translated, so the axioms can only be processed afterwards.
+    streaming = isinstance(actions, instantiate.ActionStream)
+    if not streaming:
+        with timers.timing("Processing axioms", block=True):
+            axioms, axiom_layer_dict = axiom_rules.handle_axioms(
+                axiom_rules.get_operator_condition_atoms(actions), axioms,
+                goals, options.layer_strategy)
+
+    if options.dump_task and not streaming:
         # Remove init facts that don't occur in strips_to_sas: they're constant.
         nonconstant_init = filter(strips_to_sas.get, init)
         dump_task(nonconstant_init, goals, actions, axioms, axiom_layer_dict)
@@ -496,9 +739,23 @@ def translate_task(
         return solvable_sas_task("Empty goal")
     goal = sas_tasks.SASGoal(goal_pairs)
 
-    operators = translate_strips_operators(actions, strips_to_sas, ranges,
-                                           mutex_dict, mutex_ranges,
-                                           implied_facts)
+    negative_conditions = NegativeConditionEncoder(
+        len(ranges), options.negative_conditions)
+    if cache is not None:
+        operators, derived_condition_atoms = translate_operators_with_cache(
+            cache, actions, strips_to_sas, ranges, mutex_dict, mutex_ranges,
+            implied_facts, negative_conditions)
+    else:
+        operators = translate_strips_operators(
+            actions, strips_to_sas, ranges, mutex_dict, mutex_ranges,
+            implied_facts, negative_conditions)
+        if streaming:
+            derived_condition_atoms = actions.derived_condition_atoms
+    if streaming:
+        with timers.timing("Processing axioms", block=True):
+            axioms, axiom_layer_dict = axiom_rules.handle_axioms(
+                derived_condition_atoms, axioms, goals,
+                options.layer_strategy)
     axioms = translate_strips_axioms(axioms, strips_to_sas, ranges, mutex_dict,
                                      mutex_ranges)
 
@@ -507,6 +764,23 @@ def translate_task(
         assert layer >= 0
         [(var, val)] = strips_to_sas[atom]
         axiom_layers[var] = layer
+
+    # The derived variables for negative conditions only depend on
+    # non-derived variables, so they can go to the lowest layer.
+    num_derived = len(negative_conditions.keys)
+    ranges = ranges + [2] * num_derived
+    axiom_layers += [0] * num_derived
+    translation_key = translation_key + negative_conditions.get_value_names()
+    init.values += [1] * num_derived
+    axioms += negative_conditions.get_axioms()
+    print("%d operators with negative conditions multiplied out "
+          "(%d operators added)" % (negative_conditions.multiplied_out_operators,
+                                    negative_conditions.added_operators))
+    print("%d operators with negative conditions encoded by derived variables "
+          "(%d operators avoided)" % (negative_conditions.encoded_operators,
+                                      negative_conditions.avoided_operators))
+    print("%d derived variables for negative conditions" % num_derived)
+
     variables = sas_tasks.SASVariables(ranges, axiom_layers, translation_key)
     mutexes = [sas_tasks.SASMutexGroup(group) for group in mutex_key]
     return sas_tasks.SASTask(variables, mutexes, init, goal,
@@ -542,14 +816,56 @@ def unsolvable_sas_task(msg):
     return trivial_task(solvable=False)
 
 def pddl_to_sas(task):
-    with timers.timing("Instantiating", block=True):
-        (relaxed_reachable, atoms, actions, goal_list, axioms,
-         reachable_action_params) = instantiate.explore(task)
+    try:
+        return _pddl_to_sas(task)
+    finally:
+        # Release the ground literals of this task.
+        pddl.clear_interned_literals()
+
+
+def _pddl_to_sas(task):
+    if options.relevance_analysis:
+        with timers.timing("Pruning irrelevant schemas", block=True):
+            relevance.prune_irrelevant_schemas(task)
+
+    if options.explain_grounding or options.explain_grounding_json:
+        statistics = grounding_statistics.GroundingStatistics()
+    else:
+        statistics = None
+    if options.out_of_core_grounding:
+        store = relation_store.RelationStore(
+            options.out_of_core_memory_budget)
+    else:
+        store = None
+    # The dump of the task needs all actions at once, and the grounding
+    # statistics need all actions to be instantiated.
+    if (options.translation_cache and not options.dump_task and
+            statistics is None):
+        with timers.timing("Reading translation cache"):
+            cache = translation_cache.TranslationCache(
+                options.translation_cache, task)
+    else:
+        cache = None
+    stream_actions = ((options.streaming_translation or cache is not None)
+                      and not options.dump_task)
+    try:
+        with timers.timing("Instantiating", block=True):
+            (relaxed_reachable, atoms, actions, goal_list, axioms,
+             reachable_action_params) = instantiate.explore(
+                 task, options.relevance_analysis, options.jobs, statistics,
+                 store, stream_actions)
+    finally:
+        if store is not None:
+            store.close()
+    if statistics is not None and not stream_actions:
+        dump_grounding_statistics(statistics)
 
     if not relaxed_reachable:
         return unsolvable_sas_task("No relaxed solution")
     elif goal_list is None:
         return unsolvable_sas_task("Trivially false goal")
+    if cache is not None:
+        cache.check_grounding(atoms, actions, axioms)
 
     negative_in_goal = set()
     for item in goal_list:
@@ -558,8 +874,15 @@ def pddl_to_sas(task):
             negative_in_goal.add(item.negate())
 
     with timers.timing("Computing fact groups", block=True):
+        if cache is not None:
+            invariants = cache.get_invariants(reachable_action_params)
+        else:
+            invariants = None
         groups, mutex_groups, translation_key = fact_groups.compute_groups(
-            task, atoms, reachable_action_params, negative_in_goal)
+            task, atoms, reachable_action_params, negative_in_goal,
+            invariants)
+    if cache is not None:
+        cache.check_groups(groups, mutex_groups)
 
     with timers.timing("Building STRIPS to SAS dictionary"):
         ranges, strips_to_sas = strips_to_sas_dictionary(
@@ -594,13 +917,26 @@ def pddl_to_sas(task):
             strips_to_sas, ranges, translation_key,
             mutex_dict, mutex_ranges, mutex_key,
             task.init, goal_list, actions, axioms, task.use_min_cost_metric,
-            implied_facts)
+            implied_facts, cache)
+    if cache is not None:
+        cache.save()
+    # Release the STRIPS representation before simplifying the SAS task.
+    del actions, axioms
+    if statistics is not None and stream_actions:
+        dump_grounding_statistics(statistics)
 
     print("%d effect conditions simplified" %
           simplified_effect_condition_counter)
     print("%d implied preconditions added" %
           added_implied_precondition_counter)
 
+    if options.h2_mutexes:
+        with timers.timing("Computing h^2 mutexes", block=True):
+            try:
+                h2_mutexes.prune_with_h2_mutexes(sas_task, options.h2_max_time)
+            except simplify.Impossible:
+                return unsolvable_sas_task("Goal violates an h^2 mutex")
+
     if options.filter_unreachable_facts:
         with timers.timing("Detecting unreachable propositions", block=True):
             try:
@@ -616,9 +952,33 @@ def pddl_to_sas(task):
                 sas_task, options.reorder_variables,
                 options.filter_unimportant_vars)
 
+    if options.prune_dominated_operators:
+        with timers.timing("Pruning dominated operators", block=True):
+            removed_operators = dominated_operators.prune_dominated_operators(
+                sas_task)
+        write_pruned_operators(removed_operators)
+
     return sas_task
 
 
+def write_pruned_operators(removed_operators):
+    # Plans for the pruned task are plans for the original task. The
+    # table tells which removed operators an operator of a plan stands
+    # for, e.g., to restore the original action names.
+    data = [{"name": name, "replaced_by": replacement, "reason": reason}
+            for name, replacement, reason in removed_operators]
+    with open(options.pruned_operators_file, "w") as pruned_file:
+        json.dump(data, pruned_file, indent=1)
+        pruned_file.write("\n")
+
+
+def dump_grounding_statistics(statistics):
+    if options.explain_grounding:
+        statistics.dump()
+    if options.explain_grounding_json:
+        statistics.write_json(options.explain_grounding_json)
+
+
 def build_mutex_key(strips_to_sas, groups):
     assert options.use_partial_encoding
     group_keys = []
@@ -699,15 +1059,64 @@ def dump_statistics(sas_task):
         print("Translator peak memory: %d KB" % peak_memory)
 
 
+def estimate_task_size(task):
+    # Pruning schemas here is harmless if we go on to ground the task:
+    # pddl_to_sas does not find anything to prune the second time.
+    if options.relevance_analysis:
+        with timers.timing("Pruning irrelevant schemas", block=True):
+            relevance.prune_irrelevant_schemas(task)
+    with timers.timing("Estimating task size", block=True):
+        prog = pddl_to_prolog.translate(task)
+        estimate = grounding_estimate.GroundingEstimate(prog)
+    estimate.dump()
+    return estimate
+
+
 def main():
+    if options.trace:
+        trace = timers.start_trace()
+    if options.memory_profile:
+        if sys.version_info < (3, 9):
+            sys.exit("Error: --memory-profile requires Python >= 3.9.")
+        memory_profile = timers.start_memory_profile()
+    out_of_memory = False
+    try:
+        _main()
+    except MemoryError:
+        out_of_memory = True
+        raise
+    finally:
+        # Also write the results if the translator stops early, e.g.,
+        # with --estimate-only. After running out of memory, the memory
+        # profile is dumped at the top level once the emergency memory
+        # is freed.
+        if not out_of_memory:
+            if options.memory_profile:
+                memory_profile.dump()
+            if options.trace:
+                trace.write(options.trace, options.trace_format)
+
+
+def _main():
     timer = timers.Timer()
     with timers.timing("Parsing", True):
         task = pddl_parser.open(
             domain_filename=options.domain, task_filename=options.task)
 
-    with timers.timing("Normalizing task"):
+    with timers.timing("Normalizing task", block=True):
         normalize.normalize(task)
 
+    if options.estimate_only:
+        estimate_task_size(task)
+        print("Done! %s" % timer)
+        return
+    if options.max_estimated_operators is not None:
+        estimate = estimate_task_size(task)
+        if estimate.get_num_operators() > options.max_estimated_operators:
+            print("Estimated number of operators exceeds %d, giving up." %
+                  options.max_estimated_operators)
+            sys.exit(TRANSLATE_TASK_TOO_LARGE)
+
     if options.generate_relaxed_task:
         # Remove delete effects.
         for action in task.actions:
@@ -752,6 +1161,8 @@ if __name__ == "__main__":
         print("=" * 79)
         traceback.print_exc(file=sys.stdout)
         print("=" * 79)
+        if timers.memory_profile is not None:
+            timers.memory_profile.dump()
         sys.exit(TRANSLATE_OUT_OF_MEMORY)
     except pddl_parser.ParseError as e:
         print(e)
@@ -1,5 +1,6 @@
-from collections import defaultdict, deque
-from itertools import chain
+from array import array
+from collections import Counter, defaultdict, deque
+from itertools import accumulate
 import heapq
 
 import sccs
@@ -21,19 +22,26 @@ class CausalGraph:
     description in the JAIR paper to reproduce the behaviour of the
     original implementation in the preprocessor component of the
     planner.
+
+    The edges are stored in arrays sorted by source and target: the
+    edges with source var are those with indices in
+    range(start[var], start[var + 1]), and targets and weights hold
+    their targets and weights. Likewise, the predecessors of var are
+    predecessors[predecessor_start[var]:predecessor_start[var + 1]].
     """
 
     def __init__(self, sas_task):
-        self.weighted_graph = defaultdict(lambda: defaultdict(int))
-        ## var_no -> (var_no -> number)
-        self.predecessor_graph = defaultdict(set)
-        self.ordering = []
-
-        self.weight_graph_from_ops(sas_task.operators)
-        self.weight_graph_from_axioms(sas_task.axioms)
-
         self.num_variables = len(sas_task.variables.ranges)
         self.goal_map = dict(sas_task.goal.pairs)
+        self.ordering = []
+
+        # We encode each edge (source, target) as the single number
+        # source * num_variables + target and count how often each
+        # edge occurs to obtain its weight.
+        edge_counts = Counter()
+        edge_counts.update(self.get_edges_from_ops(sas_task.operators))
+        edge_counts.update(self.get_edges_from_axioms(sas_task.axioms))
+        self.build_edge_arrays(edge_counts)
 
     def get_ordering(self):
         if not self.ordering:
@@ -41,77 +49,121 @@ class CausalGraph:
             self.calculate_topological_pseudo_sort(sccs)
         return self.ordering
 
-    def weight_graph_from_ops(self, operators):
+    def get_edges_from_ops(self, operators):
         ### A source variable can be processed several times. This was
         ### probably not intended originally but in experiments (cf.
         ### issue26) it performed better than the (clearer) weighting
         ### described in the Fast Downward paper (which would require
         ### a more complicated implementation).
-        for op in operators:
-            source_vars = [var for (var, value) in op.prevail]
-            for var, pre, _, _ in op.pre_post:
-                if pre != -1:
-                    source_vars.append(var)
-
-            for target, _, _, cond in op.pre_post:
-                for source in chain(source_vars, (var for var, _ in cond)):
-                    if source != target:
-                        self.weighted_graph[source][target] += 1
-                        self.predecessor_graph[target].add(source)
-
-    def weight_graph_from_axioms(self, axioms):
+        num_variables = self.num_variables
+        prevail_start = operators.prevail_start.tolist()
+        prevail_vars = operators.prevail_vars.tolist()
+        effect_start = operators.effect_start.tolist()
+        effect_vars = operators.effect_vars.tolist()
+        effect_pres = operators.effect_pres.tolist()
+        condition_start = operators.condition_start.tolist()
+        condition_vars = operators.condition_vars.tolist()
+        for op_no in range(len(operators)):
+            source_vars = prevail_vars[
+                prevail_start[op_no]:prevail_start[op_no + 1]]
+            effects = range(effect_start[op_no], effect_start[op_no + 1])
+            source_vars += [effect_vars[eff_no] for eff_no in effects
+                            if effect_pres[eff_no] != -1]
+            for eff_no in effects:
+                target = effect_vars[eff_no]
+                yield from [source * num_variables + target
+                            for source in source_vars if source != target]
+                yield from [source * num_variables + target
+                            for source in condition_vars[
+                                condition_start[eff_no]:condition_start[eff_no + 1]]
+                            if source != target]
+
+    def get_edges_from_axioms(self, axioms):
         for ax in axioms:
             target = ax.effect[0]
-            for source, _ in ax.condition:
-                if source != target:
-                    self.weighted_graph[source][target] += 1
-                    self.predecessor_graph[target].add(source)
+            yield from [source * self.num_variables + target
+                        for source, _ in ax.condition if source != target]
+
+    def build_edge_arrays(self, edge_counts):
+        num_variables = self.num_variables
+        edges = sorted(edge_counts)
+        self.targets = array("i", [edge % num_variables for edge in edges])
+        self.weights = array("q", [edge_counts[edge] for edge in edges])
+        self.start = self._get_start(
+            [edge // num_variables for edge in edges])
+
+        predecessor_edges = sorted(
+            target * num_variables + source
+            for source, target in zip(
+                [edge // num_variables for edge in edges], self.targets))
+        self.predecessors = array(
+            "i", [edge % num_variables for edge in predecessor_edges])
+        self.predecessor_start = self._get_start(
+            [edge // num_variables for edge in predecessor_edges])
+
+    def _get_start(self, sorted_vars):
+        # Offsets of the entries for each variable in a list of
+        # variables sorted in increasing order.
+        counts = [0] * self.num_variables
+        for var in sorted_vars:
+            counts[var] += 1
+        start = array("i", [0])
+        start.extend(accumulate(counts))
+        return start
 
     def get_strongly_connected_components(self):
-        unweighted_graph = [[] for _ in range(self.num_variables)]
-        assert len(self.weighted_graph) <= self.num_variables
-        for source, target_weights in self.weighted_graph.items():
-            unweighted_graph[source] = sorted(target_weights.keys())
-        return sccs.get_sccs_adjacency_list(unweighted_graph)
+        return sccs.get_sccs_successor_arrays(self.start, self.targets)
 
     def calculate_topological_pseudo_sort(self, sccs):
         for scc in sccs:
             if len(scc) > 1:
                 # component needs to be turned into acyclic subgraph
 
-                # Compute subgraph induced by scc
-                subgraph = defaultdict(list)
+                # Compute subgraph induced by scc, where the variables
+                # are numbered by their position in scc.
+                scc_index = {var: index for index, var in enumerate(scc)}
+                subgraph_start = array("i", [0])
+                subgraph_targets = array("i")
+                subgraph_weights = array("q")
                 for var in scc:
                     # for each variable in component only list edges inside
                     # component.
-                    subgraph_edges = subgraph[var]
-                    for target, cost in sorted(self.weighted_graph[var].items()):
-                        if target in scc:
+                    for edge in range(self.start[var], self.start[var + 1]):
+                        target = self.targets[edge]
+                        index = scc_index.get(target)
+                        if index is not None:
+                            cost = self.weights[edge]
                             if target in self.goal_map:
-                                subgraph_edges.append((target, 100000 + cost))
-                            subgraph_edges.append((target, cost))
-
-                self.ordering.extend(MaxDAG(subgraph, scc).get_result())
+                                subgraph_targets.append(index)
+                                subgraph_weights.append(100000 + cost)
+                            subgraph_targets.append(index)
+                            subgraph_weights.append(cost)
+                    subgraph_start.append(len(subgraph_targets))
+
+                result = MaxDAG(subgraph_start, subgraph_targets,
+                                subgraph_weights).get_result()
+                self.ordering.extend(scc[index] for index in result)
             else:
                 self.ordering.append(scc[0])
 
     def calculate_important_vars(self, goal):
-        # Note for future refactoring: it is perhaps more idiomatic
-        # and efficient to use a set rather than a defaultdict(bool).
-        necessary = defaultdict(bool)
+        """Return a bytearray that is 1 for the variables from which a
+        goal variable can be reached in the causal graph and 0 for all
+        other variables."""
+        necessary = bytearray(self.num_variables)
+        stack = []
         for var, _ in goal.pairs:
             if not necessary[var]:
-                necessary[var] = True
-                self.dfs(var, necessary)
-        return necessary
-
-    def dfs(self, node, necessary):
-        stack = [pred for pred in self.predecessor_graph[node]]
+                necessary[var] = 1
+                stack.append(var)
         while stack:
-            n = stack.pop()
-            if not necessary[n]:
-                necessary[n] = True
-                stack.extend(pred for pred in self.predecessor_graph[n])
+            var = stack.pop()
+            for pred in self.predecessors[
+                    self.predecessor_start[var]:self.predecessor_start[var + 1]]:
+                if not necessary[pred]:
+                    necessary[pred] = 1
+                    stack.append(pred)
+        return necessary
 
 
 class MaxDAG:
@@ -123,49 +175,55 @@ class MaxDAG:
     incident edges from the graph until only a single node remains
     (cf. computation of total order of vertices when pruning the
     causal graph in the Fast Downward JAIR 2006 paper).
+
+    The nodes are {0, ..., N-1}, where N is len(start) - 1, and the
+    edges leaving node u are given by the entries of targets and
+    weights with indices in range(start[u], start[u + 1]). The node
+    numbers define the tie-breaking order, which gives the same results
+    as the old preprocessor.
     """
 
-    def __init__(self, graph, input_order):
-        self.weighted_graph = graph
-        # input_order is only used to get the same tie-breaking as
-        # with the old preprocessor
-        self.input_order = input_order
+    def __init__(self, start, targets, weights):
+        self.start = start
+        self.targets = targets
+        self.weights = weights
 
     def get_result(self):
-        incoming_weights = defaultdict(int)
-        for weighted_edges in self.weighted_graph.values():
-            for target, weight in weighted_edges:
-                incoming_weights[target] += weight
+        num_nodes = len(self.start) - 1
+        incoming_weights = [0] * num_nodes
+        for target, weight in zip(self.targets, self.weights):
+            incoming_weights[target] += weight
 
         weight_to_nodes = defaultdict(deque)
-        for node in self.input_order:
+        for node in range(num_nodes):
             weight = incoming_weights[node]
             weight_to_nodes[weight].append(node)
         weights = list(weight_to_nodes.keys())
         heapq.heapify(weights)
 
-        done = set()
+        done = bytearray(num_nodes)
         result = []
         while weights:
             min_key = weights[0]
             min_elem = None
             entries = weight_to_nodes[min_key]
-            while entries and (min_elem is None or min_elem in done or
+            while entries and (min_elem is None or done[min_elem] or
                                min_key > incoming_weights[min_elem]):
                 min_elem = entries.popleft()
             if not entries:
                 del weight_to_nodes[min_key]
                 heapq.heappop(weights) # remove min_key from heap
-            if min_elem is None or min_elem in done:
+            if min_elem is None or done[min_elem]:
                 # since we use lazy deletion from the heap weights,
                 # there can be weights with a "done" entry in
                 # weight_to_nodes
                 continue
-            done.add(min_elem)
+            done[min_elem] = 1
             result.append(min_elem)
-            for target, weight in self.weighted_graph[min_elem]:
-                if target not in done:
-                    weight = weight % 100000
+            for edge in range(self.start[min_elem], self.start[min_elem + 1]):
+                target = self.targets[edge]
+                if not done[target]:
+                    weight = self.weights[edge] % 100000
                     if weight == 0:
                         continue
                     old_in_weight = incoming_weights[target]
@@ -191,11 +249,15 @@ class VariableOrder:
         self.new_var = {v: i for i, v in enumerate(ordering)}
 
     def apply_to_task(self, sas_task):
+        new_var_nos = [None] * len(sas_task.variables.ranges)
+        for var, new_var in self.new_var.items():
+            new_var_nos[var] = new_var
         self._apply_to_variables(sas_task.variables)
         self._apply_to_init(sas_task.init)
         self._apply_to_goal(sas_task.goal)
         self._apply_to_mutexes(sas_task.mutexes)
-        self._apply_to_operators(sas_task.operators)
+        sas_task.operators = self._apply_to_operators(sas_task.operators,
+                                                      new_var_nos)
         self._apply_to_axioms(sas_task.axioms)
         if DEBUG:
             sas_task.validate()
@@ -232,26 +294,11 @@ class VariableOrder:
                                                     len(mutexes)))
         mutexes[:] = new_mutexes
 
-    def _apply_to_operators(self, operators):
-        new_ops = []
-        for op in operators:
-            pre_post = []
-            for eff_var, pre, post, cond in op.pre_post:
-                if eff_var in self.new_var:
-                    new_cond = list((self.new_var[var], val)
-                                    for var, val in cond
-                                    if var in self.new_var)
-                    pre_post.append(
-                        (self.new_var[eff_var], pre, post, new_cond))
-            if pre_post:
-                op.pre_post = pre_post
-                op.prevail = [(self.new_var[var], val)
-                              for var, val in op.prevail
-                              if var in self.new_var]
-                new_ops.append(op)
+    def _apply_to_operators(self, operators, new_var_nos):
+        new_ops = operators.rename_variables(new_var_nos)
         print("%s of %s operators necessary." % (len(new_ops),
                                                  len(operators)))
-        operators[:] = new_ops
+        return new_ops
 
     def _apply_to_axioms(self, axioms):
         new_axioms = []
@@ -278,7 +325,7 @@ def find_and_apply_variable_order(sas_task, reorder_vars=True,
             order = list(range(len(sas_task.variables.ranges)))
         if filter_unimportant_vars:
             necessary = cg.calculate_important_vars(sas_task.goal)
-            print("%s of %s variables necessary." % (len(necessary),
+            print("%s of %s variables necessary." % (sum(necessary),
                                                      len(order)))
             order = [var for var in order if necessary[var]]
         VariableOrder(order).apply_to_task(sas_task)